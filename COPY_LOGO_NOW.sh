@@ -1,15 +1,17 @@
 #!/bin/bash
+ROOT="$(cd "$(dirname "$0")" && pwd)"
 
 echo "🎨 Copying Trusenda logo to iOS app..."
 
 # Source locations to try
 SOURCES=(
     "/Users/zachthomas/Desktop/CRM APP/public/trusenda-logo.png"
-    "/Users/zachthomas/Desktop/CRM-APP-SWIFT/TrusendaCRM/Resources/Assets.xcassets/TrusendaLogo.imageset/trusenda-logo.png"
+    "$ROOT/TrusendaCRM/Resources/Assets.xcassets/TrusendaLogo.imageset/trusenda-logo@3x.png"
 )
 
-# Destination
-DEST="/Users/zachthomas/Desktop/CRM-APP-SWIFT/TrusendaCRM/Assets.xcassets/TrusendaLogo.imageset/trusenda-logo.png"
+# Destination: the full-size @3x slot is the master the 1x/2x variants are rendered from
+SET="TrusendaCRM/Assets.xcassets/TrusendaLogo.imageset"
+DEST="$ROOT/$SET/trusenda-logo@3x.png"
 
 # Find and copy logo
 for SOURCE in "${SOURCES[@]}"; do
@@ -17,7 +19,8 @@ for SOURCE in "${SOURCES[@]}"; do
         echo "✅ Found logo at: $SOURCE"
         cp "$SOURCE" "$DEST"
         echo "✅ Copied to: $DEST"
-        ls -lh "$DEST"
+        python3 "$ROOT/xctool.py" assets "$SET" || exit 1
+        ls -lh "$ROOT/$SET"
         echo ""
         echo "🎯 Logo is ready!"
         echo ""
@@ -2,7 +2,7 @@
 
 echo "🎨 Committing premium UI/UX enhancements..."
 
-cd /Users/zachthomas/Desktop/CRM-APP-SWIFT
+cd "$(dirname "$0")"
 
 git add -A
 
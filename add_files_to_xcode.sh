@@ -5,7 +5,7 @@
 
 echo "🔧 Adding new files to Xcode project..."
 
-PROJECT_DIR="/Users/zachthomas/Desktop/CRM-APP-SWIFT"
+PROJECT_DIR="$(cd "$(dirname "$0")" && pwd)"
 PROJECT_FILE="$PROJECT_DIR/TrusendaCRM.xcodeproj/project.pbxproj"
 
 # Check if project exists
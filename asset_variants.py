@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Asset variant generator
+Renders every scale and idiom slot of an image set or app icon set from one
+master PNG, in parallel, and rewrites Contents.json to point at the results
+
+Usage: asset_variants.py [--source MASTER.png] [SET ...]
+With no sets, every .imageset and .appiconset in the app's asset catalogs is processed.
+Slots whose output already matches the cached content hashes are skipped.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import png_codec
+from pbxproj import write_atomic
+from png_optimize import CATALOGS, recompress
+from scanner import cache_file
+
+SET_EXTENSIONS = (".imageset", ".appiconset")
+CACHE_FILE = cache_file(".", "asset-variants.json")
+MASTERS_DIR = cache_file(".", "asset-masters")
+
+# Bump when resampling or encoding changes so cached outputs are regenerated
+RENDER_VERSION = 2
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def load_cache():
+    try:
+        with open(CACHE_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if data.get("version") == RENDER_VERSION else {}
+
+
+def save_cache(cache):
+    cache["version"] = RENDER_VERSION
+    os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+    write_atomic(CACHE_FILE, [json.dumps(cache, indent=1, sort_keys=True)])
+
+
+def find_sets(catalogs=CATALOGS):
+    sets = []
+    for catalog in catalogs:
+        if not os.path.isdir(catalog):
+            continue
+        for name in sorted(os.listdir(catalog)):
+            if name.endswith(SET_EXTENSIONS):
+                sets.append(os.path.join(catalog, name))
+    return sets
+
+
+def read_contents(set_dir):
+    with open(os.path.join(set_dir, "Contents.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_contents(set_dir, contents):
+    """Write Contents.json in Xcode's layout"""
+    text = json.dumps(contents, indent=2, sort_keys=True, separators=(",", " : ")) + "\n"
+    write_atomic(os.path.join(set_dir, "Contents.json"), [text])
+
+
+def pick_master(set_dir, contents):
+    """Return the path of the largest PNG the set already references, or None"""
+    best, best_pixels = None, 0
+    for entry in contents.get("images", []):
+        filename = entry.get("filename")
+        path = os.path.join(set_dir, filename) if filename else None
+        if not path or not path.lower().endswith(".png") or not os.path.exists(path):
+            continue
+        width, height = png_codec.image_size(path)
+        if width * height > best_pixels:
+            best, best_pixels = path, width * height
+    return best
+
+
+def scale_of(entry):
+    return float(entry.get("scale", "1x").rstrip("x"))
+
+
+def plan_slots(set_dir, contents, master):
+    """
+    Return [(entry, filename, width, height)] for every slot in the set
+
+    App icon slots take their pixel size from size x scale. Image set slots
+    scale the master down from the largest scale the set declares.
+    """
+    images = contents.get("images", [])
+    master_width, master_height = png_codec.image_size(master)
+    stem = os.path.splitext(os.path.basename(master))[0]
+    stem = re.sub(r"(-\d+(\.\d+)?)?(@\dx)?$", "", stem) or "image"
+    slots = []
+    if set_dir.endswith(".appiconset"):
+        for entry in images:
+            if "size" not in entry:
+                continue
+            points = entry["size"].split("x")[0]
+            scale = scale_of(entry)
+            pixels = round(float(points) * scale)
+            idiom = "" if entry.get("idiom", "universal") == "universal" else f"-{entry['idiom']}"
+            suffix = f"@{entry['scale']}" if scale != 1 else ""
+            slots.append((entry, f"{stem}{idiom}-{points}{suffix}.png", pixels, pixels))
+    else:
+        top = max((scale_of(entry) for entry in images), default=1)
+        for entry in images:
+            scale = scale_of(entry)
+            idiom = "" if entry.get("idiom", "universal") == "universal" else f"~{entry['idiom']}"
+            suffix = f"@{entry['scale']}" if scale != 1 else ""
+            width = max(1, round(master_width * scale / top))
+            height = max(1, round(master_height * scale / top))
+            slots.append((entry, f"{stem}{idiom}{suffix}.png", width, height))
+    return slots
+
+
+def stash_master(master, digest):
+    """Keep a copy of the master by content hash, since it may itself be one of the slots rewritten"""
+    stash = os.path.join(MASTERS_DIR, f"{digest}.png")
+    if not os.path.exists(stash):
+        os.makedirs(MASTERS_DIR, exist_ok=True)
+        with open(master, "rb") as f:
+            write_atomic(stash, [f.read()], binary=True)
+    return stash
+
+
+@lru_cache(maxsize=4)
+def _decode(path, digest):
+    with open(path, "rb") as f:
+        return png_codec.decode(f.read())
+
+
+def render(master, master_digest, output, width, height):
+    """Worker: write one downscaled, recompressed variant and return its content hash"""
+    if png_codec.image_size(master) == (width, height):
+        with open(master, "rb") as f:
+            data = f.read()
+    else:
+        data = png_codec.encode(png_codec.resize(_decode(master, master_digest), width, height))
+    write_atomic(output, [recompress(data)], binary=True)
+    return output, file_hash(output)
+
+
+def generate(sets, source=None, workers=None):
+    """Render every out-of-date slot in the given sets; returns (rendered, skipped)"""
+    cache = load_cache()
+    outputs = cache.setdefault("outputs", {})
+    jobs = []
+    skipped = 0
+    updates = []
+    for set_dir in sets:
+        contents = read_contents(set_dir)
+        master = source or pick_master(set_dir, contents)
+        if master is None:
+            print(f"⏭️  {set_dir}: no master image (pass --source)")
+            continue
+        master_digest = file_hash(master)
+        master_width, master_height = png_codec.image_size(master)
+        stash = stash_master(master, master_digest)
+        changed = False
+        for entry, filename, width, height in plan_slots(set_dir, contents, master):
+            output = os.path.join(set_dir, filename)
+            if entry.get("filename") != filename:
+                entry["filename"] = filename
+                changed = True
+            if width > master_width or height > master_height:
+                print(f"⚠️  {output}: {width}x{height} is larger than the master, skipped")
+                continue
+            record = outputs.get(output)
+            if (record and record["source"] == master_digest and record["size"] == [width, height]
+                    and os.path.exists(output) and file_hash(output) == record["output"]):
+                skipped += 1
+                continue
+            jobs.append((stash, master_digest, output, width, height))
+        if changed:
+            updates.append((set_dir, contents))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [(job, pool.submit(render, *job)) for job in jobs]
+        for (master, master_digest, _, width, height), future in futures:
+            output, digest = future.result()
+            outputs[output] = {"source": master_digest, "size": [width, height], "output": digest}
+            print(f"✅ {output} ({width}x{height}, {os.path.getsize(output)} bytes)")
+
+    for set_dir, contents in updates:
+        write_contents(set_dir, contents)
+        print(f"✅ Updated {set_dir}/Contents.json")
+    if jobs:
+        save_cache(cache)
+    return len(jobs), skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate scaled variants for asset catalog image sets")
+    parser.add_argument("sets", nargs="*", help=".imageset or .appiconset directories (default: all)")
+    parser.add_argument("--source", help="master PNG to render from (default: largest image in each set)")
+    parser.add_argument("--jobs", type=int, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    print("🎨 Asset Variant Generator")
+    print("=" * 50)
+    sets = args.sets or find_sets()
+    if args.source and not os.path.exists(args.source):
+        print(f"❌ Source not found: {args.source}")
+        return 1
+    rendered, skipped = generate(sets, args.source, args.jobs)
+    print(f"\n✅ {rendered} variants rendered, {skipped} already up to date")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
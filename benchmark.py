@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the project tooling
+Builds synthetic source trees and project files at several sizes, times each
+tooling phase in its own process and records wall time and peak memory as JSON
+
+Usage: benchmark.py [--sizes 1000 10000 100000] [--save-baseline]
+Results are compared against the stored baseline and any phase that got
+slower or bigger than the threshold allows is reported as a regression.
+"""
+
+import argparse
+import json
+import os
+import platform
+import runpy
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from pbxproj import (
+    IDAllocator, Project, add_files, build_file_line, file_reference_line, list_item_line, quote, splice,
+    write_atomic,
+)
+from scanner import cache_file
+
+SIZES = (1000, 10000, 100000)
+PHASES = ("generate", "parse", "insert", "write")
+SOURCE_DIR = "TrusendaCRM"
+PROJECT_FILE = "TrusendaCRM.xcodeproj/project.pbxproj"
+SYNTHETIC_FILE = "Synthetic.xcodeproj/project.pbxproj"
+GENERATOR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "create_xcode_project.py")
+
+RESULTS_FILE = cache_file(".", "bench-results.json")
+BASELINE_FILE = cache_file(".", "bench-baseline.json")
+
+# Shape of the synthetic tree: files per directory and subdirectories per level
+FILES_PER_GROUP = 20
+GROUP_FANOUT = 8
+TARGETS = 3
+
+# A phase regresses when it is this much slower or bigger than the baseline,
+# ignoring differences below the timer noise floor
+THRESHOLD = 0.2
+MIN_SECONDS = 0.005
+
+
+def synthetic_paths(count, targets=TARGETS):
+    """Return [(path, target index)] for `count` Swift files spread over nested directories"""
+    paths = []
+    for i in range(count):
+        group = i // FILES_PER_GROUP
+        parts = []
+        while True:
+            parts.append(group % GROUP_FANOUT)
+            group //= GROUP_FANOUT
+            if not group:
+                break
+        parts.reverse()
+        directory = "/".join(f"Group{part}" for part in parts)
+        paths.append((f"{SOURCE_DIR}/{directory}/File{i}.swift", parts[0] % targets))
+    return paths
+
+
+def write_tree(root, paths):
+    """Create every synthetic source file under `root`"""
+    made = set()
+    for path, _ in paths:
+        directory = os.path.join(root, os.path.dirname(path))
+        if directory not in made:
+            os.makedirs(directory, exist_ok=True)
+            made.add(directory)
+        with open(os.path.join(root, path), "w", encoding="utf-8") as f:
+            f.write(f"struct {os.path.splitext(os.path.basename(path))[0]} {{}}\n")
+
+
+def _object(object_id, comment, fields):
+    """Return a multi-line object entry; `fields` is [(key, value or [(id, comment)])]"""
+    lines = [f"\t\t{object_id} /* {comment} */ = {{\n" if comment else f"\t\t{object_id} = {{\n"]
+    for key, value in fields:
+        if isinstance(value, list):
+            lines.append(f"\t\t\t{key} = (\n")
+            lines.extend(list_item_line(item_id, item_comment) for item_id, item_comment in value)
+            lines.append("\t\t\t);\n")
+        else:
+            lines.append(f"\t\t\t{key} = {value};\n")
+    lines.append("\t\t};\n")
+    return "".join(lines)
+
+
+def synthesize_project(paths, targets=TARGETS):
+    """
+    Yield project.pbxproj text for the synthetic tree
+
+    Every directory becomes a nested group and each file is built by one of
+    `targets` app targets, each with its own Sources and Resources phases and
+    configuration list, in the section layout Xcode writes.
+    """
+    ids = IDAllocator()
+    target_names = [f"App{index}" for index in range(targets)]
+    project_id = ids.allocate("", "PBXProject")
+    main_group = ids.allocate("", "PBXGroup")
+    products_group = ids.allocate("Products", "PBXGroup")
+
+    sections = {}
+
+    def add(isa, object_id, text):
+        sections.setdefault(isa, []).append((object_id, text))
+
+    groups = {"": []}
+    group_ids = {"": main_group}
+    sources = {name: [] for name in target_names}
+    for path, target in paths:
+        name = os.path.basename(path)
+        directory = os.path.dirname(path)
+        file_id = ids.allocate(path, "PBXFileReference")
+        build_id = ids.allocate(path, "PBXBuildFile", target_names[target])
+        add("PBXFileReference", file_id, file_reference_line(file_id, name))
+        add("PBXBuildFile", build_id, build_file_line(build_id, file_id, name))
+        sources[target_names[target]].append((build_id, f"{name} in Sources"))
+        child = (file_id, name)
+        while directory not in groups:
+            groups[directory] = [child]
+            group_ids[directory] = ids.allocate(directory, "PBXGroup")
+            child = (group_ids[directory], os.path.basename(directory))
+            directory = os.path.dirname(directory)
+        groups[directory].append(child)
+
+    products = []
+    target_ids = []
+    for name in target_names:
+        product_id = ids.allocate(name, "product")
+        target_id = ids.allocate(name, "PBXNativeTarget")
+        sources_id = ids.allocate(name, "PBXSourcesBuildPhase")
+        resources_id = ids.allocate(name, "PBXResourcesBuildPhase")
+        config_list = ids.allocate(name, "XCConfigurationList")
+        configs = [(ids.allocate(name, "XCBuildConfiguration", config), config) for config in ("Debug", "Release")]
+        products.append((product_id, f"{name}.app"))
+        target_ids.append((target_id, name))
+        add("PBXFileReference", product_id,
+            f"\t\t{product_id} /* {name}.app */ = {{isa = PBXFileReference; explicitFileType = wrapper.application; "
+            f"includeInIndex = 0; path = {name}.app; sourceTree = BUILT_PRODUCTS_DIR; }};\n")
+        add("PBXNativeTarget", target_id, _object(target_id, name, [
+            ("isa", "PBXNativeTarget"),
+            ("buildConfigurationList", f"{config_list} /* Build configuration list for PBXNativeTarget \"{name}\" */"),
+            ("buildPhases", [(sources_id, "Sources"), (resources_id, "Resources")]),
+            ("name", name),
+            ("productName", name),
+            ("productReference", f"{product_id} /* {name}.app */"),
+            ("productType", '"com.apple.product-type.application"'),
+        ]))
+        add("PBXSourcesBuildPhase", sources_id, _object(sources_id, "Sources", [
+            ("isa", "PBXSourcesBuildPhase"),
+            ("buildActionMask", "2147483647"),
+            ("files", sources[name]),
+            ("runOnlyForDeploymentPostprocessing", "0"),
+        ]))
+        add("PBXResourcesBuildPhase", resources_id, _object(resources_id, "Resources", [
+            ("isa", "PBXResourcesBuildPhase"),
+            ("buildActionMask", "2147483647"),
+            ("files", []),
+            ("runOnlyForDeploymentPostprocessing", "0"),
+        ]))
+        for config_id, config in configs:
+            add("XCBuildConfiguration", config_id, _object(config_id, config, [
+                ("isa", "XCBuildConfiguration"),
+                ("buildSettings", f"{{\n\t\t\t\tPRODUCT_NAME = {name};\n\t\t\t}}"),
+                ("name", config),
+            ]))
+        add("XCConfigurationList", config_list, _object(
+            config_list, f"Build configuration list for PBXNativeTarget \"{name}\"", [
+                ("isa", "XCConfigurationList"),
+                ("buildConfigurations", configs),
+                ("defaultConfigurationName", "Release"),
+            ]))
+
+    groups[""].append((products_group, "Products"))
+    for directory, children in groups.items():
+        fields = [("isa", "PBXGroup"), ("children", children)]
+        if directory:
+            fields.append(("path", quote(os.path.basename(directory))))
+        fields.append(("sourceTree", '"<group>"'))
+        add("PBXGroup", group_ids[directory], _object(group_ids[directory], os.path.basename(directory), fields))
+    add("PBXGroup", products_group, _object(products_group, "Products", [
+        ("isa", "PBXGroup"), ("children", products), ("name", "Products"), ("sourceTree", '"<group>"'),
+    ]))
+    add("PBXProject", project_id, _object(project_id, "Project object", [
+        ("isa", "PBXProject"),
+        ("compatibilityVersion", '"Xcode 14.0"'),
+        ("mainGroup", main_group),
+        ("productRefGroup", f"{products_group} /* Products */"),
+        ("projectDirPath", '""'),
+        ("projectRoot", '""'),
+        ("targets", target_ids),
+    ]))
+
+    yield "// !$*UTF8*$!\n{\n\tarchiveVersion = 1;\n\tclasses = {\n\t};\n\tobjectVersion = 56;\n\tobjects = {\n"
+    for isa in sorted(sections):
+        yield f"\n/* Begin {isa} section */\n"
+        for _, text in sorted(sections[isa]):
+            yield text
+        yield f"/* End {isa} section */\n"
+    yield f"\t}};\n\trootObject = {project_id} /* Project object */;\n}}\n"
+
+
+def new_paths(paths, count):
+    """Return `count` new file paths spread across the synthetic tree's directories"""
+    directories = sorted({os.path.dirname(path) for path, _ in paths})
+    return [f"{directories[i % len(directories)]}/Added{i}.swift" for i in range(count)]
+
+
+def run_phase(phase, workdir, repeat):
+    """Run one phase inside this process and return its best wall time in seconds"""
+    os.chdir(workdir)
+    with open("paths.json", "r", encoding="utf-8") as f:
+        paths = json.load(f)
+    best = None
+    for _ in range(repeat):
+        if phase == "generate":
+            shutil.rmtree(".toolcache", ignore_errors=True)
+            argv = sys.argv
+            sys.argv = [GENERATOR]
+            started = time.perf_counter()
+            try:
+                runpy.run_path(GENERATOR, run_name="__main__")
+            except SystemExit:
+                pass
+            finally:
+                sys.argv = argv
+        elif phase == "parse":
+            started = time.perf_counter()
+            Project.load(SYNTHETIC_FILE)
+        else:
+            project = Project.load(SYNTHETIC_FILE)
+            added = new_paths(paths, max(10, len(paths) // 100))
+            started = time.perf_counter()
+            edits = add_files(project, added, "App0")
+            if phase == "write":
+                write_atomic("output.pbxproj", splice(project.text, edits))
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def measure(phase, workdir, repeat):
+    """Run a phase in a child process; returns {seconds, peak_mb} from its own resource usage"""
+    command = [sys.executable, os.path.abspath(__file__), "--run-phase", phase, "--workdir", workdir,
+               "--repeat", str(repeat)]
+    child = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    output = child.stdout.read()
+    child.stdout.close()
+    _, status, usage = os.wait4(child.pid, 0)
+    child.returncode = os.waitstatus_to_exitcode(status)
+    if child.returncode != 0:
+        raise RuntimeError(f"{phase} phase failed with exit code {child.returncode}")
+    seconds = json.loads(output.decode("utf-8").strip().splitlines()[-1])["seconds"]
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    peak = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    return {"seconds": round(seconds, 6), "peak_mb": round(peak / (1 << 20), 1)}
+
+
+def prepare(workdir, size, targets):
+    """Write the synthetic tree and project for one size into `workdir`"""
+    paths = synthetic_paths(size, targets)
+    write_tree(workdir, paths)
+    with open(os.path.join(workdir, "paths.json"), "w", encoding="utf-8") as f:
+        json.dump(paths, f)
+    os.makedirs(os.path.join(workdir, os.path.dirname(SYNTHETIC_FILE)))
+    os.makedirs(os.path.join(workdir, os.path.dirname(PROJECT_FILE)))
+    write_atomic(os.path.join(workdir, SYNTHETIC_FILE), synthesize_project(paths, targets))
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """Return a message for every phase that regressed against the baseline"""
+    regressions = []
+    for size, phases in results.items():
+        for phase, current in phases.items():
+            previous = baseline.get(size, {}).get(phase)
+            if previous is None:
+                continue
+            seconds, before = current["seconds"], previous["seconds"]
+            if seconds > before * (1 + threshold) and seconds - before > MIN_SECONDS:
+                regressions.append(f"{phase} @ {size} files: {before:.3f}s -> {seconds:.3f}s")
+            if current["peak_mb"] > previous["peak_mb"] * (1 + threshold):
+                regressions.append(f"{phase} @ {size} files: {previous['peak_mb']} MB -> {current['peak_mb']} MB")
+    return regressions
+
+
+def load_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_json(path, data):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    write_atomic(path, [json.dumps(data, indent=2, sort_keys=True) + "\n"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the project tooling on synthetic projects")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="source file counts to test")
+    parser.add_argument("--phases", nargs="+", choices=PHASES, default=list(PHASES), help="phases to time")
+    parser.add_argument("--targets", type=int, default=TARGETS, help="app targets in the synthetic project")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per phase; the best time is kept")
+    parser.add_argument("--output", default=RESULTS_FILE, help="where to write the results JSON")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="allowed slowdown before flagging, e.g. 0.2")
+    parser.add_argument("--run-phase", choices=PHASES, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_phase:
+        print(json.dumps({"seconds": run_phase(args.run_phase, args.workdir, args.repeat)}))
+        return 0
+
+    print("⏱️  Project Tooling Benchmark")
+    print("=" * 50)
+    results = {}
+    for size in args.sizes:
+        workdir = tempfile.mkdtemp(prefix=f"bench-{size}-")
+        try:
+            print(f"\n📁 {size} files, {args.targets} targets")
+            prepare(workdir, size, args.targets)
+            results[str(size)] = {}
+            for phase in args.phases:
+                result = measure(phase, workdir, args.repeat)
+                results[str(size)][phase] = result
+                print(f"   {phase:<10} {result['seconds']:>9.3f}s {result['peak_mb']:>8.1f} MB")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    save_json(args.output, report)
+    print(f"\n✅ Results written to {args.output}")
+
+    if args.save_baseline:
+        save_json(args.baseline, report)
+        print(f"✅ Baseline saved to {args.baseline}")
+        return 0
+
+    baseline = load_json(args.baseline)
+    if baseline is None:
+        print("⏭️  No baseline to compare against (run with --save-baseline)")
+        return 0
+    regressions = compare(results, baseline.get("results", {}), args.threshold)
+    for message in regressions:
+        print(f"❌ Regression: {message}")
+    if regressions:
+        return 1
+    print("✅ No regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
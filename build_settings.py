@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Build settings model
+Holds build settings as inheritance layers, the way Xcode resolves them, and
+emits each configuration as only the settings its own layer adds
+
+Layers, lowest first: project base, project configuration, target base,
+target configuration. A project loaded from disk can be factored into this
+shape, so settings repeated in every configuration live in one place.
+
+Usage: build_settings.py [--project PATH] [--target NAME] [--configuration NAME] [KEY ...]
+Prints the effective settings for a (target, configuration) pair.
+"""
+
+import argparse
+import os
+import re
+
+from pbxproj import Project, quote
+
+INHERITED = '$(inherited)'
+INCLUDE_RE = re.compile(r'#include\??\s+"([^"]+)"')
+SETTING_RE = re.compile(r'([A-Za-z_][A-Za-z0-9_]*(?:\[[^\]]*\])*)\s*=\s*(.*?)\s*;?\s*$')
+
+
+def _inherit(value, inherited):
+    """Return `value` with $(inherited) replaced by the value it overrides, if that is known"""
+    if inherited is None:
+        return value
+    if isinstance(value, list):
+        if INHERITED not in value:
+            return value
+        below = inherited if isinstance(inherited, list) else (inherited.split() if inherited else [])
+        result = []
+        for item in value:
+            result.extend(below if item == INHERITED else [item])
+        return result
+    if INHERITED not in value:
+        return value
+    below = ' '.join(inherited) if isinstance(inherited, list) else (inherited or '')
+    return ' '.join(value.replace(INHERITED, below).split())
+
+
+def merge(lower, upper):
+    """Return the settings of `upper` layered over `lower`, expanding $(inherited)"""
+    merged = dict(lower)
+    for key, value in upper.items():
+        merged[key] = _inherit(value, lower.get(key))
+    return merged
+
+
+class BuildSettings:
+    """
+    Layered build settings with a cached (target, configuration) lookup
+
+    `base` applies to every configuration, `configurations` holds the
+    project-level overrides per configuration, and `targets` and
+    `target_configurations` the same for each target. Mutate layers through
+    set() so cached resolutions are invalidated.
+    """
+
+    def __init__(self, base=None, configurations=None, targets=None, target_configurations=None):
+        self.base = dict(base or {})
+        self.configurations = {name: dict(settings) for name, settings in (configurations or {}).items()}
+        self.targets = {name: dict(settings) for name, settings in (targets or {}).items()}
+        self.target_configurations = {key: dict(settings) for key, settings in (target_configurations or {}).items()}
+        self._resolved = {}
+
+    def layer(self, target=None, configuration=None):
+        """Return the settings dictionary of one layer, creating it if needed"""
+        if target is None:
+            return self.base if configuration is None else self.configurations.setdefault(configuration, {})
+        if configuration is None:
+            return self.targets.setdefault(target, {})
+        return self.target_configurations.setdefault((target, configuration), {})
+
+    def set(self, key, value, target=None, configuration=None):
+        self.layer(target, configuration)[key] = value
+        self._resolved.clear()
+
+    def project_settings(self, configuration):
+        """Return what a project-level configuration resolves to"""
+        key = (None, configuration)
+        if key not in self._resolved:
+            self._resolved[key] = merge(self.base, self.configurations.get(configuration, {}))
+        return self._resolved[key]
+
+    def resolve(self, target, configuration):
+        """Return the effective settings for a target in a configuration"""
+        key = (target, configuration)
+        if key not in self._resolved:
+            settings = self.project_settings(configuration)
+            if target is not None:
+                settings = merge(settings, self.targets.get(target, {}))
+                settings = merge(settings, self.target_configurations.get((target, configuration), {}))
+            self._resolved[key] = settings
+        return self._resolved[key]
+
+    def get(self, key, target, configuration, default=None):
+        return self.resolve(target, configuration).get(key, default)
+
+    def target_settings(self, target, configuration):
+        """Return the settings a target configuration adds on top of the project configuration"""
+        return merge(self.targets.get(target, {}), self.target_configurations.get((target, configuration), {}))
+
+    def factor(self):
+        """Move settings every configuration shares into the base layers; returns how many moved"""
+        moved = _factor(self.base, self.configurations)
+        for target in {target for target, _ in self.target_configurations}:
+            configurations = {configuration: settings for (name, configuration), settings
+                              in self.target_configurations.items() if name == target}
+            moved += _factor(self.targets.setdefault(target, {}), configurations)
+        self._resolved.clear()
+        return moved
+
+    @classmethod
+    def from_project(cls, project, project_dir=None):
+        """
+        Load the layers from a parsed project, folding in xcconfig base files
+
+        Each configuration's baseConfigurationReference file sits just below
+        its own settings, as in Xcode. Shared settings are then factored out.
+        """
+        project_dir = project_dir or (os.path.dirname(os.path.dirname(project.path)) if project.path else '.')
+        model = cls()
+
+        def load_list(list_id, target):
+            config_list = project.get(list_id) or {}
+            for config_id in config_list.get('buildConfigurations', ()):
+                config = project.get(config_id)
+                if config is None:
+                    continue
+                settings = {}
+                base_ref = config.get('baseConfigurationReference')
+                if base_ref in project.objects:
+                    path = project.path_of(base_ref)
+                    if path and os.path.exists(os.path.join(project_dir, path)):
+                        settings = read_xcconfig(os.path.join(project_dir, path))
+                settings = merge(settings, config.get('buildSettings', {}))
+                model.layer(target, config['name']).update(settings)
+
+        root = project.root_object
+        load_list(root.get('buildConfigurationList'), None)
+        for target_id in root.get('targets', ()):
+            target = project.get(target_id)
+            if target is not None:
+                load_list(target.get('buildConfigurationList'), target.get('name'))
+        model.factor()
+        return model
+
+
+def _factor(base, configurations):
+    """Move keys with the same value in every configuration into `base`"""
+    if not configurations:
+        return 0
+    first, *rest = configurations.values()
+    shared = [key for key, value in first.items()
+              if key not in base and all(other.get(key) == value for other in rest)]
+    for key in shared:
+        base[key] = first[key]
+        for settings in configurations.values():
+            del settings[key]
+    return len(shared)
+
+
+def read_xcconfig(path, seen=None):
+    """Return the settings in an xcconfig file, following #include lines"""
+    seen = set() if seen is None else seen
+    path = os.path.abspath(path)
+    if path in seen:
+        return {}
+    seen.add(path)
+    settings = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('//', 1)[0].strip()
+            include = INCLUDE_RE.match(line)
+            if include:
+                included = os.path.join(os.path.dirname(path), include.group(1))
+                if os.path.exists(included):
+                    settings = merge(settings, read_xcconfig(included, seen))
+                continue
+            match = SETTING_RE.match(line)
+            if match:
+                settings = merge(settings, {match.group(1): match.group(2)})
+    return settings
+
+
+def settings_lines(settings, indent='\t\t\t\t'):
+    """Yield a buildSettings dictionary body in Xcode's layout, keys sorted"""
+    for key in sorted(settings):
+        value = settings[key]
+        if isinstance(value, list):
+            yield f"{indent}{quote(key)} = (\n"
+            for item in value:
+                yield f"{indent}\t{quote(item)},\n"
+            yield f"{indent});\n"
+        else:
+            yield f"{indent}{quote(key)} = {quote(value)};\n"
+
+
+def configuration_lines(config_id, name, settings, base_ref=None, base_name=None):
+    """Return an XCBuildConfiguration entry, optionally based on an xcconfig file reference"""
+    lines = [f"\t\t{config_id} /* {name} */ = {{\n", "\t\t\tisa = XCBuildConfiguration;\n"]
+    if base_ref:
+        lines.append(f"\t\t\tbaseConfigurationReference = {base_ref} /* {base_name} */;\n")
+    lines.append("\t\t\tbuildSettings = {\n")
+    lines.extend(settings_lines(settings))
+    lines.append("\t\t\t};\n")
+    lines.append(f"\t\t\tname = {quote(name)};\n")
+    lines.append("\t\t};\n")
+    return ''.join(lines)
+
+
+def xcconfig_text(settings, includes=()):
+    """Return the text of an xcconfig file holding `settings` after the given #includes"""
+    lines = [f'#include "{include}"\n' for include in includes]
+    if lines and settings:
+        lines.append('\n')
+    for key in sorted(settings):
+        value = settings[key]
+        if isinstance(value, list):
+            value = ' '.join(f'"{item}"' if ' ' in item else item for item in value)
+        lines.append(f"{key} = {value}\n")
+    return ''.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show effective build settings")
+    parser.add_argument("keys", nargs="*", help="settings to show (default: all)")
+    parser.add_argument("--project", default="TrusendaCRM.xcodeproj/project.pbxproj", help="path to project.pbxproj")
+    parser.add_argument("--target", help="target name (default: project level)")
+    parser.add_argument("--configuration", default="Debug", help="build configuration")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.project):
+        print(f"❌ Project file not found: {args.project}")
+        return 1
+    model = BuildSettings.from_project(Project.load(args.project))
+    settings = model.resolve(args.target, args.configuration)
+    for key in args.keys or sorted(settings):
+        value = settings.get(key)
+        if value is None:
+            print(f"{key} is not set")
+        else:
+            print(f"{key} = {' '.join(value) if isinstance(value, list) else value}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Project integrity checker
+Cross-checks project.pbxproj against itself and against the source tree and
+reports every inconsistency Xcode would otherwise only surface as build errors
+
+Usage: check_project.py [--project PATH] [--source-dir DIR]
+Exits 1 when anything is found, so it can run from a git pre-commit hook:
+    ln -s ../../check_project.py .git/hooks/pre-commit
+"""
+
+import argparse
+import os
+import time
+
+from pbxproj import ParseError, Project
+from profiling import phase
+from scanner import cache_file, scan
+
+PROJECT_FILE = "TrusendaCRM.xcodeproj/project.pbxproj"
+SOURCE_DIR = "TrusendaCRM"
+
+# Leftovers from editors, merges and hand-made backups
+STALE_SUFFIXES = (".bak", ".orig", ".rej", ".swp", "~")
+
+# Build phases that compile or copy a file into the product
+PRODUCT_PHASES = ("PBXSourcesBuildPhase", "PBXResourcesBuildPhase")
+
+
+def build_indexes(project):
+    """
+    Return (referrers, dangling) from one pass over every object's references
+
+    `referrers` maps each referenced ID to [(owner ID, key)], the reverse of
+    Project.references(); `dangling` lists (owner ID, key, ID) for references
+    to objects that don't exist.
+    """
+    referrers = {}
+    dangling = []
+    objects = project.objects
+    for object_id in objects:
+        for key, ref in project.references(object_id):
+            referrers.setdefault(ref, []).append((object_id, key))
+            if ref not in objects:
+                dangling.append((object_id, key, ref))
+    return referrers, dangling
+
+
+def describe(project, object_id):
+    comment = project.comment(object_id)
+    isa = project.objects[object_id].get("isa", "object") if object_id in project.objects else "object"
+    return f"{isa} {object_id}" + (f" ({comment})" if comment else "")
+
+
+def check_graph(project, referrers, dangling):
+    """Yield (check, message) for broken, orphaned or duplicated objects"""
+    for owner, key, ref in dangling:
+        yield "dangling", f"{describe(project, owner)} {key} points at missing object {ref}"
+
+    root_id = project.root["rootObject"]
+    for object_id in project.objects:
+        if object_id != root_id and object_id not in referrers:
+            yield "orphan", f"{describe(project, object_id)} is not referenced by anything"
+
+    for object_id, refs in referrers.items():
+        owners = [owner for owner, key in refs if key == "files"]
+        if len(owners) > 1:
+            yield "duplicate", f"{describe(project, object_id)} is listed in {len(owners)} build phases"
+
+    paths = {}
+    for file_id in project.of_isa("PBXFileReference"):
+        path = project.path_of(file_id)
+        if path:
+            paths.setdefault(path, []).append(file_id)
+    for path, file_ids in paths.items():
+        if len(file_ids) > 1:
+            yield "duplicate", f"{path} has {len(file_ids)} file references: {', '.join(file_ids)}"
+
+    for isa in PRODUCT_PHASES:
+        for phase_id, phase in project.of_isa(isa).items():
+            seen = {}
+            for build_id in phase.get("files", ()):
+                file_ref = project.objects.get(build_id, {}).get("fileRef")
+                if file_ref is None:
+                    continue
+                if file_ref in seen:
+                    yield "duplicate", f"{describe(project, file_ref)} is built twice by {describe(project, phase_id)}"
+                seen[file_ref] = build_id
+
+
+def check_disk(project, project_dir, source_dir, files):
+    """Yield (check, message) for mismatches between the project and the files on disk"""
+    built = {}
+    for isa in PRODUCT_PHASES:
+        for phase in project.of_isa(isa).values():
+            for build_id in phase.get("files", ()):
+                file_ref = project.objects.get(build_id, {}).get("fileRef")
+                path = project.path_of(file_ref) if file_ref in project.objects else None
+                if path:
+                    built.setdefault(path, isa)
+
+    for path, file_id in project.file_paths().items():
+        if not os.path.exists(os.path.join(project_dir, path)):
+            yield "missing", f"{path} is referenced by {file_id} but does not exist"
+
+    plists = []
+    for relative in files:
+        path = f"{source_dir}/{relative}"
+        name = os.path.basename(relative)
+        if name.endswith(".swift") and built.get(path) != "PBXSourcesBuildPhase":
+            yield "unbuilt", f"{path} is not in any Sources build phase"
+        elif name == "Info.plist":
+            plists.append(path)
+        if name.endswith(STALE_SUFFIXES):
+            yield "stale", f"{path} looks like a leftover backup"
+
+    if len(plists) > 1:
+        yield "duplicate", f"{len(plists)} Info.plist files: {', '.join(plists)}"
+    for path in plists:
+        if path in built:
+            yield "info-plist", f"{path} is copied by a build phase; reference it from INFOPLIST_FILE only"
+
+
+def check(project_file=PROJECT_FILE, source_dir=SOURCE_DIR):
+    """Return [(check, message)] for every inconsistency found"""
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(project_file)))
+    project = Project.load(project_file)
+    files = scan(os.path.join(project_dir, source_dir), cache_path=cache_file(project_dir, "scan-check.json"))
+    with phase('check'):
+        referrers, dangling = build_indexes(project)
+        issues = list(check_graph(project, referrers, dangling))
+        issues.extend(check_disk(project, project_dir, source_dir, files))
+    return issues
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check project.pbxproj and the source tree for inconsistencies")
+    parser.add_argument("--project", default=PROJECT_FILE, help="path to project.pbxproj")
+    parser.add_argument("--source-dir", default=SOURCE_DIR, help="source directory, relative to the project directory")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.project):
+        print(f"❌ Project file not found: {args.project}")
+        return 1
+
+    started = time.perf_counter()
+    try:
+        issues = check(args.project, args.source_dir)
+    except ParseError as e:
+        print(f"❌ Cannot parse {args.project}: {e}")
+        return 1
+    elapsed = (time.perf_counter() - started) * 1000
+
+    for kind, message in issues:
+        print(f"❌ [{kind}] {message}")
+    if issues:
+        print(f"\n⚠️  {len(issues)} issues found in {elapsed:.1f} ms")
+        return 1
+    print(f"✅ Project is consistent ({elapsed:.1f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -1,5 +1,5 @@
 #!/bin/bash
-cd /Users/zachthomas/Desktop/CRM-APP-SWIFT
+cd "$(dirname "$0")"
 
 echo "📝 Committing all improvements..."
 git add -A
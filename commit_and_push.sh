@@ -1,5 +1,5 @@
 #!/bin/bash
-cd /Users/zachthomas/Desktop/CRM-APP-SWIFT
+cd "$(dirname "$0")"
 git add -A
 git commit -m "Fix: Netlify Identity authentication - now works with production backend
 
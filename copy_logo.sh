@@ -1,16 +1,20 @@
 #!/bin/bash
+ROOT="$(cd "$(dirname "$0")" && pwd)"
 
 # Copy Trusenda logo to iOS app assets
 echo "📋 Copying Trusenda logo to iOS app..."
 
 SOURCE="/Users/zachthomas/Desktop/CRM APP/public/trusenda-logo.png"
-DEST="/Users/zachthomas/Desktop/CRM-APP-SWIFT/TrusendaCRM/Resources/Assets.xcassets/TrusendaLogo.imageset/trusenda-logo.png"
+# The full-size @3x slot is the master the 1x/2x variants are rendered from
+SET="TrusendaCRM/Resources/Assets.xcassets/TrusendaLogo.imageset"
+DEST="$ROOT/$SET/trusenda-logo@3x.png"
 
 if [ -f "$SOURCE" ]; then
     cp "$SOURCE" "$DEST"
     echo "✅ Logo copied successfully!"
     echo "   From: $SOURCE"
     echo "   To: $DEST"
+    python3 "$ROOT/xctool.py" assets "$SET" || exit 1
     echo ""
     echo "Now rebuild in Xcode (Cmd+B) to see your logo!"
 else
@@ -1,60 +1,157 @@
 #!/usr/bin/env python3
 """
 Script to create a proper Xcode project file with all Swift sources
+
+Run with --sync to update the existing project for added/removed files instead,
+or with --xcconfig to move the project-level build settings into shared xcconfig files
 """
+import argparse
 import os
-import uuid
-
-# Generate unique IDs
-def gen_id():
-    return str(uuid.uuid4()).replace('-', '')[:24].upper()
-
-# Find all Swift files
-swift_files = []
-for root, dirs, files in os.walk('TrusendaCRM'):
-    for file in files:
-        if file.endswith('.swift'):
-            rel_path = os.path.relpath(os.path.join(root, file), '.')
-            swift_files.append(rel_path)
-
-# Generate file references
-file_refs = {}
-build_files = {}
-
-for f in swift_files:
-    file_id = gen_id()
-    build_id = gen_id()
-    file_refs[f] = file_id
-    build_files[f] = build_id
-
-# Generate pbxproj content
-pbxproj = f'''// !$*UTF8*$!
-{{
+
+from build_settings import BuildSettings, configuration_lines, xcconfig_text
+from journal import Journal
+from pbxproj import (
+    IDAllocator, PathTrie, Project, add_files, build_file_line, file_reference_line, group_lines, list_item_line,
+    remove_files, write_atomic,
+)
+from profiling import phase
+from scanner import cache_file, scan
+
+PROJECT_FILE = 'TrusendaCRM.xcodeproj/project.pbxproj'
+SOURCE_DIR = 'TrusendaCRM'
+TARGET_NAME = 'TrusendaCRM'
+
+# Hand-named objects in the fixed sections below
+FIXED_IDS = (
+    'PRODUCT_REF', 'FRAMEWORKS_PHASE', 'MAIN_GROUP', 'PRODUCTS_GROUP', 'TRUSENDA_GROUP',
+    'TARGET_ID', 'PROJECT_ID', 'RESOURCES_PHASE', 'SOURCES_PHASE', 'DEBUG_CONFIG',
+    'RELEASE_CONFIG', 'TARGET_DEBUG_CONFIG', 'TARGET_RELEASE_CONFIG', 'PROJECT_CONFIG_LIST', 'CONFIG_LIST',
+)
+
+# Build settings as layers: shared by every configuration, then per configuration,
+# then the target's own. Only each layer's settings are written out.
+PROJECT_SETTINGS = {
+    'ALWAYS_SEARCH_USER_PATHS': 'NO',
+    'ASSETCATALOG_COMPILER_GENERATE_SWIFT_ASSET_SYMBOL_EXTENSIONS': 'YES',
+    'CLANG_ANALYZER_NONNULL': 'YES',
+    'CLANG_ANALYZER_NUMBER_OBJECT_CONVERSION': 'YES_AGGRESSIVE',
+    'CLANG_CXX_LANGUAGE_STANDARD': 'gnu++20',
+    'CLANG_ENABLE_MODULES': 'YES',
+    'CLANG_ENABLE_OBJC_ARC': 'YES',
+    'CLANG_ENABLE_OBJC_WEAK': 'YES',
+    'CLANG_WARN_BLOCK_CAPTURE_AUTORELEASING': 'YES',
+    'CLANG_WARN_BOOL_CONVERSION': 'YES',
+    'CLANG_WARN_COMMA': 'YES',
+    'CLANG_WARN_CONSTANT_CONVERSION': 'YES',
+    'CLANG_WARN_DEPRECATED_OBJC_IMPLEMENTATIONS': 'YES',
+    'CLANG_WARN_DIRECT_OBJC_ISA_USAGE': 'YES_ERROR',
+    'CLANG_WARN_DOCUMENTATION_COMMENTS': 'YES',
+    'CLANG_WARN_EMPTY_BODY': 'YES',
+    'CLANG_WARN_ENUM_CONVERSION': 'YES',
+    'CLANG_WARN_INFINITE_RECURSION': 'YES',
+    'CLANG_WARN_INT_CONVERSION': 'YES',
+    'CLANG_WARN_NON_LITERAL_NULL_CONVERSION': 'YES',
+    'CLANG_WARN_OBJC_IMPLICIT_RETAIN_SELF': 'YES',
+    'CLANG_WARN_OBJC_LITERAL_CONVERSION': 'YES',
+    'CLANG_WARN_OBJC_ROOT_CLASS': 'YES_ERROR',
+    'CLANG_WARN_QUOTED_INCLUDE_IN_FRAMEWORK_HEADER': 'YES',
+    'CLANG_WARN_RANGE_LOOP_ANALYSIS': 'YES',
+    'CLANG_WARN_STRICT_PROTOTYPES': 'YES',
+    'CLANG_WARN_SUSPICIOUS_MOVE': 'YES',
+    'CLANG_WARN_UNGUARDED_AVAILABILITY': 'YES_AGGRESSIVE',
+    'CLANG_WARN_UNREACHABLE_CODE': 'YES',
+    'CLANG_WARN__DUPLICATE_METHOD_MATCH': 'YES',
+    'COPY_PHASE_STRIP': 'NO',
+    'ENABLE_STRICT_OBJC_MSGSEND': 'YES',
+    'ENABLE_USER_SCRIPT_SANDBOXING': 'YES',
+    'GCC_C_LANGUAGE_STANDARD': 'gnu17',
+    'GCC_NO_COMMON_BLOCKS': 'YES',
+    'GCC_WARN_64_TO_32_BIT_CONVERSION': 'YES',
+    'GCC_WARN_ABOUT_RETURN_TYPE': 'YES_ERROR',
+    'GCC_WARN_UNDECLARED_SELECTOR': 'YES',
+    'GCC_WARN_UNINITIALIZED_AUTOS': 'YES_AGGRESSIVE',
+    'GCC_WARN_UNUSED_FUNCTION': 'YES',
+    'GCC_WARN_UNUSED_VARIABLE': 'YES',
+    'IPHONEOS_DEPLOYMENT_TARGET': '16.0',
+    'LOCALIZATION_PREFERS_STRING_CATALOGS': 'YES',
+    'MTL_FAST_MATH': 'YES',
+    'SDKROOT': 'iphoneos',
+}
+
+CONFIGURATION_SETTINGS = {
+    'Debug': {
+        'DEBUG_INFORMATION_FORMAT': 'dwarf',
+        'ENABLE_TESTABILITY': 'YES',
+        'GCC_DYNAMIC_NO_PIC': 'NO',
+        'GCC_OPTIMIZATION_LEVEL': '0',
+        'GCC_PREPROCESSOR_DEFINITIONS': ['DEBUG=1', '$(inherited)'],
+        'MTL_ENABLE_DEBUG_INFO': 'INCLUDE_SOURCE',
+        'ONLY_ACTIVE_ARCH': 'YES',
+        'SWIFT_ACTIVE_COMPILATION_CONDITIONS': 'DEBUG $(inherited)',
+        'SWIFT_OPTIMIZATION_LEVEL': '-Onone',
+    },
+    'Release': {
+        'DEBUG_INFORMATION_FORMAT': 'dwarf-with-dsym',
+        'ENABLE_NS_ASSERTIONS': 'NO',
+        'MTL_ENABLE_DEBUG_INFO': 'NO',
+        'SWIFT_COMPILATION_MODE': 'wholemodule',
+        'VALIDATE_PRODUCT': 'YES',
+    },
+}
+
+TARGET_SETTINGS = {
+    'ASSETCATALOG_COMPILER_APPICON_NAME': 'AppIcon',
+    'ASSETCATALOG_COMPILER_GLOBAL_ACCENT_COLOR_NAME': 'AccentColor',
+    'CODE_SIGN_STYLE': 'Automatic',
+    'CURRENT_PROJECT_VERSION': '1',
+    'DEVELOPMENT_TEAM': '',
+    'ENABLE_PREVIEWS': 'YES',
+    'GENERATE_INFOPLIST_FILE': 'YES',
+    'INFOPLIST_KEY_UIApplicationSceneManifest_Generation': 'YES',
+    'INFOPLIST_KEY_UIApplicationSupportsIndirectInputEvents': 'YES',
+    'INFOPLIST_KEY_UILaunchScreen_Generation': 'YES',
+    'INFOPLIST_KEY_UISupportedInterfaceOrientations_iPad': 'UIInterfaceOrientationPortrait UIInterfaceOrientationPortraitUpsideDown UIInterfaceOrientationLandscapeLeft UIInterfaceOrientationLandscapeRight',
+    'INFOPLIST_KEY_UISupportedInterfaceOrientations_iPhone': 'UIInterfaceOrientationPortrait UIInterfaceOrientationLandscapeLeft UIInterfaceOrientationLandscapeRight',
+    'LD_RUNPATH_SEARCH_PATHS': ['$(inherited)', '@executable_path/Frameworks'],
+    'MARKETING_VERSION': '1.0',
+    'PRODUCT_BUNDLE_IDENTIFIER': 'com.trusenda.crm',
+    'PRODUCT_NAME': '$(TARGET_NAME)',
+    'SWIFT_EMIT_LOC_STRINGS': 'YES',
+    'SWIFT_VERSION': '5.0',
+    'TARGETED_DEVICE_FAMILY': '1,2',
+}
+
+# (project configuration, target configuration) IDs for each configuration
+CONFIGURATION_IDS = {
+    'Debug': ('DEBUG_CONFIG', 'TARGET_DEBUG_CONFIG'),
+    'Release': ('RELEASE_CONFIG', 'TARGET_RELEASE_CONFIG'),
+}
+
+# Shared xcconfig files written with --xcconfig
+XCCONFIG_DIR = 'Configurations'
+
+# Main group entry that generated top-level groups are inserted before
+PRODUCTS_ITEM = '\t\t\t\tPRODUCTS_GROUP /* Products */,\n'
+
+# Fixed sections of the project, emitted between the per-file loops
+HEADER = '''// !$*UTF8*$!
+{
 	archiveVersion = 1;
-	classes = {{
-	}};
+	classes = {
+	};
 	objectVersion = 56;
-	objects = {{
+	objects = {
 
 /* Begin PBXBuildFile section */
 '''
 
-# Add build files
-for f, build_id in build_files.items():
-    file_id = file_refs[f]
-    pbxproj += f'\t\t{build_id} /* {os.path.basename(f)} in Sources */ = {{isa = PBXBuildFile; fileRef = {file_id} /* {os.path.basename(f)} */; }};\n'
-
-pbxproj += '''/* End PBXBuildFile section */
+FILE_REFERENCES_HEADER = '''/* End PBXBuildFile section */
 
 /* Begin PBXFileReference section */
 		PRODUCT_REF /* TrusendaCRM.app */ = {isa = PBXFileReference; explicitFileType = wrapper.application; includeInIndex = 0; path = TrusendaCRM.app; sourceTree = BUILT_PRODUCTS_DIR; };
 '''
 
-# Add file references
-for f, file_id in file_refs.items():
-    pbxproj += f'\t\t{file_id} /* {os.path.basename(f)} */ = {{isa = PBXFileReference; lastKnownFileType = sourcecode.swift; path = {os.path.basename(f)}; sourceTree = "<group>"; }};\n'
-
-pbxproj += '''/* End PBXFileReference section */
+GROUPS_HEADER = '''/* End PBXFileReference section */
 
 /* Begin PBXFrameworksBuildPhase section */
 		FRAMEWORKS_PHASE /* Frameworks */ = {
@@ -88,16 +185,13 @@ pbxproj += '''/* End PBXFileReference section */
 			children = (
 '''
 
-# Add all source files to group
-for f in swift_files:
-    file_id = file_refs[f]
-    pbxproj += f'\t\t\t\t{file_id} /* {os.path.basename(f)} */,\n'
-
-pbxproj += '''\t\t\t);
+SOURCE_GROUP_FOOTER = '''\t\t\t);
 			path = TrusendaCRM;
 			sourceTree = "<group>";
 		};
-/* End PBXGroup section */
+'''
+
+SOURCES_HEADER = '''/* End PBXGroup section */
 
 /* Begin PBXNativeTarget section */
 		TARGET_ID /* TrusendaCRM */ = {
@@ -167,192 +261,15 @@ pbxproj += '''\t\t\t);
 			files = (
 '''
 
-# Add all source files to compile phase
-for f, build_id in build_files.items():
-    pbxproj += f'\t\t\t\t{build_id} /* {os.path.basename(f)} in Sources */,\n'
-
-pbxproj += '''\t\t\t);
+SOURCES_FOOTER = '''\t\t\t);
 			runOnlyForDeploymentPostprocessing = 0;
 		};
 /* End PBXSourcesBuildPhase section */
 
 /* Begin XCBuildConfiguration section */
-		DEBUG_CONFIG /* Debug */ = {
-			isa = XCBuildConfiguration;
-			buildSettings = {
-				ALWAYS_SEARCH_USER_PATHS = NO;
-				ASSETCATALOG_COMPILER_GENERATE_SWIFT_ASSET_SYMBOL_EXTENSIONS = YES;
-				CLANG_ANALYZER_NONNULL = YES;
-				CLANG_ANALYZER_NUMBER_OBJECT_CONVERSION = YES_AGGRESSIVE;
-				CLANG_CXX_LANGUAGE_STANDARD = "gnu++20";
-				CLANG_ENABLE_MODULES = YES;
-				CLANG_ENABLE_OBJC_ARC = YES;
-				CLANG_ENABLE_OBJC_WEAK = YES;
-				CLANG_WARN_BLOCK_CAPTURE_AUTORELEASING = YES;
-				CLANG_WARN_BOOL_CONVERSION = YES;
-				CLANG_WARN_COMMA = YES;
-				CLANG_WARN_CONSTANT_CONVERSION = YES;
-				CLANG_WARN_DEPRECATED_OBJC_IMPLEMENTATIONS = YES;
-				CLANG_WARN_DIRECT_OBJC_ISA_USAGE = YES_ERROR;
-				CLANG_WARN_DOCUMENTATION_COMMENTS = YES;
-				CLANG_WARN_EMPTY_BODY = YES;
-				CLANG_WARN_ENUM_CONVERSION = YES;
-				CLANG_WARN_INFINITE_RECURSION = YES;
-				CLANG_WARN_INT_CONVERSION = YES;
-				CLANG_WARN_NON_LITERAL_NULL_CONVERSION = YES;
-				CLANG_WARN_OBJC_IMPLICIT_RETAIN_SELF = YES;
-				CLANG_WARN_OBJC_LITERAL_CONVERSION = YES;
-				CLANG_WARN_OBJC_ROOT_CLASS = YES_ERROR;
-				CLANG_WARN_QUOTED_INCLUDE_IN_FRAMEWORK_HEADER = YES;
-				CLANG_WARN_RANGE_LOOP_ANALYSIS = YES;
-				CLANG_WARN_STRICT_PROTOTYPES = YES;
-				CLANG_WARN_SUSPICIOUS_MOVE = YES;
-				CLANG_WARN_UNGUARDED_AVAILABILITY = YES_AGGRESSIVE;
-				CLANG_WARN_UNREACHABLE_CODE = YES;
-				CLANG_WARN__DUPLICATE_METHOD_MATCH = YES;
-				COPY_PHASE_STRIP = NO;
-				DEBUG_INFORMATION_FORMAT = dwarf;
-				ENABLE_STRICT_OBJC_MSGSEND = YES;
-				ENABLE_TESTABILITY = YES;
-				ENABLE_USER_SCRIPT_SANDBOXING = YES;
-				GCC_C_LANGUAGE_STANDARD = gnu17;
-				GCC_DYNAMIC_NO_PIC = NO;
-				GCC_NO_COMMON_BLOCKS = YES;
-				GCC_OPTIMIZATION_LEVEL = 0;
-				GCC_PREPROCESSOR_DEFINITIONS = (
-					"DEBUG=1",
-					"$(inherited)",
-				);
-				GCC_WARN_64_TO_32_BIT_CONVERSION = YES;
-				GCC_WARN_ABOUT_RETURN_TYPE = YES_ERROR;
-				GCC_WARN_UNDECLARED_SELECTOR = YES;
-				GCC_WARN_UNINITIALIZED_AUTOS = YES_AGGRESSIVE;
-				GCC_WARN_UNUSED_FUNCTION = YES;
-				GCC_WARN_UNUSED_VARIABLE = YES;
-				IPHONEOS_DEPLOYMENT_TARGET = 16.0;
-				LOCALIZATION_PREFERS_STRING_CATALOGS = YES;
-				MTL_ENABLE_DEBUG_INFO = INCLUDE_SOURCE;
-				MTL_FAST_MATH = YES;
-				ONLY_ACTIVE_ARCH = YES;
-				SDKROOT = iphoneos;
-				SWIFT_ACTIVE_COMPILATION_CONDITIONS = "DEBUG $(inherited)";
-				SWIFT_OPTIMIZATION_LEVEL = "-Onone";
-			};
-			name = Debug;
-		};
-		RELEASE_CONFIG /* Release */ = {
-			isa = XCBuildConfiguration;
-			buildSettings = {
-				ALWAYS_SEARCH_USER_PATHS = NO;
-				ASSETCATALOG_COMPILER_GENERATE_SWIFT_ASSET_SYMBOL_EXTENSIONS = YES;
-				CLANG_ANALYZER_NONNULL = YES;
-				CLANG_ANALYZER_NUMBER_OBJECT_CONVERSION = YES_AGGRESSIVE;
-				CLANG_CXX_LANGUAGE_STANDARD = "gnu++20";
-				CLANG_ENABLE_MODULES = YES;
-				CLANG_ENABLE_OBJC_ARC = YES;
-				CLANG_ENABLE_OBJC_WEAK = YES;
-				CLANG_WARN_BLOCK_CAPTURE_AUTORELEASING = YES;
-				CLANG_WARN_BOOL_CONVERSION = YES;
-				CLANG_WARN_COMMA = YES;
-				CLANG_WARN_CONSTANT_CONVERSION = YES;
-				CLANG_WARN_DEPRECATED_OBJC_IMPLEMENTATIONS = YES;
-				CLANG_WARN_DIRECT_OBJC_ISA_USAGE = YES_ERROR;
-				CLANG_WARN_DOCUMENTATION_COMMENTS = YES;
-				CLANG_WARN_EMPTY_BODY = YES;
-				CLANG_WARN_ENUM_CONVERSION = YES;
-				CLANG_WARN_INFINITE_RECURSION = YES;
-				CLANG_WARN_INT_CONVERSION = YES;
-				CLANG_WARN_NON_LITERAL_NULL_CONVERSION = YES;
-				CLANG_WARN_OBJC_IMPLICIT_RETAIN_SELF = YES;
-				CLANG_WARN_OBJC_LITERAL_CONVERSION = YES;
-				CLANG_WARN_OBJC_ROOT_CLASS = YES_ERROR;
-				CLANG_WARN_QUOTED_INCLUDE_IN_FRAMEWORK_HEADER = YES;
-				CLANG_WARN_RANGE_LOOP_ANALYSIS = YES;
-				CLANG_WARN_STRICT_PROTOTYPES = YES;
-				CLANG_WARN_SUSPICIOUS_MOVE = YES;
-				CLANG_WARN_UNGUARDED_AVAILABILITY = YES_AGGRESSIVE;
-				CLANG_WARN_UNREACHABLE_CODE = YES;
-				CLANG_WARN__DUPLICATE_METHOD_MATCH = YES;
-				COPY_PHASE_STRIP = NO;
-				DEBUG_INFORMATION_FORMAT = "dwarf-with-dsym";
-				ENABLE_NS_ASSERTIONS = NO;
-				ENABLE_STRICT_OBJC_MSGSEND = YES;
-				ENABLE_USER_SCRIPT_SANDBOXING = YES;
-				GCC_C_LANGUAGE_STANDARD = gnu17;
-				GCC_NO_COMMON_BLOCKS = YES;
-				GCC_WARN_64_TO_32_BIT_CONVERSION = YES;
-				GCC_WARN_ABOUT_RETURN_TYPE = YES_ERROR;
-				GCC_WARN_UNDECLARED_SELECTOR = YES;
-				GCC_WARN_UNINITIALIZED_AUTOS = YES_AGGRESSIVE;
-				GCC_WARN_UNUSED_FUNCTION = YES;
-				GCC_WARN_UNUSED_VARIABLE = YES;
-				IPHONEOS_DEPLOYMENT_TARGET = 16.0;
-				LOCALIZATION_PREFERS_STRING_CATALOGS = YES;
-				MTL_ENABLE_DEBUG_INFO = NO;
-				MTL_FAST_MATH = YES;
-				SDKROOT = iphoneos;
-				SWIFT_COMPILATION_MODE = wholemodule;
-				VALIDATE_PRODUCT = YES;
-			};
-			name = Release;
-		};
-		TARGET_DEBUG_CONFIG /* Debug */ = {
-			isa = XCBuildConfiguration;
-			buildSettings = {
-				ASSETCATALOG_COMPILER_APPICON_NAME = AppIcon;
-				ASSETCATALOG_COMPILER_GLOBAL_ACCENT_COLOR_NAME = AccentColor;
-				CODE_SIGN_STYLE = Automatic;
-				CURRENT_PROJECT_VERSION = 1;
-				DEVELOPMENT_TEAM = "";
-				ENABLE_PREVIEWS = YES;
-				GENERATE_INFOPLIST_FILE = YES;
-				INFOPLIST_KEY_UIApplicationSceneManifest_Generation = YES;
-				INFOPLIST_KEY_UIApplicationSupportsIndirectInputEvents = YES;
-				INFOPLIST_KEY_UILaunchScreen_Generation = YES;
-				INFOPLIST_KEY_UISupportedInterfaceOrientations_iPad = "UIInterfaceOrientationPortrait UIInterfaceOrientationPortraitUpsideDown UIInterfaceOrientationLandscapeLeft UIInterfaceOrientationLandscapeRight";
-				INFOPLIST_KEY_UISupportedInterfaceOrientations_iPhone = "UIInterfaceOrientationPortrait UIInterfaceOrientationLandscapeLeft UIInterfaceOrientationLandscapeRight";
-				LD_RUNPATH_SEARCH_PATHS = (
-					"$(inherited)",
-					"@executable_path/Frameworks",
-				);
-				MARKETING_VERSION = 1.0;
-				PRODUCT_BUNDLE_IDENTIFIER = com.trusenda.crm;
-				PRODUCT_NAME = "$(TARGET_NAME)";
-				SWIFT_EMIT_LOC_STRINGS = YES;
-				SWIFT_VERSION = 5.0;
-				TARGETED_DEVICE_FAMILY = "1,2";
-			};
-			name = Debug;
-		};
-		TARGET_RELEASE_CONFIG /* Release */ = {
-			isa = XCBuildConfiguration;
-			buildSettings = {
-				ASSETCATALOG_COMPILER_APPICON_NAME = AppIcon;
-				ASSETCATALOG_COMPILER_GLOBAL_ACCENT_COLOR_NAME = AccentColor;
-				CODE_SIGN_STYLE = Automatic;
-				CURRENT_PROJECT_VERSION = 1;
-				DEVELOPMENT_TEAM = "";
-				ENABLE_PREVIEWS = YES;
-				GENERATE_INFOPLIST_FILE = YES;
-				INFOPLIST_KEY_UIApplicationSceneManifest_Generation = YES;
-				INFOPLIST_KEY_UIApplicationSupportsIndirectInputEvents = YES;
-				INFOPLIST_KEY_UILaunchScreen_Generation = YES;
-				INFOPLIST_KEY_UISupportedInterfaceOrientations_iPad = "UIInterfaceOrientationPortrait UIInterfaceOrientationPortraitUpsideDown UIInterfaceOrientationLandscapeLeft UIInterfaceOrientationLandscapeRight";
-				INFOPLIST_KEY_UISupportedInterfaceOrientations_iPhone = "UIInterfaceOrientationPortrait UIInterfaceOrientationLandscapeLeft UIInterfaceOrientationLandscapeRight";
-				LD_RUNPATH_SEARCH_PATHS = (
-					"$(inherited)",
-					"@executable_path/Frameworks",
-				);
-				MARKETING_VERSION = 1.0;
-				PRODUCT_BUNDLE_IDENTIFIER = com.trusenda.crm;
-				PRODUCT_NAME = "$(TARGET_NAME)";
-				SWIFT_EMIT_LOC_STRINGS = YES;
-				SWIFT_VERSION = 5.0;
-				TARGETED_DEVICE_FAMILY = "1,2";
-			};
-			name = Release;
-		};
-/* End XCBuildConfiguration section */
+'''
+
+FOOTER = '''/* End XCBuildConfiguration section */
 
 /* Begin XCConfigurationList section */
 		PROJECT_CONFIG_LIST /* Build configuration list for PBXProject "TrusendaCRM" */ = {
@@ -379,10 +296,184 @@ pbxproj += '''\t\t\t);
 }
 '''
 
-# Write the file
-with open('TrusendaCRM.xcodeproj/project.pbxproj', 'w') as f:
-    f.write(pbxproj)
 
-print(f"Generated Xcode project with {len(swift_files)} Swift files")
-for f in sorted(swift_files):
-    print(f"  - {f}")
+def group_trie(swift_files, ids):
+    """Return a PathTrie with a group for every directory holding Swift files, down from SOURCE_DIR"""
+    groups = PathTrie()
+    groups.insert(SOURCE_DIR, 'TRUSENDA_GROUP')
+    for f in swift_files:
+        directory = os.path.dirname(f)
+        while directory != SOURCE_DIR and groups.get(directory) is None:
+            groups.insert(directory, ids.allocate(directory, 'PBXGroup'))
+            directory = os.path.dirname(directory)
+    return groups
+
+
+def project_settings():
+    """Return the generated project's build settings model"""
+    return BuildSettings(PROJECT_SETTINGS, CONFIGURATION_SETTINGS, {TARGET_NAME: TARGET_SETTINGS})
+
+
+def write_xcconfigs(settings, ids):
+    """
+    Write the project-level layers as xcconfig files
+
+    Shared.xcconfig holds the base layer and each configuration's file
+    includes it and adds its own settings. Returns {configuration: (file ID, path)}.
+    """
+    os.makedirs(XCCONFIG_DIR, exist_ok=True)
+    shared = f'{XCCONFIG_DIR}/Shared.xcconfig'
+    write_atomic(shared, [xcconfig_text(settings.base)])
+    xcconfigs = {}
+    for name in CONFIGURATION_IDS:
+        path = f'{XCCONFIG_DIR}/{name}.xcconfig'
+        write_atomic(path, [xcconfig_text(settings.configurations.get(name, {}), ['Shared.xcconfig'])])
+        xcconfigs[name] = (ids.allocate(path, 'PBXFileReference'), path)
+    xcconfigs[None] = (ids.allocate(shared, 'PBXFileReference'), shared)
+    return xcconfigs
+
+
+def emit_configurations(settings, xcconfigs=None):
+    """Yield the XCBuildConfiguration entries, each holding only its own layer's settings"""
+    target_entries = []
+    for name, (project_id, target_id) in CONFIGURATION_IDS.items():
+        if xcconfigs:
+            file_id, path = xcconfigs[name]
+            yield configuration_lines(project_id, name, {}, file_id, os.path.basename(path))
+        else:
+            yield configuration_lines(project_id, name, settings.project_settings(name))
+        target_entries.append(configuration_lines(target_id, name, settings.target_settings(TARGET_NAME, name)))
+    yield from target_entries
+
+
+def emit_project(swift_files, file_refs, build_files, groups, settings, xcconfigs=None):
+    """Yield the pbxproj text section by section without building it in memory"""
+    names = {f: os.path.basename(f) for f in swift_files}
+    files_in = {}
+    for f in sorted(swift_files):
+        files_in.setdefault(os.path.dirname(f), []).append(f)
+
+    def children(directory):
+        # Files first, then subgroups, the way Xcode lists a folder
+        items = [list_item_line(file_refs[f], names[f]) for f in files_in.get(directory, ())]
+        for name in groups.children(directory):
+            items.append(list_item_line(groups.get(f'{directory}/{name}'), name))
+        return items
+
+    def subgroups(directory):
+        for name in groups.children(directory):
+            path = f'{directory}/{name}'
+            yield group_lines(groups.get(path), name, children(path))
+            yield from subgroups(path)
+
+    yield HEADER
+    for f, build_id in build_files.items():
+        yield build_file_line(build_id, file_refs[f], names[f])
+
+    yield FILE_REFERENCES_HEADER
+    for f, file_id in file_refs.items():
+        yield file_reference_line(file_id, names[f])
+    xcconfig_items = []
+    for file_id, path in (xcconfigs or {}).values():
+        name = os.path.basename(path)
+        yield file_reference_line(file_id, name, file_type='text.xcconfig')
+        xcconfig_items.append(list_item_line(file_id, name))
+
+    if xcconfigs:
+        config_group = groups.get(XCCONFIG_DIR)
+        yield GROUPS_HEADER.replace(PRODUCTS_ITEM, list_item_line(config_group, XCCONFIG_DIR) + PRODUCTS_ITEM)
+    else:
+        yield GROUPS_HEADER
+    yield from children(SOURCE_DIR)
+    yield SOURCE_GROUP_FOOTER
+    yield from subgroups(SOURCE_DIR)
+    if xcconfigs:
+        yield group_lines(config_group, XCCONFIG_DIR, sorted(xcconfig_items, key=lambda line: line.split('/*')[1]))
+
+    yield SOURCES_HEADER
+    for f, build_id in build_files.items():
+        yield list_item_line(build_id, f'{names[f]} in Sources')
+
+    yield SOURCES_FOOTER
+    yield from emit_configurations(settings, xcconfigs)
+    yield FOOTER
+
+
+def sync_project(project_file, swift_files):
+    """
+    Update an existing project for Swift files that appeared or disappeared on disk
+
+    Objects for files the project already knows keep their IDs, including the
+    hand-named ones, and only the changed files produce edits. The project is
+    rewritten only when something changed. Returns (added, removed).
+    """
+    project = Project.load(project_file)
+    known = {path: file_id for path, file_id in project.file_paths().items()
+             if path.endswith('.swift') and path.startswith(SOURCE_DIR + '/')}
+    on_disk = set(swift_files)
+    added = sorted(on_disk - known.keys())
+    removed = sorted(known.keys() - on_disk)
+    if not added and not removed:
+        return added, removed
+
+    with phase('mutate'):
+        edits = remove_files(project, [known[path] for path in removed], keep={os.path.dirname(path) for path in added})
+        edits += add_files(project, added, TARGET_NAME)
+    Journal(project_file).write(project.text, edits, f"sync: +{len(added)} -{len(removed)}")
+    return added, removed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the Xcode project from the Swift sources")
+    parser.add_argument("--sync", action="store_true", help="update the existing project for added/removed files")
+    parser.add_argument("--xcconfig", action="store_true", help="write project-level build settings to xcconfig files")
+    args = parser.parse_args(argv)
+
+    # Find all Swift files; unchanged directories come from the scan cache
+    swift_files = [f'{SOURCE_DIR}/{path}' for path in scan(SOURCE_DIR, '.swift', cache_path=cache_file('.', 'scan-sources.json'))]
+
+    if args.sync and os.path.exists(PROJECT_FILE):
+        added, removed = sync_project(PROJECT_FILE, swift_files)
+        print(f"Synced Xcode project: {len(added)} added, {len(removed)} removed")
+        for f in added:
+            print(f"  + {f}")
+        for f in removed:
+            print(f"  - {f}")
+        return 0
+
+    with phase('mutate'):
+        # Generate file references; IDs are stable across runs for the same paths
+        ids = IDAllocator(FIXED_IDS)
+        file_refs = {}
+        build_files = {}
+
+        for f in swift_files:
+            file_refs[f] = ids.allocate(f, 'PBXFileReference')
+            build_files[f] = ids.allocate(f, 'PBXBuildFile', TARGET_NAME)
+
+        # One group per directory, looked up by path component
+        groups = group_trie(swift_files, ids)
+
+        # With --xcconfig the project-level settings go to shared xcconfig files instead
+        settings = project_settings()
+        xcconfigs = None
+        if args.xcconfig:
+            xcconfigs = write_xcconfigs(settings, ids)
+            groups.insert(XCCONFIG_DIR, ids.allocate(XCCONFIG_DIR, 'PBXGroup'))
+
+    # Stream the file to a temp file and rename it into place; the writes are timed apart from building the text
+    # Identical output leaves the file and its mtime alone, so Xcode doesn't reload it
+    with phase('serialize'):
+        changed = write_atomic(PROJECT_FILE, emit_project(swift_files, file_refs, build_files, groups, settings, xcconfigs))
+    if not changed:
+        print(f"Xcode project already up to date with {len(swift_files)} Swift files")
+        return 0
+
+    print(f"Generated Xcode project with {len(swift_files)} Swift files")
+    for f in sorted(swift_files):
+        print(f"  - {f}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -1,30 +1,71 @@
 #!/usr/bin/env python3
+"""
+Delete the duplicate Info.plist from the Resources folder
+Keys only the duplicate has are merged into TrusendaCRM/Info.plist first.
+If the two set a key differently, the conflicts are reported and the
+duplicate is kept, untouched, for them to be resolved by hand
+
+Usage: delete_duplicate.py
+Run from anywhere inside the repository; the project root is found from the working directory.
+"""
+
+import argparse
 import os
-import shutil
-
-# Delete duplicate Info.plist
-duplicate_plist = "/Users/zachthomas/Desktop/CRM-APP-SWIFT/TrusendaCRM/Resources/Info.plist"
-
-if os.path.exists(duplicate_plist):
-    os.remove(duplicate_plist)
-    print("✅ Removed duplicate Info.plist from Resources folder")
-else:
-    print("✅ Duplicate already removed")
-
-# Verify only one Info.plist remains
-remaining = []
-for root, dirs, files in os.walk("/Users/zachthomas/Desktop/CRM-APP-SWIFT/TrusendaCRM"):
-    for f in files:
-        if f == "Info.plist":
-            remaining.append(os.path.join(root, f))
-
-print(f"\n✅ Info.plist files found: {len(remaining)}")
-for r in remaining:
-    print(f"  - {r}")
-
-if len(remaining) == 1:
-    print("\n✅ PERFECT! Only one Info.plist exists")
-    print("✅ Desktop project is ready to build!")
-else:
+
+from plists import DUPLICATE_PLIST, INFO_PLIST, PlistError, load, merge, print_conflicts, write
+from scanner import scan
+from xctool import find_project_root
+
+SOURCE_DIR = "TrusendaCRM"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge the duplicate Info.plist into the main one and delete it")
+    parser.parse_args(argv)
+
+    project_dir = find_project_root()
+    if project_dir is None:
+        print("❌ No Xcode project found in this directory or any parent")
+        return 1
+
+    # Delete duplicate Info.plist
+    duplicate_plist = os.path.join(project_dir, DUPLICATE_PLIST)
+    if os.path.exists(duplicate_plist):
+        main_plist = os.path.join(project_dir, INFO_PLIST)
+        try:
+            info = load(main_plist)
+            merged, conflicts = merge([(INFO_PLIST, info), (DUPLICATE_PLIST, load(duplicate_plist))])
+            if conflicts:
+                print_conflicts(conflicts)
+                print(f"❌ Duplicate kept: it sets {len(conflicts)} keys differently from Info.plist")
+                return 1
+            # Rewriting through plistlib would reformat the hand-kept file, so only when there is something to add
+            if merged != info:
+                write(main_plist, merged)
+                print("✅ Merged keys only the duplicate had into Info.plist")
+        except (OSError, PlistError) as e:
+            print(f"❌ Duplicate kept, could not merge it: {e}")
+            return 1
+        os.remove(duplicate_plist)
+        print("✅ Removed duplicate Info.plist from Resources folder")
+    else:
+        print("✅ Duplicate already removed")
+
+    # Verify only one Info.plist remains
+    source_dir = os.path.join(project_dir, SOURCE_DIR)
+    remaining = [os.path.join(source_dir, f) for f in scan(source_dir, "Info.plist") if os.path.basename(f) == "Info.plist"]
+
+    print(f"\n✅ Info.plist files found: {len(remaining)}")
+    for r in remaining:
+        print(f"  - {r}")
+
+    if len(remaining) == 1:
+        print("\n✅ PERFECT! Only one Info.plist exists")
+        print("✅ Desktop project is ready to build!")
+        return 0
     print("\n⚠️ Multiple Info.plist files found - need manual cleanup")
+    return 1
+
 
+if __name__ == "__main__":
+    exit(main())
@@ -1,29 +1,119 @@
 #!/usr/bin/env python3
+"""
+Bulk file removal
+Removes files from the Xcode project and from disk together: file
+references, build files, group children and build phase entries go in one
+rewrite of project.pbxproj, and the files are deleted only once that write
+has committed
+
+Usage: delete_files.py [--project PATH] [--dry-run] FILE_OR_GLOB [FILE_OR_GLOB ...]
+Paths and globs are relative to the project directory, e.g. 'TrusendaCRM/Features/Settings/*Settings*View.swift'.
+Paths the project references but that are already gone from disk are cleaned out of the project.
+"""
+
+import argparse
+import glob
 import os
 
-files_to_delete = [
-    "/Users/zachthomas/Desktop/CRM-APP-SWIFT/TrusendaCRM/Features/Settings/SettingsView.swift",
-    "/Users/zachthomas/Desktop/CRM-APP-SWIFT/TrusendaCRM/Features/Settings/EnhancedSettingsView.swift",
-    "/Users/zachthomas/Desktop/CRM-APP-SWIFT/TrusendaCRM/Features/Settings/CleanSettingsView.swift"
-]
-
-for file_path in files_to_delete:
-    if os.path.exists(file_path):
-        os.remove(file_path)
-        print(f"✅ Deleted: {os.path.basename(file_path)}")
-    else:
-        print(f"⏭️  Already gone: {os.path.basename(file_path)}")
-
-print("\n✅ Cleanup complete!")
-print("\nRemaining Settings files:")
-settings_dir = "/Users/zachthomas/Desktop/CRM-APP-SWIFT/TrusendaCRM/Features/Settings"
-for f in os.listdir(settings_dir):
-    if f.endswith('.swift'):
-        print(f"  ✅ {f}")
-
-print("\n🎯 Now clean and rebuild in Xcode:")
-print("  1. Press Cmd+Shift+K (Clean)")
-print("  2. Press Cmd+B (Build)")
-print("  3. Press Cmd+R (Run)")
-print("\n✅ Flickering will be GONE!")
+from journal import Journal
+from pbxproj import ParseError, Project, remove_files
+from profiling import phase
+
+PROJECT_FILE = "TrusendaCRM.xcodeproj/project.pbxproj"
+
+
+def expand_paths(project_dir, patterns):
+    """Expand files and globs into unique project-relative file paths, in the order given"""
+    paths = {}
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern, root_dir=project_dir, recursive=True))
+        else:
+            matches = [pattern]
+        for match in matches:
+            if not os.path.isdir(os.path.join(project_dir, match)):
+                paths.setdefault(os.path.normpath(match), None)
+    return list(paths)
+
+
+def remove_from_project(project_file, paths, dry_run=False):
+    """
+    Drop every object belonging to `paths` from the project in one write
+
+    Build files, parents and phases come from the project's fileRef, child
+    and phase indexes, so each related object is found in constant time.
+    Returns the paths the project referenced.
+    """
+    project = Project.load(project_file)
+    known = project.file_paths()
+    referenced = [path for path in paths if path in known]
+    if not referenced or dry_run:
+        return referenced
+
+    with phase('mutate'):
+        edits = remove_files(project, [known[path] for path in referenced])
+    Journal(project_file).write(project.text, edits, f"remove {len(referenced)} files")
+    print(f"✅ Removed {len(referenced)} file references ({len(edits)} objects and entries)")
+    return referenced
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Remove files from the Xcode project and from disk")
+    parser.add_argument("files", nargs="+", help="files or globs relative to the project directory")
+    parser.add_argument("--project", default=PROJECT_FILE, help="path to project.pbxproj")
+    parser.add_argument("--dry-run", action="store_true", help="show what would be removed without changing anything")
+    args = parser.parse_args(argv)
+
+    print("🗑️  Bulk File Removal")
+    print("=" * 50)
+
+    if not os.path.exists(args.project):
+        print(f"❌ Project file not found: {args.project}")
+        return 1
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(args.project)))
+
+    paths = expand_paths(project_dir, args.files)
+    if not paths:
+        print("❌ No files matched")
+        return 1
+
+    # The project is rewritten first; if that fails nothing on disk has been touched
+    print("\n🔨 Updating project file...")
+    try:
+        referenced = remove_from_project(args.project, paths, args.dry_run)
+    except (OSError, ParseError) as e:
+        print(f"❌ Project not changed: {e}")
+        return 1
+    for path in paths:
+        if path not in referenced:
+            print(f"⏭️  Not in project: {path}")
+
+    print("\n🧹 Deleting files...")
+    failed = 0
+    for path in paths:
+        full_path = os.path.join(project_dir, path)
+        if not os.path.exists(full_path):
+            print(f"⏭️  Already gone: {path}")
+        elif args.dry_run:
+            print(f"🔍 Would delete: {path}")
+        else:
+            try:
+                with phase('delete'):
+                    os.remove(full_path)
+                print(f"✅ Deleted: {path}")
+            except OSError as e:
+                print(f"❌ Could not delete {path}: {e.strerror}")
+                failed += 1
+
+    if args.dry_run:
+        print(f"\n🔍 Dry run: {len(referenced)} project references and {len(paths)} paths matched")
+        return 0
+    if failed:
+        print(f"\n⚠️  {failed} files are out of the project but still on disk")
+        return 1
+    print("\n✅ Cleanup complete! Clean (Cmd+Shift+K) and rebuild in Xcode")
+    return 0
+
 
+if __name__ == "__main__":
+    exit(main())
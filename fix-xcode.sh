@@ -1,7 +1,8 @@
 #!/bin/bash
+ROOT="$(cd "$(dirname "$0")" && pwd)"
 
 # Script to create a working Xcode project
-cd "/Users/zachthomas/Desktop/CRM-APP-SWIFT"
+cd "$ROOT"
 
 # Remove old project
 rm -rf TrusendaCRM.xcodeproj
@@ -52,7 +53,7 @@ swift package generate-xcodeproj 2>/dev/null || echo "Swift package generate-xco
 
 # Copy files back
 if [ -f "TrusendaCRM.xcodeproj/project.pbxproj" ]; then
-    cp -R TrusendaCRM.xcodeproj "/Users/zachthomas/Desktop/CRM-APP-SWIFT/"
+    cp -R TrusendaCRM.xcodeproj "$ROOT/"
     echo "Project created successfully"
 else
     echo "Failed to create project"
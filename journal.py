@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Project edit journal
+Records every change set applied to project.pbxproj as a compact, checksummed
+diff instead of copying the whole file, so any earlier state can be restored
+
+Usage: journal.py [--project PATH] [--verify] [--rollback SEQ]
+Lists the recorded edits by default. --rollback SEQ restores the project to
+how it was just before edit SEQ; the rollback is recorded as an edit too.
+"""
+
+import argparse
+import difflib
+import hashlib
+import itertools
+import json
+import os
+import time
+
+from pbxproj import splice, write_atomic
+from profiling import phase
+from scanner import cache_file
+
+PROJECT_FILE = "TrusendaCRM.xcodeproj/project.pbxproj"
+
+# How far back from the end to look for the start of the last entry per read
+TAIL_BLOCK = 1 << 16
+
+
+class JournalError(Exception):
+    pass
+
+
+def digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _checksum(entry):
+    body = json.dumps({key: value for key, value in entry.items() if key != 'checksum'},
+                      sort_keys=True, ensure_ascii=False)
+    return digest(body)
+
+
+def _valid(line):
+    """Return the entry on a journal line, or None if it is torn or corrupt"""
+    try:
+        entry = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(entry, dict) or entry.get('checksum') != _checksum(entry):
+        return None
+    return entry
+
+
+def diff(old, new):
+    """Return splice() edits turning `old` into `new`, one per run of changed lines"""
+    if old == new:
+        return []
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    offsets = list(itertools.accumulate((len(line) for line in old_lines), initial=0))
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    return [(offsets[i1], offsets[i2], ''.join(new_lines[j1:j2]))
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != 'equal']
+
+
+def replay(text, entry):
+    """Apply a journal entry's edits to `text`"""
+    return ''.join(splice(text, [(start, start + len(old), new) for start, old, new in entry['edits']]))
+
+
+class Journal:
+    """
+    Append-only log of the edits made to one file
+
+    Each entry stores the replaced and inserted text of its edits with the
+    file's checksum before and after, so consecutive entries chain from one
+    state to the next and an entry costs about as much as its change. When
+    the file was changed outside the journal (e.g. by Xcode) the chain is
+    broken, and the next entry carries a snapshot of the file to restart it.
+    Only the journal is fsynced per edit: the file is replaced with
+    write_atomic() but not fsynced, since a copy lost in a crash is caught
+    by verify() against the last entry's after-checksum and can be rebuilt
+    by replaying the journal.
+    """
+
+    def __init__(self, target, path=None):
+        self.target = target
+        if path is None:
+            project_dir = os.path.dirname(os.path.dirname(os.path.abspath(target)))
+            path = cache_file(project_dir, f"{os.path.basename(target)}.journal")
+        self.path = path
+
+    def _scan(self):
+        """Return (entries, bytes they span), stopping at the first torn or corrupt line"""
+        entries = []
+        size = 0
+        if not os.path.exists(self.path):
+            return entries, size
+        with open(self.path, 'rb') as f:
+            for line in f:
+                entry = _valid(line.decode('utf-8', 'replace')) if line.endswith(b'\n') else None
+                if entry is None:
+                    break
+                entries.append(entry)
+                size += len(line)
+        return entries, size
+
+    def entries(self):
+        return self._scan()[0]
+
+    def last(self):
+        """Return the last entry, reading only the end of the journal; truncates a torn tail"""
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, 'rb') as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return None
+            tail = b''
+            position = size
+            while position > 0:
+                position = max(0, position - TAIL_BLOCK)
+                f.seek(position)
+                tail = f.read(size - position)
+                if tail.rfind(b'\n', 0, len(tail) - 1) >= 0:
+                    break
+            line = tail[tail.rfind(b'\n', 0, len(tail) - 1) + 1:]
+            entry = _valid(line.decode('utf-8', 'replace')) if line.endswith(b'\n') else None
+        if entry is not None:
+            return entry
+        # A crash mid-append leaves a partial line; drop it and everything after the last good entry
+        entries, size = self._scan()
+        with open(self.path, 'r+b') as f:
+            f.truncate(size)
+        return entries[-1] if entries else None
+
+    def record(self, text, edits, message=''):
+        """Append an entry for `edits` made to `text` and return the edited text"""
+        last = self.last()
+        before = digest(text)
+        entry = {
+            'seq': last['seq'] + 1 if last else 1,
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'message': message,
+            'before': before,
+        }
+        if last is None or last['after'] != before:
+            entry['snapshot'] = text
+        entry['edits'] = [[start, text[start:end], replacement]
+                          for start, end, replacement in sorted(edits, key=lambda edit: (edit[0], edit[1]))]
+        new_text = replay(text, entry)
+        entry['after'] = digest(new_text)
+        entry['checksum'] = _checksum(entry)
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        return new_text
+
+    def write(self, text, edits, message=''):
+        """Record `edits` and write the edited text to the target atomically; returns the new text"""
+        if not edits:
+            return text
+        with phase('journal'):
+            new_text = self.record(text, edits, message)
+        write_atomic(self.target, [new_text], durable=False)
+        return new_text
+
+    def text_before(self, seq, entries=None):
+        """Return the file's text as it was just before entry `seq` was applied"""
+        entries = self.entries() if entries is None else entries
+        index = next((i for i, entry in enumerate(entries) if entry['seq'] == seq), None)
+        if index is None:
+            raise JournalError(f"No journal entry #{seq}")
+        start = index
+        while start >= 0 and 'snapshot' not in entries[start]:
+            start -= 1
+        if start < 0:
+            raise JournalError(f"No snapshot before journal entry #{seq}")
+        text = entries[start]['snapshot']
+        for entry in entries[start:index]:
+            text = replay(text, entry)
+            if digest(text) != entry['after']:
+                raise JournalError(f"Journal entry #{entry['seq']} does not replay to its checksum")
+        return text
+
+    def rollback(self, seq):
+        """Restore the target to its state before entry `seq`; returns the rollback's entry number"""
+        entries = self.entries()
+        text = self.text_before(seq, entries)
+        with open(self.target, 'r', encoding='utf-8', newline='') as f:
+            current = f.read()
+        self.write(current, diff(current, text), f"rollback to before #{seq}")
+        return self.last()['seq']
+
+    def verify(self):
+        """Yield a message for every entry that is corrupt or doesn't replay, and for a broken chain"""
+        entries, size = self._scan()
+        if os.path.exists(self.path) and os.path.getsize(self.path) > size:
+            yield f"corrupt or torn data after entry #{entries[-1]['seq'] if entries else 0}"
+        text = None
+        for entry in entries:
+            if 'snapshot' in entry:
+                text = entry['snapshot']
+            if text is None or digest(text) != entry['before']:
+                yield f"entry #{entry['seq']} does not follow the entry before it"
+                text = None
+                continue
+            text = replay(text, entry)
+            if digest(text) != entry['after']:
+                yield f"entry #{entry['seq']} does not replay to its checksum"
+                text = None
+        if entries and os.path.exists(self.target):
+            with open(self.target, 'r', encoding='utf-8', newline='') as f:
+                if digest(f.read()) != entries[-1]['after']:
+                    yield "the file was changed after the last entry; the next edit will snapshot it"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List, verify or roll back recorded project edits")
+    parser.add_argument("--project", default=PROJECT_FILE, help="path to project.pbxproj")
+    parser.add_argument("--verify", action="store_true", help="check every entry replays to its checksum")
+    parser.add_argument("--rollback", type=int, metavar="SEQ", help="restore the project to before entry SEQ")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.project):
+        print(f"❌ Project file not found: {args.project}")
+        return 1
+    journal = Journal(args.project)
+
+    if args.verify:
+        problems = list(journal.verify())
+        for problem in problems:
+            print(f"❌ {problem}")
+        if not problems:
+            print(f"✅ {len(journal.entries())} journal entries verified")
+        return 1 if problems else 0
+
+    if args.rollback is not None:
+        try:
+            seq = journal.rollback(args.rollback)
+        except JournalError as e:
+            print(f"❌ {e}")
+            return 1
+        print(f"↩️  Restored {args.project} to before #{args.rollback} (recorded as #{seq})")
+        return 0
+
+    entries = journal.entries()
+    if not entries:
+        print("📭 No edits recorded")
+    for entry in entries:
+        size = sum(len(old) + len(new) for _, old, new in entry['edits'])
+        snapshot = " +snapshot" if 'snapshot' in entry else ""
+        print(f"#{entry['seq']:<4} {entry['time']}  {len(entry['edits'])} edits, {size} chars{snapshot}  {entry['message']}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
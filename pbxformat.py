@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Canonical project formatting
+Rewrites project.pbxproj the way Xcode itself writes it: sections in isa
+order, objects in ID order, keys sorted with isa first, and build files and
+file references on one line each. The rewrite goes through the edit journal
+and is skipped entirely when the file is already canonical
+
+Usage: pbxformat.py [--project PATH] [--check]
+--check only reports whether the file is canonical and exits 1 if it isn't.
+"""
+
+import argparse
+import os
+
+from journal import Journal, diff
+from pbxproj import ParseError, Project
+from profiling import phase
+
+PROJECT_FILE = "TrusendaCRM.xcodeproj/project.pbxproj"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rewrite project.pbxproj in Xcode's canonical layout")
+    parser.add_argument("--project", default=PROJECT_FILE, help="path to project.pbxproj")
+    parser.add_argument("--check", action="store_true", help="exit 1 if the file is not canonical, without changing it")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.project):
+        print(f"❌ Project file not found: {args.project}")
+        return 1
+    try:
+        project = Project.load(args.project)
+    except (OSError, ParseError) as e:
+        print(f"❌ Cannot parse {args.project}: {e}")
+        return 1
+
+    with phase('serialize'):
+        text = ''.join(project.serialize())
+    edits = diff(project.text, text)
+    if not edits:
+        print(f"✅ {args.project} is already canonical")
+        return 0
+    if args.check:
+        print(f"⚠️  {args.project} is not canonical ({len(edits)} changed runs of lines)")
+        return 1
+
+    Journal(args.project).write(project.text, edits, "format")
+    print(f"✅ Formatted {args.project} ({len(edits)} changed runs of lines)")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,917 @@
+#!/usr/bin/env python3
+"""
+Xcode project.pbxproj parser
+Reads the OpenStep plist format in one linear pass and builds an indexed object graph,
+which serializes back in the canonical layout Xcode writes
+"""
+
+import bisect
+import hashlib
+import os
+import re
+import tempfile
+
+from profiling import phase
+
+# Leading whitespace, then one alternation per token kind
+TOKEN_RE = re.compile(r'''
+    \s*(?:
+        (?P<line_comment>//[^\n]*)
+      | (?P<comment>/\*.*?\*/)
+      | (?P<quoted>"(?:[^"\\]|\\.)*")
+      | (?P<punct>[{}()=;,])
+      | (?P<data><[0-9A-Fa-f\s]*>)
+      | (?P<word>(?:[^\s{}()=;,"/<>]|/(?![/*]))+)
+    )?
+''', re.DOTALL | re.VERBOSE)
+
+SECTION_RE = re.compile(r'/\* (Begin|End) (\w+) section \*/')
+
+ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '"': '"', '\\': '\\', "'": "'", 'a': '\a', 'b': '\b', 'f': '\f', 'v': '\v'}
+UNQUOTED_RE = re.compile(r'[A-Za-z0-9_$/:.]+')
+QUOTE_ESCAPES = str.maketrans({'\\': '\\\\', '"': '\\"', '\n': '\\n', '\t': '\\t'})
+ESCAPE_RE = re.compile(r'\\(U[0-9A-Fa-f]{4}|[0-7]{1,3}|.)', re.DOTALL)
+
+# lastKnownFileType by extension; anything compiled goes into the Sources phase
+FILE_TYPES = {
+    '.swift': 'sourcecode.swift',
+    '.m': 'sourcecode.c.objc',
+    '.mm': 'sourcecode.cpp.objcpp',
+    '.c': 'sourcecode.c.c',
+    '.cpp': 'sourcecode.cpp.cpp',
+    '.h': 'sourcecode.c.h',
+    '.plist': 'text.plist.xml',
+    '.json': 'text.json',
+    '.strings': 'text.plist.strings',
+    '.xcassets': 'folder.assetcatalog',
+    '.xcconfig': 'text.xcconfig',
+    '.storyboard': 'file.storyboard',
+    '.xib': 'file.xib',
+    '.png': 'image.png',
+    '.ttf': 'file',
+}
+# Object keys whose values (or array items) are IDs of other objects in the same project
+REFERENCE_KEYS = (
+    'baseConfigurationReference', 'buildConfigurationList', 'buildConfigurations', 'buildPhases',
+    'buildRules', 'children', 'containerPortal', 'dependencies', 'fileRef', 'files', 'mainGroup',
+    'packageProductDependencies', 'packageReferences', 'productRef', 'productRefGroup',
+    'productReference', 'target', 'targetProxy', 'targets',
+)
+
+SOURCE_EXTENSIONS = {'.swift', '.m', '.mm', '.c', '.cpp'}
+HEADER_EXTENSIONS = {'.h'}
+
+# Chunks are joined into writes of roughly this many characters
+WRITE_BUFFER_SIZE = 1 << 16
+
+# Objects Xcode writes on one line; everything else gets one line per key
+SINGLE_LINE_ISAS = {'PBXBuildFile', 'PBXFileReference'}
+
+
+class ParseError(Exception):
+    """Raised when project.pbxproj is not valid OpenStep plist text"""
+
+
+def _unescape(match):
+    code = match.group(1)
+    if code[0] == 'U' and len(code) == 5:
+        return chr(int(code[1:], 16))
+    if code[0] in '01234567':
+        return chr(int(code, 8))
+    return ESCAPES.get(code, code)
+
+
+class _Parser:
+    """Recursive-descent parser over a single forward scan of the text"""
+
+    def __init__(self, text):
+        self.text = text
+        self.pos = 0
+        self.comment = None
+        self.comments = {}
+        self.sections = {}
+        self.spans = {}
+        self.list_ends = {}
+        self.list_items = {}
+
+    def error(self, message, pos=None):
+        pos = self.pos if pos is None else pos
+        line = self.text.count('\n', 0, pos) + 1
+        return ParseError(f"{message} at line {line}")
+
+    def next(self):
+        """Return the next significant token as (kind, value, start, end)"""
+        self.comment = None
+        text = self.text
+        match_token = TOKEN_RE.match
+        while True:
+            match = match_token(text, self.pos)
+            kind = match.lastgroup
+            if kind is None:
+                self.pos = match.end()
+                if self.pos < len(text):
+                    raise self.error(f"Unexpected character {text[self.pos]!r}")
+                return None, None, self.pos, self.pos
+            start, self.pos = match.span(kind)
+            if kind == 'line_comment':
+                continue
+            value = match.group(kind)
+            if kind == 'comment':
+                self.comment = value[3:-3]
+                section = SECTION_RE.fullmatch(value)
+                if section:
+                    bounds = self.sections.setdefault(section.group(2), [start, start])
+                    bounds[0 if section.group(1) == 'Begin' else 1] = start
+                continue
+            return kind, value, start, self.pos
+
+    def expect(self, punct):
+        kind, value, start, _ = self.next()
+        if kind != 'punct' or value != punct:
+            raise self.error(f"Expected '{punct}' but found {value!r}", start)
+
+    def value(self, token, owner=None, key=None):
+        kind, value, start, _ = token
+        if kind == 'word':
+            return value
+        if kind == 'quoted':
+            body = value[1:-1]
+            return ESCAPE_RE.sub(_unescape, body) if '\\' in body else body
+        if kind == 'data':
+            return bytes.fromhex(''.join(value[1:-1].split()))
+        if value == '{':
+            return self.dict()
+        if value == '(':
+            return self.list(owner, key)
+        raise self.error(f"Unexpected {value!r}", start)
+
+    def list(self, owner=None, key=None):
+        items = []
+        starts = [] if owner is not None else None
+        while True:
+            token = self.next()
+            if token[0] == 'punct' and token[1] == ')':
+                break
+            if token[0] is None:
+                raise self.error("Unterminated array")
+            if starts is not None:
+                starts.append(token[2])
+            items.append(self.value(token))
+            token = self.next()
+            if token[0] == 'punct' and token[1] == ')':
+                break
+            if token[0] != 'punct' or token[1] != ',':
+                raise self.error(f"Expected ',' or ')' but found {token[1]!r}", token[2])
+        if owner is not None:
+            self.list_ends[(owner, key)] = token[2]
+            self.list_items[(owner, key)] = starts
+        return items
+
+    def dict(self, owner=None, objects=False, top=False):
+        result = {}
+        while True:
+            token = self.next()
+            if token[0] == 'punct' and token[1] == '}':
+                return result
+            self.entry(token, result, owner, objects, top)
+
+    def entry(self, token, result, owner=None, objects=False, top=False):
+        """Parse one `key = value;` pair whose key is `token` into `result`"""
+        kind, key, start, _ = token
+        if kind not in ('word', 'quoted'):
+            raise self.error(f"Expected key but found {key!r}", start)
+        key = self.value(token)
+        self.expect('=')
+        if objects and self.comment is not None:
+            self.comments[key] = self.comment
+        token = self.next()
+        if objects or (top and key == 'objects'):
+            if token[1] != '{':
+                raise self.error(f"Expected dictionary for {key}", token[2])
+            result[key] = self.dict(owner=key) if objects else self.dict(objects=True)
+        else:
+            result[key] = self.value(token, owner, key)
+        self.expect(';')
+        if objects:
+            line_start = self.text.rfind('\n', 0, start) + 1
+            end = self.pos + 1 if self.text.startswith('\n', self.pos) else self.pos
+            self.spans[key] = (line_start, end)
+
+    def objects_between(self, start, end):
+        """Parse the object entries in text[start:end], e.g. lines spliced into a section"""
+        self.pos = start
+        result = {}
+        while True:
+            token = self.next()
+            if token[0] is None or token[2] >= end:
+                return result
+            self.entry(token, result, objects=True)
+
+    def items_between(self, start, end):
+        """Return [(value, offset)] for the array items in text[start:end]"""
+        self.pos = start
+        items = []
+        while True:
+            token = self.next()
+            if token[0] is None or token[2] >= end:
+                return items
+            if token[0] == 'punct' and token[1] == ',':
+                continue
+            items.append((self.value(token), token[2]))
+
+    def parse(self):
+        token = self.next()
+        if token[1] != '{':
+            raise self.error("Expected '{' at start of project")
+        root = self.dict(top=True)
+        if self.next()[0] is not None:
+            raise self.error("Unexpected data after project")
+        return root
+
+
+class Project:
+    """
+    Parsed project.pbxproj with constant-time indexes by object ID, isa and fileRef
+
+    Offsets in `sections`, `spans`, `list_ends` and `list_items` refer to the
+    text the project was parsed from and are not updated by add_object or
+    remove_object; use them to build edits for splice().
+    """
+
+    def __init__(self, root, comments=None, text=None, sections=None, spans=None, list_ends=None, list_items=None, path=None):
+        self.root = root
+        self.objects = root.setdefault('objects', {})
+        self.comments = comments or {}
+        self.text = text
+        self.sections = {isa: tuple(bounds) for isa, bounds in (sections or {}).items()}
+        self.spans = spans or {}
+        self.list_ends = list_ends or {}
+        self.list_items = list_items or {}
+        self.path = path
+        self._by_isa = {}
+        self._by_file_ref = {}
+        self._phases = {}
+        self._targets = {}
+        self._parents = {}
+        self._phase_of = {}
+        self._paths = {}
+        self._positions = {}
+        self._trie = None
+        for object_id, obj in self.objects.items():
+            self._index(object_id, obj)
+
+    @classmethod
+    def parse(cls, text, path=None):
+        """Parse project text in a single pass"""
+        with phase('parse'):
+            return cls(*cls._parsed(text), path)
+
+    @staticmethod
+    def _parsed(text):
+        parser = _Parser(text)
+        root = parser.parse()
+        return root, parser.comments, text, parser.sections, parser.spans, parser.list_ends, parser.list_items
+
+    @classmethod
+    def load(cls, path):
+        """Read and parse a project.pbxproj file"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.parse(f.read(), path)
+
+    def _index(self, object_id, obj):
+        isa = obj.get('isa')
+        self._by_isa.setdefault(isa, {})[object_id] = obj
+        file_ref = obj.get('fileRef')
+        if file_ref is not None:
+            self._by_file_ref.setdefault(file_ref, []).append(object_id)
+        if 'buildPhases' in obj:
+            self._targets[obj.get('name')] = object_id
+            for phase_id in obj['buildPhases']:
+                self._phases[phase_id] = object_id
+        for child_id in obj.get('children', ()):
+            self._parents[child_id] = object_id
+        if isa == 'PBXGroup':
+            self._trie = None
+        if isa is not None and isa.endswith('BuildPhase'):
+            for build_file_id in obj.get('files', ()):
+                self._phase_of[build_file_id] = object_id
+
+    def _unindex(self, object_id, obj):
+        self._by_isa.get(obj.get('isa'), {}).pop(object_id, None)
+        refs = self._by_file_ref.get(obj.get('fileRef'))
+        if refs and object_id in refs:
+            refs.remove(object_id)
+        if self._targets.get(obj.get('name')) == object_id:
+            del self._targets[obj['name']]
+        for phase_id in obj.get('buildPhases', ()):
+            self._phases.pop(phase_id, None)
+        for child_id in obj.get('children', ()):
+            self._parents.pop(child_id, None)
+        for build_file_id in obj.get('files', ()):
+            self._phase_of.pop(build_file_id, None)
+        self._paths.clear()
+        self._positions.clear()
+        self._trie = None
+
+    @property
+    def root_object(self):
+        return self.objects[self.root['rootObject']]
+
+    def get(self, object_id):
+        """Return the object with the given ID, or None"""
+        return self.objects.get(object_id)
+
+    def comment(self, object_id):
+        return self.comments.get(object_id)
+
+    def of_isa(self, isa):
+        """Return {id: object} for every object of the given isa, in file order"""
+        return self._by_isa.get(isa, {})
+
+    def build_files_for(self, file_ref):
+        """Return the IDs of PBXBuildFile objects pointing at a file reference"""
+        return list(self._by_file_ref.get(file_ref, ()))
+
+    def target(self, name):
+        """Return the ID of the target with the given name, or None"""
+        return self._targets.get(name)
+
+    def target_for_phase(self, phase_id):
+        return self._phases.get(phase_id)
+
+    def parent(self, object_id):
+        """Return the ID of the group that lists the object as a child, or None"""
+        return self._parents.get(object_id)
+
+    def phase_for(self, build_file_id):
+        """Return the ID of the build phase that lists a build file, or None"""
+        return self._phase_of.get(build_file_id)
+
+    def path_of(self, object_id):
+        """
+        Return the path of a file reference or group relative to the project directory
+
+        Returns None for objects outside the source tree (SDK, built products).
+        """
+        if object_id in self._paths:
+            return self._paths[object_id]
+        obj = self.objects[object_id]
+        source_tree = obj.get('sourceTree', '<group>')
+        path = obj.get('path', '')
+        if source_tree == 'SOURCE_ROOT':
+            result = path
+        elif source_tree == '<group>':
+            parent_id = self._parents.get(object_id)
+            base = self.path_of(parent_id) if parent_id is not None else ''
+            result = None if base is None else (f"{base}/{path}" if base and path else base or path)
+        else:
+            result = None
+        self._paths[object_id] = result
+        return result
+
+    def references(self, object_id):
+        """Yield (key, referenced ID) for every object reference held by an object"""
+        obj = self.objects[object_id]
+        for key in REFERENCE_KEYS:
+            value = obj.get(key)
+            if isinstance(value, str):
+                yield key, value
+            elif isinstance(value, list):
+                for item in value:
+                    yield key, item
+
+    def file_paths(self):
+        """Return {path: file reference ID} for every file reference inside the source tree"""
+        paths = {}
+        for file_id in self.of_isa('PBXFileReference'):
+            path = self.path_of(file_id)
+            if path:
+                paths[path] = file_id
+        return paths
+
+    def group_trie(self):
+        """Return the PathTrie of every group that maps to a directory, built on first use"""
+        if self._trie is None:
+            self._trie = PathTrie(self.root_object['mainGroup'])
+            for group_id, group in self.of_isa('PBXGroup').items():
+                if 'path' in group:
+                    path = self.path_of(group_id)
+                    if path is not None:
+                        self._trie.insert(path, group_id)
+        return self._trie
+
+    def group_for(self, directory):
+        """Return (group ID, group path) for the deepest existing group on a directory path"""
+        return self.group_trie().deepest(directory)
+
+    def item_line(self, owner, key, value):
+        """Return the (start, end) offsets of the line listing `value` in owner's `key` array"""
+        positions = self._positions.get((owner, key))
+        if positions is None:
+            # First occurrence wins, as with list.index()
+            items = self.objects[owner][key]
+            positions = self._positions[(owner, key)] = {items[i]: i for i in range(len(items) - 1, -1, -1)}
+        start = self.list_items[(owner, key)][positions[value]]
+        return self.text.rfind('\n', 0, start) + 1, self.text.index('\n', start) + 1
+
+    def list_insertion_point(self, owner, key):
+        """Return the offset of the line closing owner's `key` array, where new items go"""
+        return self.text.rfind('\n', 0, self.list_ends[(owner, key)]) + 1
+
+    def build_phase(self, target_id, isa):
+        """Return the ID of the target's first build phase of the given isa, or None"""
+        for phase_id in self.objects[target_id].get('buildPhases', ()):
+            phase = self.objects.get(phase_id)
+            if phase is not None and phase.get('isa') == isa:
+                return phase_id
+        return None
+
+    def allocator(self):
+        """Return an IDAllocator that avoids every ID already in the project"""
+        return IDAllocator(self.objects)
+
+    def add_object(self, object_id, obj, comment=None):
+        if object_id in self.objects:
+            raise KeyError(f"Duplicate object ID {object_id}")
+        self.objects[object_id] = obj
+        if comment is not None:
+            self.comments[object_id] = comment
+        self._index(object_id, obj)
+
+    def remove_object(self, object_id):
+        obj = self.objects.pop(object_id)
+        self.comments.pop(object_id, None)
+        self._unindex(object_id, obj)
+        return obj
+
+    def apply(self, edits):
+        """
+        Splice edits into the project text and update the graph to match, without reparsing
+
+        Handles the edits add_files() and remove_files() produce: whole object
+        lines deleted or inserted at the end of a section, and array item
+        lines deleted or inserted before an array's closing line. Every stored
+        offset is shifted, deleted objects and items are dropped, and only the
+        inserted text is parsed. Any other kind of edit falls back to a full
+        parse. Returns the IDs of the objects that were added.
+        """
+        edits = sorted(edits, key=lambda edit: (edit[0], edit[1]))
+        section_ends = {end: isa for isa, (_, end) in self.sections.items()}
+        list_points = {self.list_insertion_point(*list_key): list_key for list_key in self.list_ends}
+        for start, end, replacement in edits:
+            if replacement and (start != end or (start not in section_ends and start not in list_points)):
+                return self._reparse(edits)
+
+        starts = [edit[0] for edit in edits]
+        shifts = [0]
+        deleted = []
+        for start, end, replacement in edits:
+            shifts.append(shifts[-1] + len(replacement) - (end - start))
+            if end > start:
+                deleted.append((start, end))
+        deleted_starts = [start for start, _ in deleted]
+
+        def is_deleted(offset):
+            index = bisect.bisect_right(deleted_starts, offset) - 1
+            return index >= 0 and offset < deleted[index][1]
+
+        def shift(offset):
+            return offset + shifts[bisect.bisect_right(starts, offset)]
+
+        def shift_end(offset):
+            return offset + shifts[bisect.bisect_left(starts, offset)]
+
+        text = ''.join(splice(self.text, edits))
+
+        removed = [object_id for object_id, (start, _) in self.spans.items() if is_deleted(start)]
+        for object_id in removed:
+            if object_id in self.objects:
+                self.remove_object(object_id)
+            del self.spans[object_id]
+        self.spans = {object_id: (shift(start), shift_end(end)) for object_id, (start, end) in self.spans.items()}
+        self.sections = {isa: (shift(begin), shift(end)) for isa, (begin, end) in self.sections.items()}
+
+        first_deleted = deleted_starts[0] if deleted else len(self.text)
+        list_ends = {}
+        for list_key, list_end in self.list_ends.items():
+            if list_key[0] not in self.objects:
+                self.list_items.pop(list_key, None)
+                continue
+            list_ends[list_key] = shift(list_end)
+            item_starts = self.list_items.get(list_key)
+            if not item_starts:
+                continue
+            if list_end > first_deleted and any(is_deleted(start) for start in item_starts):
+                owner, key = list_key
+                obj = self.objects[owner]
+                self._unindex(owner, obj)
+                kept = [(value, start) for value, start in zip(obj[key], item_starts) if not is_deleted(start)]
+                obj[key] = [value for value, _ in kept]
+                item_starts = [start for _, start in kept]
+                self._index(owner, obj)
+            self.list_items[list_key] = [shift(start) for start in item_starts]
+        self.list_ends = list_ends
+
+        parser = _Parser(text)
+        added = []
+        offset = 0
+        for index, (start, end, replacement) in enumerate(edits):
+            if replacement:
+                position = start + shifts[index]
+                if start in section_ends:
+                    new_objects = parser.objects_between(position, position + len(replacement))
+                    for object_id, obj in new_objects.items():
+                        self.add_object(object_id, obj, parser.comments.get(object_id))
+                        added.append(object_id)
+                else:
+                    owner, key = list_points[start]
+                    obj = self.objects[owner]
+                    self._unindex(owner, obj)
+                    for value, item_start in parser.items_between(position, position + len(replacement)):
+                        obj[key].append(value)
+                        self.list_items.setdefault((owner, key), []).append(item_start)
+                    self._index(owner, obj)
+        self.spans.update(parser.spans)
+        self.list_ends.update(parser.list_ends)
+        self.list_items.update(parser.list_items)
+        self.text = text
+        return added
+
+    def serialize(self):
+        """
+        Yield the project text in Xcode's canonical layout
+
+        Sections come in isa order and objects in ID order within them, keys
+        are sorted with isa first, and references carry the comments they
+        were parsed with. A project Xcode wrote itself round-trips unchanged.
+        """
+        yield '// !$*UTF8*$!\n{\n'
+        for key in sorted(self.root):
+            if key != 'objects':
+                yield f"\t{quote(key)} = {self._format(self.root[key], 1, key == 'rootObject')};\n"
+                continue
+            yield '\tobjects = {\n'
+            for isa in sorted(self._by_isa, key=str):
+                yield f"\n/* Begin {isa} section */\n"
+                single_line = isa in SINGLE_LINE_ISAS
+                for object_id in sorted(self._by_isa[isa]):
+                    obj = self._by_isa[isa][object_id]
+                    value = self._format_inline(obj) if single_line else self._format(obj, 2)
+                    yield f"\t\t{self._reference(object_id)} = {value};\n"
+                yield f"/* End {isa} section */\n"
+            yield '\t};\n'
+        yield '}\n'
+
+    def save(self, path=None):
+        """Write the canonical text to `path` (default: where it was loaded from); returns False when unchanged"""
+        return write_atomic(path or self.path, self.serialize())
+
+    def _reference(self, value):
+        comment = self.comments.get(value)
+        return quote(value) if comment is None else f"{quote(value)} /* {comment} */"
+
+    def _format(self, value, depth, reference=False):
+        """Format a value over several lines; `reference` values are object IDs and get their comments"""
+        if isinstance(value, str):
+            return self._reference(value) if reference else quote(value)
+        if isinstance(value, bytes):
+            return f"<{value.hex()}>"
+        indent = '\t' * depth
+        if isinstance(value, list):
+            items = ''.join(f"{indent}\t{self._format(item, depth + 1, reference)},\n" for item in value)
+            return f"(\n{items}{indent})"
+        entries = ''.join(f"{indent}\t{quote(key)} = {self._format(value[key], depth + 1, key in REFERENCE_KEYS)};\n"
+                          for key in _ordered(value))
+        return f"{{\n{entries}{indent}}}"
+
+    def _format_inline(self, value, reference=False):
+        if isinstance(value, str):
+            return self._reference(value) if reference else quote(value)
+        if isinstance(value, bytes):
+            return f"<{value.hex()}>"
+        if isinstance(value, list):
+            return '(' + ''.join(f"{self._format_inline(item, reference)}, " for item in value) + ')'
+        return '{' + ''.join(f"{quote(key)} = {self._format_inline(value[key], key in REFERENCE_KEYS)}; "
+                             for key in _ordered(value)) + '}'
+
+    def _reparse(self, edits):
+        known = set(self.objects)
+        text = ''.join(splice(self.text, edits))
+        self.__init__(*Project._parsed(text), self.path)
+        return [object_id for object_id in self.objects if object_id not in known]
+
+
+def _ordered(obj):
+    """Return a dictionary's keys in Xcode's order: isa first, the rest sorted"""
+    keys = sorted(obj)
+    if 'isa' in obj:
+        keys.remove('isa')
+        keys.insert(0, 'isa')
+    return keys
+
+
+class PathTrie:
+    """
+    Directory path to group ID, one node per path component
+
+    Lookups walk the path one component at a time, so finding the deepest
+    group on a path costs O(depth) however many groups the project has.
+    """
+
+    def __init__(self, root_id=None):
+        self.root = [root_id, {}]
+
+    def insert(self, path, group_id):
+        node = self.root
+        for part in path.split('/') if path else ():
+            node = node[1].setdefault(part, [None, {}])
+        node[0] = group_id
+
+    def get(self, path):
+        """Return the group ID stored for exactly `path`, or None"""
+        node = self.root
+        for part in path.split('/') if path else ():
+            node = node[1].get(part)
+            if node is None:
+                return None
+        return node[0]
+
+    def deepest(self, path):
+        """Return (group ID, group path) for the deepest node with a group on `path`"""
+        node = self.root
+        best, depth = node[0], 0
+        parts = path.split('/') if path else []
+        for index, part in enumerate(parts, 1):
+            node = node[1].get(part)
+            if node is None:
+                break
+            if node[0] is not None:
+                best, depth = node[0], index
+        return best, '/'.join(parts[:depth])
+
+    def children(self, path=''):
+        """Return the names of the direct child nodes of `path`, sorted"""
+        node = self.root
+        for part in path.split('/') if path else ():
+            node = node[1][part]
+        return sorted(node[1])
+
+
+class IDAllocator:
+    """
+    Deterministic 24-hex-digit object IDs derived from (path, role, target)
+
+    The same inputs always give the same ID, so regenerating an unchanged tree
+    produces identical output. Each candidate is checked against the set of
+    IDs in use and rehashed with a counter on the rare collision.
+    """
+
+    def __init__(self, existing=()):
+        self.used = set(existing)
+
+    def allocate(self, path, role, target=''):
+        seed = f"{path}\0{role}\0{target}"
+        attempt = 0
+        while True:
+            key = seed if attempt == 0 else f"{seed}\0{attempt}"
+            object_id = hashlib.sha256(key.encode('utf-8')).hexdigest()[:24].upper()
+            if object_id not in self.used:
+                self.used.add(object_id)
+                return object_id
+            attempt += 1
+
+
+def quote(value):
+    """Return a string the way Xcode writes it, quoted only when needed"""
+    if value and UNQUOTED_RE.fullmatch(value) and '//' not in value:
+        return value
+    return '"' + value.translate(QUOTE_ESCAPES) + '"'
+
+
+def file_reference_line(file_id, path, name=None, file_type='sourcecode.swift'):
+    """Return a PBXFileReference entry in Xcode's single-line layout"""
+    name = name or os.path.basename(path)
+    name_field = f"name = {quote(name)}; " if name != path else ""
+    return (f"\t\t{file_id} /* {name} */ = {{isa = PBXFileReference; lastKnownFileType = {file_type}; "
+            f"{name_field}path = {quote(path)}; sourceTree = \"<group>\"; }};\n")
+
+
+def build_file_line(build_id, file_id, name, phase='Sources'):
+    """Return a PBXBuildFile entry in Xcode's single-line layout"""
+    return f"\t\t{build_id} /* {name} in {phase} */ = {{isa = PBXBuildFile; fileRef = {file_id} /* {name} */; }};\n"
+
+
+def group_lines(group_id, name, children, path=None):
+    """Return a PBXGroup entry; `children` are list_item_line() strings"""
+    return (f"\t\t{group_id} /* {name} */ = {{\n\t\t\tisa = PBXGroup;\n\t\t\tchildren = (\n"
+            + ''.join(children)
+            + f"\t\t\t);\n\t\t\tpath = {quote(path or name)};\n\t\t\tsourceTree = \"<group>\";\n\t\t}};\n")
+
+
+def list_item_line(object_id, comment):
+    """Return one array item line as nested in an object body"""
+    return f"\t\t\t\t{object_id} /* {comment} */,\n"
+
+
+def file_type(path):
+    return FILE_TYPES.get(os.path.splitext(path)[1].lower(), 'file')
+
+
+def add_files(project, paths, target_name):
+    """
+    Return splice() edits that add each path to the project and to a target
+
+    Each file gets a file reference in the group for its directory, creating
+    any groups missing between the deepest existing one and the directory, and
+    unless it is a header, a build file in the target's Sources or Resources
+    phase. Lines bound for the same place are collected first, so the edits
+    stay one per insertion point however many files are added.
+    """
+    target_id = project.target(target_name)
+    if target_id is None:
+        raise KeyError(f"No target named {target_name}")
+    phases = {
+        'Sources': project.build_phase(target_id, 'PBXSourcesBuildPhase'),
+        'Resources': project.build_phase(target_id, 'PBXResourcesBuildPhase'),
+    }
+    ids = project.allocator()
+    inserts = {}
+    created = {}
+
+    def add_child(group_id, group_path, line):
+        if group_path in created:
+            created[group_path][1].append(line)
+        else:
+            inserts.setdefault(project.list_insertion_point(group_id, 'children'), []).append(line)
+
+    for path in paths:
+        name = os.path.basename(path)
+        extension = os.path.splitext(path)[1].lower()
+        directory = os.path.dirname(path)
+        group_id, group_path = project.group_for(directory)
+        if group_path != directory:
+            for part in directory[len(group_path):].lstrip('/').split('/'):
+                child_path = f"{group_path}/{part}" if group_path else part
+                if child_path not in created:
+                    created[child_path] = (ids.allocate(child_path, 'PBXGroup'), [])
+                    add_child(group_id, group_path, list_item_line(created[child_path][0], part))
+                group_id, group_path = created[child_path][0], child_path
+        file_id = ids.allocate(path, 'PBXFileReference')
+        relative = path[len(group_path):].lstrip('/')
+        inserts.setdefault(project.sections['PBXFileReference'][1], []).append(
+            file_reference_line(file_id, relative, name, file_type(path)))
+        add_child(group_id, group_path, list_item_line(file_id, name))
+        if extension in HEADER_EXTENSIONS:
+            continue
+        phase = 'Sources' if extension in SOURCE_EXTENSIONS else 'Resources'
+        if phases[phase] is None:
+            raise KeyError(f"Target {target_name} has no {phase} build phase")
+        build_id = ids.allocate(path, 'PBXBuildFile', target_name)
+        inserts.setdefault(project.sections['PBXBuildFile'][1], []).append(
+            build_file_line(build_id, file_id, name, phase))
+        inserts.setdefault(project.list_insertion_point(phases[phase], 'files'), []).append(
+            list_item_line(build_id, f'{name} in {phase}'))
+    if created:
+        inserts.setdefault(project.sections['PBXGroup'][1], []).extend(
+            group_lines(group_id, os.path.basename(group_path), children)
+            for group_path, (group_id, children) in created.items())
+    return [(offset, offset, ''.join(lines)) for offset, lines in inserts.items()]
+
+
+def remove_files(project, file_ids, keep=()):
+    """
+    Return splice() edits that delete file references with their build files and list entries
+
+    A group left with no children is deleted too, with its entry in its
+    parent, and so on upward. The main and products groups stay, as do the
+    groups on the path to any directory in `keep`, where add_files() is about
+    to put new files.
+    """
+    root = project.root_object
+    protected = {root.get('mainGroup'), root.get('productRefGroup')}
+    for directory in keep:
+        group_id = project.group_for(directory)[0]
+        while group_id is not None and group_id not in protected:
+            protected.add(group_id)
+            group_id = project.parent(group_id)
+
+    removed = list(dict.fromkeys(file_ids))
+    remaining = {}
+    for object_id in removed:
+        parent_id = project.parent(object_id)
+        if parent_id is None:
+            continue
+        if parent_id not in remaining:
+            remaining[parent_id] = len(set(project.objects[parent_id].get('children', ())))
+        remaining[parent_id] -= 1
+        if remaining[parent_id] == 0 and parent_id not in protected \
+                and project.objects[parent_id].get('isa') == 'PBXGroup':
+            # Appending while iterating visits the emptied group next
+            removed.append(parent_id)
+
+    removed_ids = set(removed)
+    edits = []
+    for object_id in removed:
+        edits.append((*project.spans[object_id], ''))
+        parent_id = project.parent(object_id)
+        # An emptied group's lines go with it
+        if parent_id is not None and parent_id not in removed_ids:
+            edits.append((*project.item_line(parent_id, 'children', object_id), ''))
+        for build_id in project.build_files_for(object_id):
+            edits.append((*project.spans[build_id], ''))
+            phase_id = project.phase_for(build_id)
+            if phase_id is not None:
+                edits.append((*project.item_line(phase_id, 'files', build_id), ''))
+    return edits
+
+
+def splice(text, edits):
+    """
+    Yield `text` with every (start, end, replacement) edit applied in one pass
+
+    Edits at the same offset are applied in the order given.
+    """
+    position = 0
+    for start, end, replacement in sorted(edits, key=lambda edit: (edit[0], edit[1])):
+        if start < position:
+            raise ValueError(f"Overlapping edit at offset {start}")
+        yield text[position:start]
+        yield replacement
+        position = end
+    yield text[position:]
+
+
+def write_atomic(path, chunks, binary=False, durable=True):
+    """
+    Stream text chunks to a temp file next to `path`, then rename it into place
+
+    Chunks are batched into large writes, so generators that yield one line
+    per object keep memory flat. A crash mid-write leaves the old file intact.
+    The output is hashed as it is written; when it matches the file already
+    at `path` the temp file is dropped and the original, with its mtime, is
+    left alone. Returns True if the file was replaced. Pass binary=True to
+    write bytes chunks. The temp file is fsynced before the rename unless
+    durable=False, for callers that can rebuild the file from a durable
+    record of their own. Only the writes themselves count towards the 'write'
+    phase; producing the chunks is the caller's.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    empty = b'' if binary else ''
+    hasher = hashlib.sha256()
+    written = 0
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pending = []
+            size = 0
+
+            def flush():
+                nonlocal written
+                data = empty.join(pending)
+                if not binary:
+                    data = data.encode('utf-8')
+                hasher.update(data)
+                written += len(data)
+                with phase('write'):
+                    f.write(data)
+                pending.clear()
+
+            for chunk in chunks:
+                pending.append(chunk)
+                size += len(chunk)
+                if size >= WRITE_BUFFER_SIZE:
+                    flush()
+                    size = 0
+            flush()
+            if _same_content(path, written, hasher.digest()):
+                os.unlink(temp_path)
+                return False
+            if durable:
+                with phase('write'):
+                    f.flush()
+                    os.fsync(f.fileno())
+        with phase('write'):
+            if os.path.exists(path):
+                os.chmod(temp_path, os.stat(path).st_mode & 0o7777)
+            else:
+                os.chmod(temp_path, 0o644)
+            os.replace(temp_path, path)
+        return True
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def _same_content(path, size, sha256):
+    """Return whether the file at `path` has exactly `size` bytes hashing to `sha256`"""
+    try:
+        if os.path.getsize(path) != size:
+            return False
+        hasher = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                hasher.update(block)
+        return hasher.digest() == sha256
+    except OSError:
+        return False
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Read-only project queries
+Memory-maps project.pbxproj and parses only the sections a query touches,
+using a byte-offset index of the section markers that is cached per file and
+rebuilt when the file's mtime or size changes
+
+Usage: pbxquery.py [--project PATH] [SECTION ...]
+    pbxquery.py --project Pods/Pods.xcodeproj/project.pbxproj PBXShellScriptBuildPhase
+    pbxquery.py --id OBJECT_ID
+With no sections, lists every section with its object count.
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+
+from pbxproj import ParseError, _Parser, write_atomic
+from profiling import phase
+from scanner import cache_file
+
+PROJECT_FILE = "TrusendaCRM.xcodeproj/project.pbxproj"
+
+# Bump when the cached index layout changes
+INDEX_VERSION = 1
+
+SECTION_MARKER_RE = re.compile(rb'/\* (Begin|End) (\w+) section \*/')
+
+
+class SectionIndex:
+    """
+    Lazily parsed view of one project file, section by section
+
+    `sections` maps each isa to the (begin, end) byte offsets of its section
+    markers. section() decodes and parses just those bytes on first use, so
+    listing the shell script phases of a large project never looks at its
+    build files. The index itself is read from the cache file when the
+    project's mtime and size still match.
+    """
+
+    def __init__(self, path, cache_path=None):
+        self.path = path
+        if cache_path is None:
+            project_dir = os.path.dirname(os.path.dirname(os.path.abspath(path)))
+            cache_path = cache_file(project_dir, f"{os.path.basename(path)}.sections.json")
+        self.cache_path = cache_path
+        self._file = open(path, 'rb')
+        stat = os.fstat(self._file.fileno())
+        self.stamp = [stat.st_mtime_ns, stat.st_size]
+        self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b''
+        self.sections = self._load_index()
+        self._parsed = {}
+        self._comments = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self._file.close()
+
+    def _load_index(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('version') == INDEX_VERSION and cached.get('stamp') == self.stamp:
+                return {isa: tuple(bounds) for isa, bounds in cached['sections'].items()}
+        except (OSError, ValueError, KeyError):
+            pass
+        with phase('scan'):
+            sections = self._scan()
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        data = {'version': INDEX_VERSION, 'stamp': self.stamp, 'sections': sections}
+        write_atomic(self.cache_path, [json.dumps(data, indent=1, sort_keys=True)])
+        return sections
+
+    def _scan(self):
+        """Find every section's Begin and End marker with one regex pass over the mapped bytes"""
+        sections = {}
+        for match in SECTION_MARKER_RE.finditer(self.data):
+            bounds = sections.setdefault(match.group(2).decode('ascii'), [match.start(), match.start()])
+            bounds[0 if match.group(1) == b'Begin' else 1] = match.start()
+        return {isa: tuple(bounds) for isa, bounds in sections.items()}
+
+    def section(self, isa):
+        """Return {id: object} for a section, parsing it on first use"""
+        if isa not in self._parsed:
+            bounds = self.sections.get(isa)
+            if bounds is None:
+                self._parsed[isa] = {}
+                return self._parsed[isa]
+            begin, end = bounds
+            text = self.data[begin:end].decode('utf-8')
+            parser = _Parser(text)
+            try:
+                with phase('parse'):
+                    self._parsed[isa] = parser.objects_between(0, len(text))
+            except ParseError as e:
+                raise ParseError(f"{e} of the {isa} section") from None
+            self._comments.update(parser.comments)
+        return self._parsed[isa]
+
+    def section_of(self, object_id):
+        """Return the isa of the section holding an object's definition, or None"""
+        match = re.search(rb'^\t*' + re.escape(object_id.encode('ascii')) + rb' (?:/\*.*?\*/ )?= \{',
+                          self.data, re.MULTILINE)
+        if match is None:
+            return None
+        return next((isa for isa, (begin, end) in self.sections.items() if begin <= match.start() < end), None)
+
+    def get(self, object_id):
+        """Return one object, parsing only the section that defines it"""
+        isa = self.section_of(object_id)
+        return None if isa is None else self.section(isa).get(object_id)
+
+    def comment(self, object_id):
+        return self._comments.get(object_id)
+
+    def count(self, isa):
+        """Count a section's objects without parsing it, by counting `isa = X;` lines"""
+        begin, end = self.sections.get(isa, (0, 0))
+        return len(re.findall(rb'\bisa = ' + re.escape(isa.encode('ascii')) + rb';', self.data[begin:end]))
+
+
+def describe(object_id, obj, comment):
+    name = comment or obj.get('name') or obj.get('path') or ''
+    return f"{object_id}  {obj.get('isa')}" + (f"  {name}" if name else "")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query sections of a project.pbxproj without parsing all of it")
+    parser.add_argument("sections", nargs="*", help="section names, e.g. PBXShellScriptBuildPhase")
+    parser.add_argument("--project", default=PROJECT_FILE, help="path to project.pbxproj")
+    parser.add_argument("--id", dest="object_id", help="print one object by ID")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.project):
+        print(f"❌ Project file not found: {args.project}")
+        return 1
+
+    with SectionIndex(args.project) as index:
+        if args.object_id:
+            obj = index.get(args.object_id)
+            if obj is None:
+                print(f"❌ No object {args.object_id}")
+                return 1
+            print(describe(args.object_id, obj, index.comment(args.object_id)))
+            for key, value in obj.items():
+                print(f"   {key} = {value}")
+            return 0
+
+        if not args.sections:
+            for isa, (begin, end) in index.sections.items():
+                print(f"{isa}: {index.count(isa)} objects, {end - begin} bytes")
+            return 0
+
+        for isa in args.sections:
+            if isa not in index.sections:
+                print(f"⚠️  No {isa} section")
+                continue
+            objects = index.section(isa)
+            print(f"📋 {isa} ({len(objects)} objects)")
+            for object_id, obj in objects.items():
+                print(f"   {describe(object_id, obj, index.comment(object_id))}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Plist stage
+Merges Info.plist sources with conflict reporting, validates well-known keys,
+renders plist templates from environment values, and compiles bundled plist
+resources to the binary format, which the app parses faster at launch
+
+Usage: plists.py merge [--output PATH] [--allow-conflicts] [SOURCE ...]
+       plists.py validate [PLIST ...]
+       plists.py render [--xml] [TEMPLATE [OUTPUT]]
+       plists.py compile --output DIR [PLIST ...]
+Outputs whose bytes would not change are not rewritten, and a merge that
+leaves the output's contents as they are does not reformat it.
+"""
+
+import argparse
+import copy
+import datetime
+import os
+import plistlib
+import re
+
+from pbxproj import ParseError, Project, write_atomic
+from profiling import phase
+
+PROJECT_FILE = "TrusendaCRM.xcodeproj/project.pbxproj"
+INFO_PLIST = "TrusendaCRM/Info.plist"
+DUPLICATE_PLIST = "TrusendaCRM/Resources/Info.plist"
+SECRETS_TEMPLATE = "Secrets.plist.template"
+SECRETS_PLIST = "TrusendaCRM/Resources/Secrets.plist"
+
+# Types Info.plist keys must have; anything not listed is left alone
+KEY_TYPES = {
+    'CFBundleDevelopmentRegion': str,
+    'CFBundleDisplayName': str,
+    'CFBundleExecutable': str,
+    'CFBundleIdentifier': str,
+    'CFBundleInfoDictionaryVersion': str,
+    'CFBundleName': str,
+    'CFBundlePackageType': str,
+    'CFBundleShortVersionString': str,
+    'CFBundleVersion': str,
+    'CFBundleURLTypes': list,
+    'LSApplicationQueriesSchemes': list,
+    'LSRequiresIPhoneOS': bool,
+    'NSAppTransportSecurity': dict,
+    'UIApplicationSceneManifest': dict,
+    'UIBackgroundModes': list,
+    'UILaunchScreen': dict,
+    'UIRequiredDeviceCapabilities': list,
+    'UISupportedInterfaceOrientations': list,
+}
+USAGE_DESCRIPTION_RE = re.compile(r'NS\w+UsageDescription')
+VERSION_RE = re.compile(r'\d+(\.\d+){0,2}')
+BUILD_VARIABLE_RE = re.compile(r'\$[({]\w+[)}]')
+PLACEHOLDER_RE = re.compile(r'\$\{(\w+)\}')
+# Values like YOUR_APPLE_SIGNING_KEY_HERE left in a template by hand
+UNFILLED_RE = re.compile(r'\bYOUR_\w+_HERE\w*\b')
+
+
+class PlistError(Exception):
+    pass
+
+
+def load(path):
+    """Read an XML or binary plist"""
+    try:
+        with open(path, 'rb') as f:
+            return plistlib.load(f)
+    except (plistlib.InvalidFileException, ValueError) as e:
+        raise PlistError(f"{path} is not a valid plist: {e}") from None
+
+
+def write(path, value, binary=False):
+    """Write a plist, keeping key order; returns False when the file already had these bytes"""
+    with phase('serialize'):
+        data = plistlib.dumps(value, fmt=plistlib.FMT_BINARY if binary else plistlib.FMT_XML, sort_keys=False)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    return write_atomic(path, [data], binary=True)
+
+
+def merge(sources):
+    """
+    Merge [(name, dict)] with earlier sources taking precedence
+
+    Dictionaries merge key by key; any other value that differs between
+    sources is a conflict. Returns (merged, conflicts) where conflicts are
+    (key path, [(name, value), ...]) with the winning value first.
+    """
+    merged = {}
+    origins = {}
+    conflicts = {}
+
+    def origin(key_path):
+        # A key that arrived inside a whole dictionary came from that dictionary's source
+        while key_path not in origins:
+            key_path = key_path.rpartition('.')[0]
+        return origins[key_path]
+
+    def visit(target, value, name, path):
+        for key, item in value.items():
+            key_path = f"{path}.{key}" if path else key
+            if key not in target:
+                target[key] = copy.deepcopy(item)
+                origins[key_path] = name
+            elif isinstance(target[key], dict) and isinstance(item, dict):
+                visit(target[key], item, name, key_path)
+            elif target[key] != item:
+                conflicts.setdefault(key_path, [(origin(key_path), target[key])]).append((name, item))
+
+    for name, value in sources:
+        visit(merged, value, name, '')
+    return merged, list(conflicts.items())
+
+
+def validate(value):
+    """Yield a message for every well-known Info.plist key with the wrong type or an unusable value"""
+    for key, expected in KEY_TYPES.items():
+        if key in value and not isinstance(value[key], expected):
+            yield f"{key} should be a {expected.__name__}, not a {type(value[key]).__name__}"
+    for key, item in value.items():
+        if USAGE_DESCRIPTION_RE.fullmatch(key) and (not isinstance(item, str) or not item.strip()):
+            yield f"{key} must be a non-empty string; App Review rejects empty usage descriptions"
+    for key in ('CFBundleShortVersionString', 'CFBundleVersion'):
+        item = value.get(key)
+        if isinstance(item, str) and not BUILD_VARIABLE_RE.search(item) and not VERSION_RE.fullmatch(item):
+            yield f"{key} '{item}' should be one to three period-separated integers"
+    for key, item in value.items():
+        if isinstance(item, str) and UNFILLED_RE.search(item):
+            yield f"{key} still holds a placeholder"
+
+
+def render(template, environ):
+    """
+    Fill a template dict from `environ`; returns (rendered, missing names)
+
+    A top-level key with an environment variable of the same name takes that
+    value, converted to the template value's type, and ${NAME} in any string
+    is replaced by the variable's value.
+    """
+    missing = []
+
+    def substitute(match):
+        if match.group(1) in environ:
+            return environ[match.group(1)]
+        missing.append(match.group(1))
+        return match.group(0)
+
+    def fill(value):
+        if isinstance(value, str):
+            return PLACEHOLDER_RE.sub(substitute, value)
+        if isinstance(value, dict):
+            return {key: fill(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [fill(item) for item in value]
+        return value
+
+    rendered = {}
+    for key, value in template.items():
+        if key in environ and not isinstance(value, (dict, list)):
+            rendered[key] = convert(environ[key], value, key)
+        else:
+            rendered[key] = fill(value)
+    return rendered, missing
+
+
+def convert(text, like, key):
+    """Return environment string `text` as the type of template value `like`"""
+    if isinstance(like, bool):
+        if text.lower() not in ('1', '0', 'yes', 'no', 'true', 'false'):
+            raise PlistError(f"{key} must be a boolean, got '{text}'")
+        return text.lower() in ('1', 'yes', 'true')
+    if isinstance(like, (int, float)):
+        try:
+            return type(like)(text)
+        except ValueError:
+            raise PlistError(f"{key} must be a {type(like).__name__}, got '{text}'") from None
+    if isinstance(like, datetime.datetime):
+        return datetime.datetime.fromisoformat(text)
+    if isinstance(like, bytes):
+        return text.encode('utf-8')
+    return text
+
+
+def resource_plists(project_file):
+    """Return the project-relative paths of the plists copied by Resources build phases"""
+    project = Project.load(project_file)
+    paths = []
+    for phase_id in project.of_isa('PBXResourcesBuildPhase'):
+        for build_id in project.objects[phase_id].get('files', []):
+            file_id = (project.get(build_id) or {}).get('fileRef')
+            path = project.path_of(file_id) if file_id else None
+            if path and path.endswith('.plist') and os.path.basename(path) != 'Info.plist':
+                paths.append(path)
+    return paths
+
+
+def print_conflicts(conflicts):
+    for key_path, values in conflicts:
+        print(f"⚠️  Conflict in {key_path}:")
+        for index, (name, value) in enumerate(values):
+            print(f"     {'✓' if index == 0 else ' '} {name}: {value!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge, validate, render and compile plists")
+    commands = parser.add_subparsers(dest="command", required=True)
+    merge_parser = commands.add_parser("merge", help="merge plists into one, earlier sources winning conflicts")
+    merge_parser.add_argument("sources", nargs="*", default=[INFO_PLIST, DUPLICATE_PLIST])
+    merge_parser.add_argument("--output", default=INFO_PLIST, help="merged plist to write")
+    merge_parser.add_argument("--allow-conflicts", action="store_true",
+                              help="write even if sources conflict, earlier sources winning; by default "
+                                   "nothing is written and the exit status is 1")
+    validate_parser = commands.add_parser("validate", help="check well-known keys' types and values")
+    validate_parser.add_argument("plists", nargs="*", default=[INFO_PLIST])
+    render_parser = commands.add_parser("render", help="fill a template from environment variables")
+    render_parser.add_argument("template", nargs="?", default=SECRETS_TEMPLATE)
+    render_parser.add_argument("output", nargs="?", default=SECRETS_PLIST)
+    render_parser.add_argument("--xml", action="store_true", help="write XML instead of a binary plist")
+    compile_parser = commands.add_parser("compile", help="write binary copies of bundled plists")
+    compile_parser.add_argument("plists", nargs="*", help="default: the plists in the project's Resources phases")
+    compile_parser.add_argument("--output", required=True, help="directory for the binary plists")
+    compile_parser.add_argument("--project", default=PROJECT_FILE, help="path to project.pbxproj")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "merge":
+            with phase('parse'):
+                sources = [(path, load(path)) for path in args.sources if os.path.exists(path)]
+            if not sources:
+                print("❌ No plists to merge")
+                return 1
+            merged, conflicts = merge(sources)
+            print_conflicts(conflicts)
+            if conflicts and not args.allow_conflicts:
+                print(f"❌ {len(conflicts)} conflicts; nothing written (--allow-conflicts to keep the first source's values)")
+                return 1
+            # Rewriting through plistlib would reformat a hand-kept output, so only when its contents change
+            existing = load(args.output) if os.path.exists(args.output) else None
+            changed = merged != existing and write(args.output, merged)
+            print(f"✅ Merged {len(sources)} plists into {args.output}" if changed else f"⏭️  {args.output} unchanged")
+            return 0
+
+        if args.command == "validate":
+            problems = 0
+            for path in args.plists:
+                for message in validate(load(path)):
+                    print(f"❌ {path}: {message}")
+                    problems += 1
+            if not problems:
+                print(f"✅ {len(args.plists)} plists valid")
+            return 1 if problems else 0
+
+        if args.command == "render":
+            rendered, missing = render(load(args.template), os.environ)
+            problems = [f"${{{name}}} is not set" for name in sorted(set(missing))] + list(validate(rendered))
+            for message in problems:
+                print(f"❌ {args.template}: {message}")
+            if problems:
+                return 1
+            changed = write(args.output, rendered, binary=not args.xml)
+            print(f"✅ Rendered {args.output}" if changed else f"⏭️  {args.output} unchanged")
+            return 0
+
+        plists = args.plists or resource_plists(args.project)
+        written = 0
+        for path in plists:
+            written += write(os.path.join(args.output, os.path.basename(path)), load(path), binary=True)
+        print(f"✅ Compiled {written} of {len(plists)} plists to binary ({len(plists) - written} unchanged)")
+        return 0
+    except (OSError, ParseError, PlistError) as e:
+        print(f"❌ {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    exit(main())
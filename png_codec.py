@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Minimal PNG codec for the asset tooling
+Decodes, resizes and encodes 8-bit non-interlaced PNGs using only zlib
+
+Row filters are applied with bytewise arithmetic on whole rows held as Python
+integers, and resampling works on per-channel column slices, so the hot loops
+run in C rather than per pixel.
+"""
+
+import struct
+import zlib
+
+SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Channels per pixel for each PNG color type (palette images decode to RGB/RGBA)
+CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+COLOR_TYPES = {1: 0, 2: 4, 3: 2, 4: 6}
+
+# Ancillary chunks that change how pixels are displayed, kept on re-encode
+COLOR_CHUNKS = (b'sRGB', b'gAMA', b'cHRM', b'iCCP')
+
+# Signed magnitude of each byte, used to score filtered rows
+_MAGNITUDE = bytes(min(b, 256 - b) for b in range(256))
+
+
+class PNGError(Exception):
+    """Raised for malformed or unsupported PNG data"""
+
+
+class Image:
+    """Decoded pixels: rows of `width * channels` bytes, concatenated top to bottom"""
+
+    def __init__(self, width, height, channels, pixels, chunks=()):
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self.pixels = pixels
+        self.chunks = list(chunks)
+
+    @property
+    def stride(self):
+        return self.width * self.channels
+
+
+def read_chunks(data):
+    """Return [(type, body)] for every chunk, checking the signature and CRCs"""
+    if not data.startswith(SIGNATURE):
+        raise PNGError("Not a PNG file")
+    chunks = []
+    pos = len(SIGNATURE)
+    while pos < len(data):
+        if pos + 8 > len(data):
+            raise PNGError("Truncated chunk header")
+        length, kind = struct.unpack('>I4s', data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        crc, = struct.unpack('>I', data[pos + 8 + length:pos + 12 + length])
+        if len(body) != length or zlib.crc32(kind + body) != crc:
+            raise PNGError(f"Corrupt {kind.decode('latin-1')} chunk")
+        chunks.append((kind, body))
+        pos += 12 + length
+        if kind == b'IEND':
+            break
+    return chunks
+
+
+def write_chunks(chunks):
+    """Serialize [(type, body)] back into PNG bytes"""
+    parts = [SIGNATURE]
+    for kind, body in chunks:
+        parts.append(struct.pack('>I4s', len(body), kind))
+        parts.append(body)
+        parts.append(struct.pack('>I', zlib.crc32(kind + body)))
+    return b''.join(parts)
+
+
+def header(chunks):
+    """Return (width, height, bit depth, color type, interlace) from IHDR"""
+    if not chunks or chunks[0][0] != b'IHDR':
+        raise PNGError("Missing IHDR")
+    width, height, depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', chunks[0][1])
+    return width, height, depth, color_type, interlace
+
+
+def image_size(path):
+    """Return (width, height) from the IHDR without decoding pixels"""
+    with open(path, 'rb') as f:
+        head = f.read(33)
+    if not head.startswith(SIGNATURE) or head[12:16] != b'IHDR':
+        raise PNGError(f"Not a PNG file: {path}")
+    return struct.unpack('>II', head[16:24])
+
+
+def _swar_masks(length):
+    low = int.from_bytes(b'\x7f' * length, 'big')
+    high = int.from_bytes(b'\x80' * length, 'big')
+    return low, high
+
+
+def _add_bytes(a, b):
+    """Bytewise (a + b) mod 256 of two equal-length byte strings"""
+    low, high = _swar_masks(len(a))
+    x = int.from_bytes(a, 'big')
+    y = int.from_bytes(b, 'big')
+    return (((x & low) + (y & low)) ^ ((x ^ y) & high)).to_bytes(len(a), 'big')
+
+
+def _sub_bytes(a, b):
+    """Bytewise (a - b) mod 256 of two equal-length byte strings"""
+    low, high = _swar_masks(len(a))
+    x = int.from_bytes(a, 'big')
+    y = int.from_bytes(b, 'big')
+    return (((x | high) - (y & low)) ^ ((x ^ y ^ high) & high)).to_bytes(len(a), 'big')
+
+
+def _unfilter(raw, width, height, bpp):
+    stride = width * bpp
+    if len(raw) < (stride + 1) * height:
+        raise PNGError("Image data is truncated")
+    out = bytearray(stride * height)
+    prev = bytes(stride)
+    pos = 0
+    for y in range(height):
+        kind = raw[pos]
+        line = bytearray(raw[pos + 1:pos + 1 + stride])
+        pos += stride + 1
+        if kind == 1:
+            for i in range(bpp, stride):
+                line[i] = (line[i] + line[i - bpp]) & 0xFF
+        elif kind == 2:
+            line = bytearray(_add_bytes(line, prev))
+        elif kind == 3:
+            for i in range(bpp):
+                line[i] = (line[i] + (prev[i] >> 1)) & 0xFF
+            for i in range(bpp, stride):
+                line[i] = (line[i] + ((line[i - bpp] + prev[i]) >> 1)) & 0xFF
+        elif kind == 4:
+            for i in range(bpp):
+                line[i] = (line[i] + prev[i]) & 0xFF
+            for i in range(bpp, stride):
+                a = line[i - bpp]
+                b = prev[i]
+                c = prev[i - bpp]
+                p = a + b - c
+                pa = abs(p - a)
+                pb = abs(p - b)
+                pc = abs(p - c)
+                if pa <= pb and pa <= pc:
+                    line[i] = (line[i] + a) & 0xFF
+                elif pb <= pc:
+                    line[i] = (line[i] + b) & 0xFF
+                else:
+                    line[i] = (line[i] + c) & 0xFF
+        elif kind != 0:
+            raise PNGError(f"Unknown filter type {kind}")
+        out[y * stride:(y + 1) * stride] = line
+        prev = line
+    return out
+
+
+def decode(data):
+    """Decode PNG bytes into an Image (8-bit, non-interlaced; palettes are expanded)"""
+    chunks = read_chunks(data)
+    width, height, depth, color_type, interlace = header(chunks)
+    if depth != 8 or interlace or color_type not in CHANNELS:
+        raise PNGError(f"Unsupported PNG: bit depth {depth}, color type {color_type}, interlace {interlace}")
+    raw = zlib.decompress(b''.join(body for kind, body in chunks if kind == b'IDAT'))
+    channels = CHANNELS[color_type]
+    pixels = _unfilter(raw, width, height, channels)
+    if color_type == 3:
+        palette = next((body for kind, body in chunks if kind == b'PLTE'), None)
+        if palette is None:
+            raise PNGError("Palette image without PLTE")
+        alpha = next((body for kind, body in chunks if kind == b'tRNS'), b'')
+        if alpha:
+            table = [palette[i * 3:i * 3 + 3] + bytes([alpha[i] if i < len(alpha) else 255])
+                     for i in range(len(palette) // 3)]
+            channels = 4
+        else:
+            table = [palette[i * 3:i * 3 + 3] for i in range(len(palette) // 3)]
+            channels = 3
+        pixels = b''.join(table[index] for index in pixels)
+    kept = [(kind, body) for kind, body in chunks if kind in COLOR_CHUNKS]
+    return Image(width, height, channels, bytes(pixels), kept)
+
+
+def _filter_rows(image):
+    """Yield each row with the cheapest of the None, Sub and Up filters"""
+    stride = image.stride
+    bpp = image.channels
+    pixels = image.pixels
+    prev = bytes(stride)
+    for y in range(image.height):
+        line = pixels[y * stride:(y + 1) * stride]
+        candidates = (
+            (b'\x00', line),
+            (b'\x01', _sub_bytes(line, bytes(bpp) + line[:-bpp])),
+            (b'\x02', _sub_bytes(line, prev)),
+        )
+        kind, filtered = min(candidates, key=lambda c: sum(c[1].translate(_MAGNITUDE)))
+        yield kind
+        yield filtered
+        prev = line
+
+
+def encode(image, level=9, chunks=None):
+    """Encode an Image as PNG bytes at the given zlib level"""
+    ihdr = struct.pack('>IIBBBBB', image.width, image.height, 8, COLOR_TYPES[image.channels], 0, 0, 0)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 15, 9)
+    data = b''.join(compressor.compress(part) for part in _filter_rows(image)) + compressor.flush()
+    extra = image.chunks if chunks is None else chunks
+    return write_chunks([(b'IHDR', ihdr), *extra, (b'IDAT', data), (b'IEND', b'')])
+
+
+def _weights(source, target):
+    """Return, for each target index, the (source index, weight) pairs of an area average"""
+    scale = source / target
+    result = []
+    for i in range(target):
+        start = i * scale
+        end = start + scale
+        taps = []
+        j = int(start)
+        while j < end and j < source:
+            weight = min(end, j + 1) - max(start, j)
+            if weight > 1e-9:
+                taps.append((j, weight / scale))
+            j += 1
+        result.append(taps)
+    return result
+
+
+def _combine(vectors, taps):
+    if len(taps) == 1:
+        j, weight = taps[0]
+        return [v * weight for v in vectors[j]]
+    (j, weight), *rest = taps
+    total = [v * weight for v in vectors[j]]
+    for j, weight in rest:
+        total = [t + v * weight for t, v in zip(total, vectors[j])]
+    return total
+
+
+def resize(image, width, height):
+    """Return a copy of `image` resampled to width x height by area averaging"""
+    channels = image.channels
+    stride = image.stride
+    pixels = image.pixels
+    columns = [pixels[k::stride] for k in range(stride)]
+
+    # Average with alpha-premultiplied colors so transparent pixels don't bleed
+    alpha = channels in (2, 4)
+    if alpha:
+        for k in range(stride):
+            if k % channels != channels - 1:
+                a = columns[k + channels - 1 - k % channels]
+                columns[k] = [v * w / 255 for v, w in zip(columns[k], a)]
+
+    x_taps = _weights(image.width, width)
+    resized_columns = [
+        _combine(columns, [(j * channels + c, weight) for j, weight in x_taps[x]])
+        for x in range(width) for c in range(channels)
+    ]
+    rows = list(zip(*resized_columns))
+    y_taps = _weights(image.height, height)
+    out = bytearray()
+    for y in range(height):
+        row = _combine(rows, y_taps[y])
+        if alpha:
+            for k in range(0, len(row), channels):
+                a = row[k + channels - 1]
+                for c in range(channels - 1):
+                    row[k + c] = row[k + c] * 255 / a if a else 0
+        out += bytes(min(255, int(v + 0.5)) for v in row)
+    return Image(width, height, channels, bytes(out), image.chunks)
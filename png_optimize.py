@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+PNG recompression for the asset catalogs
+Losslessly re-deflates every PNG at maximum compression, drops ancillary
+chunks that don't affect how pixels are displayed, and reports the bytes saved
+per catalog
+
+Usage: png_optimize.py [CATALOG_OR_PNG ...]
+Images whose content hash is already in the results cache are not reprocessed.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import png_codec
+from pbxproj import write_atomic
+from scanner import cache_file, scan
+
+CATALOGS = ("TrusendaCRM/Assets.xcassets", "TrusendaCRM/Resources/Assets.xcassets")
+CACHE_FILE = cache_file(".", "png-optimize.json")
+
+# Bump when the recompression changes so cached results are discarded
+OPTIMIZE_VERSION = 1
+
+# Ancillary chunks kept because dropping them would change the rendered pixels
+KEEP_ANCILLARY = (b'tRNS',) + png_codec.COLOR_CHUNKS
+
+STRATEGIES = (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED)
+
+
+def load_cache():
+    try:
+        with open(CACHE_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data.get("optimized", {}) if data.get("version") == OPTIMIZE_VERSION else {}
+
+
+def save_cache(optimized):
+    os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+    data = {"version": OPTIMIZE_VERSION, "optimized": optimized}
+    write_atomic(CACHE_FILE, [json.dumps(data, indent=1, sort_keys=True)])
+
+
+def is_kept(kind):
+    """Critical chunks have an uppercase first letter; ancillary ones are kept only if listed"""
+    return kind[:1].isupper() or kind in KEEP_ANCILLARY
+
+
+def deflate(raw):
+    """Return the smallest zlib stream for `raw` across the strategies tried"""
+    best = None
+    for strategy in STRATEGIES:
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+        data = compressor.compress(raw) + compressor.flush()
+        if best is None or len(data) < len(best):
+            best = data
+    return best
+
+
+def reduce_channels(image):
+    """Drop an all-opaque alpha channel and collapse gray RGB, returning a new Image or None"""
+    pixels = image.pixels
+    channels = image.channels
+    if channels in (2, 4) and pixels[channels - 1::channels] == b'\xff' * (image.width * image.height):
+        out = bytearray(image.width * image.height * (channels - 1))
+        for c in range(channels - 1):
+            out[c::channels - 1] = pixels[c::channels]
+        pixels = bytes(out)
+        channels -= 1
+    if channels in (3, 4) and pixels[0::channels] == pixels[1::channels] == pixels[2::channels]:
+        out = bytearray(image.width * image.height * (channels - 2))
+        out[0::channels - 2] = pixels[0::channels]
+        if channels == 4:
+            out[1::2] = pixels[3::4]
+        pixels = bytes(out)
+        channels -= 2
+    if channels == image.channels:
+        return None
+    return png_codec.Image(image.width, image.height, channels, pixels, image.chunks)
+
+
+def recompress(data):
+    """
+    Return the smallest lossless re-encoding of PNG bytes, or `data` itself
+
+    Two candidates are tried: the original filtered rows re-deflated as one
+    IDAT, and for 8-bit truecolor/gray images a full re-encode after dropping
+    redundant channels. Either way only critical and pixel-affecting chunks
+    are kept.
+    """
+    chunks = png_codec.read_chunks(data)
+    width, height, depth, color_type, interlace = png_codec.header(chunks)
+    kept = []
+    for kind, body in chunks:
+        if kind == b'IDAT':
+            if not any(k == b'IDAT' for k, _ in kept):
+                kept.append((kind, None))
+        elif is_kept(kind):
+            kept.append((kind, body))
+    raw = zlib.decompress(b''.join(body for kind, body in chunks if kind == b'IDAT'))
+    idat = deflate(raw)
+    candidates = [png_codec.write_chunks([(kind, idat if body is None else body) for kind, body in kept])]
+
+    has_trns = any(kind == b'tRNS' for kind, _ in chunks)
+    if depth == 8 and not interlace and color_type != 3 and not has_trns:
+        image = png_codec.decode(data)
+        image = reduce_channels(image) or image
+        candidates.append(png_codec.encode(image))
+
+    best = min(candidates, key=len)
+    return best if len(best) < len(data) else data
+
+
+def optimize_file(path):
+    """Worker: recompress one PNG in place; returns (path, bytes before, bytes after, content hash)"""
+    with open(path, "rb") as f:
+        data = f.read()
+    result = recompress(data)
+    if result is not data:
+        write_atomic(path, [result], binary=True)
+    return path, len(data), len(result), hashlib.sha256(result).hexdigest()
+
+
+def find_pngs(targets):
+    """Return {catalog or file: [png paths]} for the given catalogs and PNG files"""
+    groups = {}
+    for target in targets:
+        if os.path.isdir(target):
+            groups[target] = [os.path.join(target, path) for path in scan(target, (".png", ".PNG"))]
+        elif os.path.isfile(target):
+            groups.setdefault(os.path.dirname(target) or ".", []).append(target)
+    return groups
+
+
+def optimize(targets, workers=None):
+    """Recompress every PNG under `targets`; returns {group: (files, bytes before, bytes after)}"""
+    optimized = load_cache()
+    groups = find_pngs(targets)
+    report = {}
+    jobs = []
+    for group, paths in groups.items():
+        report[group] = [0, 0, 0]
+        for path in paths:
+            with open(path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            size = os.path.getsize(path)
+            if digest in optimized:
+                report[group][1] += size
+                report[group][2] += size
+                continue
+            jobs.append((group, path))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [(group, pool.submit(optimize_file, path)) for group, path in jobs]
+        for group, future in futures:
+            path, before, after, digest = future.result()
+            optimized[digest] = after
+            report[group][0] += 1
+            report[group][1] += before
+            report[group][2] += after
+            if after < before:
+                print(f"✅ {path}: {before} -> {after} bytes")
+            else:
+                print(f"⏭️  {path}: already optimal")
+
+    if jobs:
+        save_cache(optimized)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Losslessly recompress PNGs in asset catalogs")
+    parser.add_argument("targets", nargs="*", help="asset catalogs or PNG files (default: the app's catalogs)")
+    parser.add_argument("--jobs", type=int, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    print("🗜️  PNG Optimizer")
+    print("=" * 50)
+    targets = args.targets or [catalog for catalog in CATALOGS if os.path.isdir(catalog)]
+    report = optimize(targets, args.jobs)
+
+    print("\n📊 Bytes saved:")
+    total_before = total_after = 0
+    for group, (processed, before, after) in report.items():
+        saved = before - after
+        percent = saved * 100 / before if before else 0
+        print(f"   {group}: {saved} bytes ({percent:.1f}%), {processed} images processed")
+        total_before += before
+        total_after += after
+    print(f"\n✅ Total: {total_before - total_after} bytes saved")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+CocoaPods state fingerprint
+Tells whether `pod install` or a project sync is actually needed before a
+build: checks the Podfile against Podfile.lock's checksum, Podfile.lock
+against Pods/Manifest.lock, the Pods wiring in project.pbxproj ([CP] build
+phases, Pods xcconfig base configurations, the Pods framework) and the Swift
+files on disk against the project
+
+Usage: pods_state.py [--force]
+Exits 0 when nothing needs to run and 1 when a step is needed. The verdict is
+stored with a fingerprint of its inputs; while the inputs' mtimes and sizes are
+unchanged it is reused without reading anything, and while their contents are
+unchanged without parsing anything.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+
+from scanner import cache_file, scan
+
+PROJECT_FILE = "TrusendaCRM.xcodeproj/project.pbxproj"
+WORKSPACE = "TrusendaCRM.xcworkspace"
+SOURCE_DIR = "TrusendaCRM"
+PODFILE = "Podfile"
+PODFILE_LOCK = "Podfile.lock"
+PODS_DIR = "Pods"
+MANIFEST_LOCK = "Pods/Manifest.lock"
+PODS_PROJECT = "Pods/Pods.xcodeproj/project.pbxproj"
+STATE_FILE = cache_file(".", "pods-state.json")
+
+# Bump when the checks change so stored verdicts are discarded
+STATE_VERSION = 2
+
+INPUTS = (PODFILE, PODFILE_LOCK, MANIFEST_LOCK, PROJECT_FILE, PODS_PROJECT,
+          os.path.join(WORKSPACE, "contents.xcworkspacedata"))
+
+POD_INSTALL = "pod install"
+SYNC_PROJECT = "xctool.py generate --sync"
+
+CHECK_MANIFEST_PHASE = "[CP] Check Pods Manifest.lock"
+EMBED_FRAMEWORKS_PHASE = "[CP] Embed Pods Frameworks"
+PODFILE_TARGET_RE = re.compile(r'''^\s*target\s+['"]([^'"]+)['"]''', re.MULTILINE)
+PODFILE_CHECKSUM_RE = re.compile(r'^PODFILE CHECKSUM: (\w+)$', re.MULTILINE)
+LOCKED_POD_RE = re.compile(r'^  - "?([\w.+-]+)(?:/[^ ]+)? \(', re.MULTILINE)
+PODS_SCRIPT_RE = re.compile(r'"\$\{PODS_ROOT\}/([^"$]+\.sh)\\?"')
+
+
+def stamps(paths):
+    """Return {path: [mtime_ns, size]} for files and, recursively, the directories under SOURCE_DIR"""
+    result = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            result[path] = [stat.st_mtime_ns, stat.st_size]
+        except OSError:
+            result[path] = None
+    # Adding or removing a Swift file changes its directory's mtime
+    pending = [SOURCE_DIR]
+    while pending:
+        directory = pending.pop()
+        try:
+            result[directory] = [os.stat(directory).st_mtime_ns, 0]
+            with os.scandir(directory) as entries:
+                pending.extend(entry.path for entry in entries
+                               if entry.is_dir(follow_symlinks=False) and not entry.name.startswith('.'))
+        except OSError:
+            result[directory] = None
+    return result
+
+
+def fingerprint(swift_files, scripts):
+    """Hash the inputs' and the Pods support scripts' contents, and the list of Swift files"""
+    hasher = hashlib.sha256()
+    for path in INPUTS + tuple(scripts):
+        hasher.update(path.encode('utf-8') + b'\0')
+        try:
+            with open(path, 'rb') as f:
+                hasher.update(hashlib.sha256(f.read()).digest())
+        except OSError:
+            hasher.update(b'missing')
+    hasher.update('\n'.join(swift_files).encode('utf-8'))
+    return hasher.hexdigest()
+
+
+def read_text(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def check_locks():
+    """Yield reasons `pod install` is needed, judging by the Podfile and the lock files"""
+    podfile = read_text(PODFILE)
+    if podfile is None:
+        return
+    lock = read_text(PODFILE_LOCK)
+    if lock is None:
+        yield "Podfile.lock is missing"
+        return
+    checksum = PODFILE_CHECKSUM_RE.search(lock)
+    with open(PODFILE, 'rb') as f:
+        actual = hashlib.sha1(f.read()).hexdigest()
+    if checksum is None or checksum.group(1) != actual:
+        yield "Podfile changed since Podfile.lock was written"
+    manifest = read_text(MANIFEST_LOCK)
+    if manifest is None:
+        yield "Pods/Manifest.lock is missing"
+    elif manifest != lock:
+        yield "Pods/Manifest.lock differs from Podfile.lock (the sandbox is out of sync)"
+    pods = lock.split('\n\n', 1)[0]
+    for name in sorted(set(LOCKED_POD_RE.findall(pods))):
+        if not os.path.isdir(os.path.join(PODS_DIR, name)):
+            yield f"Pods/{name} is missing"
+    if not os.path.exists(PODS_PROJECT):
+        yield "Pods/Pods.xcodeproj is missing"
+
+
+def check_wiring(project, podfile):
+    """Yield reasons `pod install` is needed, judging by the Pods integration in the app project"""
+    from workspace import member_projects
+
+    if os.path.isdir(WORKSPACE) and os.path.dirname(PODS_PROJECT) not in member_projects(WORKSPACE):
+        yield f"{WORKSPACE} does not list Pods/Pods.xcodeproj"
+    frameworks = 'use_frameworks!' in re.sub(r'#.*', '', podfile)
+    for target_name in PODFILE_TARGET_RE.findall(podfile):
+        aggregate = f"Pods-{target_name}"
+        target_id = project.target(target_name)
+        if target_id is None:
+            yield f"the project has no {target_name} target"
+            continue
+        target = project.objects[target_id]
+        # Only script phases are named; the standard ones share no name
+        phases = [(project.objects[phase_id].get('name'), phase_id) for phase_id in target.get('buildPhases', [])
+                  if phase_id in project.objects]
+        names = {name for name, _ in phases}
+        if CHECK_MANIFEST_PHASE not in names:
+            yield f"{target_name} has no '{CHECK_MANIFEST_PHASE}' phase"
+        if frameworks and EMBED_FRAMEWORKS_PHASE not in names:
+            yield f"{target_name} has no '{EMBED_FRAMEWORKS_PHASE}' phase"
+        for name, phase_id in phases:
+            script = project.objects[phase_id].get('shellScript', '')
+            for path in PODS_SCRIPT_RE.findall(script):
+                if not os.path.exists(os.path.join(PODS_DIR, path)):
+                    yield f"'{name}' runs {PODS_DIR}/{path}, which does not exist"
+
+        product = aggregate.replace('-', '_') + ('.framework' if frameworks else '.a')
+        if not frameworks:
+            product = 'lib' + product
+        linked = [project.objects[build_id].get('fileRef') for _, phase_id in phases
+                  if project.objects[phase_id].get('isa') == 'PBXFrameworksBuildPhase'
+                  for build_id in project.objects[phase_id].get('files', []) if build_id in project.objects]
+        if not any(os.path.basename((project.get(file_id) or {}).get('path', '')) == product for file_id in linked):
+            yield f"{target_name} does not link {product}"
+
+        configuration_list = project.get(target.get('buildConfigurationList')) or {}
+        for config_id in configuration_list.get('buildConfigurations', []):
+            config = project.objects.get(config_id, {})
+            expected = f"{aggregate}.{config.get('name', '').lower()}.xcconfig"
+            base_id = config.get('baseConfigurationReference')
+            path = project.path_of(base_id) if base_id in project.objects else None
+            if path is None or os.path.basename(path) != expected:
+                yield f"{target_name} {config.get('name')} is not based on {expected}"
+            elif not os.path.exists(path):
+                yield f"{path} does not exist"
+
+
+def support_scripts(project):
+    """Return the Pods support scripts the project's build phases run, such as the [CP] embed script"""
+    scripts = set()
+    for phase in project.of_isa('PBXShellScriptBuildPhase').values():
+        scripts.update(os.path.join(PODS_DIR, path) for path in PODS_SCRIPT_RE.findall(phase.get('shellScript', '')))
+    return sorted(scripts)
+
+
+def check_sources(project, swift_files):
+    """Yield reasons the project needs a sync for Swift files added or removed on disk"""
+    known = {path for path in project.file_paths() if path.endswith('.swift') and path.startswith(SOURCE_DIR + '/')}
+    added = len(set(swift_files) - known)
+    removed = len(known - set(swift_files))
+    if added or removed:
+        yield f"{added} Swift files are not in the project and {removed} in it are gone from disk"
+
+
+def evaluate(swift_files):
+    """Run every check; returns ({step: [reasons]} for the steps that are needed, support scripts)"""
+    from pbxproj import ParseError, Project
+
+    steps = {}
+    steps[POD_INSTALL] = list(check_locks())
+    try:
+        project = Project.load(PROJECT_FILE)
+    except (OSError, ParseError) as e:
+        steps[POD_INSTALL].append(f"cannot read {PROJECT_FILE}: {e}")
+        return {step: reasons for step, reasons in steps.items() if reasons}, []
+    podfile = read_text(PODFILE)
+    if podfile is not None:
+        steps[POD_INSTALL].extend(check_wiring(project, podfile))
+    steps[SYNC_PROJECT] = list(check_sources(project, swift_files))
+    return {step: reasons for step, reasons in steps.items() if reasons}, support_scripts(project)
+
+
+def load_state():
+    try:
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return state if state.get('version') == STATE_VERSION else {}
+
+
+def save_state(state):
+    from pbxproj import write_atomic
+
+    state['version'] = STATE_VERSION
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    write_atomic(STATE_FILE, [json.dumps(state, indent=1, sort_keys=True)])
+
+
+def report(steps, source):
+    if not steps:
+        print(f"✅ Pods and project are in sync; nothing to run ({source})")
+        return 0
+    for step, reasons in steps.items():
+        print(f"🔧 Run: {step}")
+        for reason in reasons:
+            print(f"   - {reason}")
+    # A full regeneration drops the [CP] phases; say so rather than let it be rerun defensively
+    if SYNC_PROJECT in steps:
+        print("   Use --sync: a full regeneration drops the Pods wiring and would need another pod install")
+    return 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report whether pod install or a project sync is needed")
+    parser.add_argument("--force", action="store_true", help="ignore the stored fingerprint and check everything")
+    args = parser.parse_args(argv)
+
+    state = {} if args.force else load_state()
+    # The scripts the [CP] phases run come from the last check; deleting one must invalidate the verdict
+    scripts = state.get('scripts', [])
+    current = stamps(INPUTS + tuple(scripts))
+    if state.get('stamps') == current:
+        return report(state['steps'], "unchanged since last check")
+
+    swift_files = [f'{SOURCE_DIR}/{path}' for path in
+                   scan(SOURCE_DIR, '.swift', cache_path=cache_file('.', 'scan-sources.json'))]
+    digest = fingerprint(swift_files, scripts)
+    if state.get('fingerprint') == digest:
+        steps, source = state['steps'], "contents unchanged since last check"
+    else:
+        steps, found = evaluate(swift_files)
+        source = "checked"
+        if found != scripts:
+            scripts = found
+            current = stamps(INPUTS + tuple(scripts))
+            digest = fingerprint(swift_files, scripts)
+    save_state({'stamps': current, 'fingerprint': digest, 'steps': steps, 'scripts': scripts})
+    return report(steps, source)
+
+
+if __name__ == "__main__":
+    exit(main())
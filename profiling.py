@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Per-phase profiling for the project tools
+Tools mark their stages with `with phase('parse'):`; when profiling is off
+that is a shared no-op context, and when it is on each phase records wall
+time, CPU time and peak traced memory, optionally with cProfile hot spots
+
+Usage: profiling.py BEFORE.json AFTER.json
+Compares two profiles written by `xctool.py --profile` phase by phase.
+"""
+
+import contextlib
+import json
+import os
+import sys
+import time
+
+_NULL = contextlib.nullcontext()
+_active = None
+
+
+class Profiler:
+    """
+    Accumulates timings per phase name across every time the phase is entered
+
+    Phases nest: `wall` and `cpu` include nested phases, `self_wall` and
+    `self_cpu` exclude them. Peak memory comes from tracemalloc, which slows
+    Python code down while it runs; compare profiles with each other rather
+    than with unprofiled timings.
+    """
+
+    def __init__(self, hotspots=0):
+        import tracemalloc
+        self.tracemalloc = tracemalloc
+        self.hotspots = hotspots
+        self.phases = {}
+        self.stack = []
+        self.cprofile = None
+        self.started = None
+        self.total = None
+
+    def start(self):
+        self.tracemalloc.start()
+        if self.hotspots:
+            import cProfile
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+        self.started = (time.perf_counter(), time.process_time())
+
+    def stop(self):
+        wall = time.perf_counter() - self.started[0]
+        cpu = time.process_time() - self.started[1]
+        if self.cprofile:
+            self.cprofile.disable()
+        _, peak = self.tracemalloc.get_traced_memory()
+        peak = max([peak] + [record["peak_bytes"] for record in self.phases.values()])
+        self.tracemalloc.stop()
+        self.total = {"wall": wall, "cpu": cpu, "peak_bytes": peak}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        record = self.phases.setdefault(name, {"calls": 0, "wall": 0.0, "cpu": 0.0, "self_wall": 0.0,
+                                               "self_cpu": 0.0, "peak_bytes": 0})
+        if self.stack:
+            # The enclosing phase's peak so far must survive the reset below
+            parent = self.stack[-1]
+            parent["peak"] = max(parent["peak"], self.tracemalloc.get_traced_memory()[1])
+        self.tracemalloc.reset_peak()
+        frame = {"peak": 0, "child_wall": 0.0, "child_cpu": 0.0}
+        self.stack.append(frame)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            self.stack.pop()
+            peak = max(frame["peak"], self.tracemalloc.get_traced_memory()[1])
+            record["calls"] += 1
+            record["wall"] += wall
+            record["cpu"] += cpu
+            record["self_wall"] += wall - frame["child_wall"]
+            record["self_cpu"] += cpu - frame["child_cpu"]
+            record["peak_bytes"] = max(record["peak_bytes"], peak)
+            if self.stack:
+                parent = self.stack[-1]
+                parent["child_wall"] += wall
+                parent["child_cpu"] += cpu
+                parent["peak"] = max(parent["peak"], peak)
+
+    def hotspot_rows(self):
+        """Return the top functions by own time as [{function, file, line, calls, tottime, cumtime}]"""
+        import pstats
+        stats = pstats.Stats(self.cprofile)
+        rows = []
+        for (filename, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+            rows.append({"function": function, "file": filename, "line": line, "calls": calls,
+                         "tottime": tottime, "cumtime": cumtime})
+        rows.sort(key=lambda row: row["tottime"], reverse=True)
+        return rows[:self.hotspots]
+
+    def report(self, command, argv):
+        report = {
+            "command": command,
+            "argv": argv,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": sys.version.split()[0],
+            "total": self.total,
+            "phases": self.phases,
+        }
+        if self.cprofile:
+            report["hotspots"] = self.hotspot_rows()
+        return report
+
+
+def phase(name):
+    """Context manager timing a named phase of the active profiler; a no-op when none is active"""
+    return _active.phase(name) if _active is not None else _NULL
+
+
+def activate(profiler):
+    global _active
+    _active = profiler
+    profiler.start()
+
+
+def deactivate():
+    global _active
+    profiler, _active = _active, None
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+
+def compare(before, after):
+    """Yield (phase, metric, before, after) for every phase metric in either profile"""
+    names = list(before["phases"]) + [name for name in after["phases"] if name not in before["phases"]]
+    for name in ["total"] + names:
+        old = before["total"] if name == "total" else before["phases"].get(name, {})
+        new = after["total"] if name == "total" else after["phases"].get(name, {})
+        for metric in ("self_wall", "self_cpu", "peak_bytes") if name != "total" else ("wall", "cpu", "peak_bytes"):
+            yield name, metric, old.get(metric), new.get(metric)
+
+
+def format_metric(metric, value):
+    if value is None:
+        return f"{'-':>14}"
+    if metric == "peak_bytes":
+        return f"{value / 1024:>10.1f} KiB"
+    return f"{value * 1000:>11.2f} ms"
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2 or not all(os.path.exists(path) for path in argv):
+        print("Usage: profiling.py BEFORE.json AFTER.json")
+        return 2
+    with open(argv[0], "r", encoding="utf-8") as f:
+        before = json.load(f)
+    with open(argv[1], "r", encoding="utf-8") as f:
+        after = json.load(f)
+
+    print(f"📊 {before['command']} → {after['command']}")
+    for name, metric, old, new in compare(before, after):
+        change = f"{(new - old) * 100 / old:+.1f}%" if old and new is not None else ""
+        print(f"   {name:<12} {metric:<11} {format_metric(metric, old)} → {format_metric(metric, new)}  {change}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
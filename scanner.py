@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Source tree scanner
+Lists files with os.scandir across a thread pool, pruning heavy directories and
+caching each directory's listing against its mtime so repeat scans only reread
+directories that changed
+"""
+
+import fnmatch
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from pbxproj import write_atomic
+from profiling import phase
+
+# Directories never worth descending into for project tooling
+DEFAULT_PRUNE = (
+    '.git', '.toolcache', 'Pods', 'build', 'DerivedData', '__pycache__',
+    '*.xcassets', '*.xcodeproj', '*.xcworkspace', '*.xcframework', '*.bundle',
+)
+DEFAULT_IGNORE = ('.DS_Store',)
+
+CACHE_DIR = '.toolcache'
+CACHE_VERSION = 1
+
+
+def _matches(name, patterns):
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+
+
+class Scanner:
+    """
+    Concurrent directory scanner with prune/ignore rules and an mtime-keyed cache
+
+    `prune` patterns match directory names that are skipped entirely and
+    `ignore` patterns match file names left out of the results. A directory's
+    mtime changes whenever an entry is added, removed or renamed in it, so an
+    unchanged mtime means its cached listing can be reused without a scandir.
+    """
+
+    def __init__(self, root, prune=DEFAULT_PRUNE, ignore=DEFAULT_IGNORE, cache_path=None, workers=None):
+        self.root = os.path.abspath(root)
+        self.prune = tuple(prune)
+        self.ignore = tuple(ignore)
+        self.cache_path = cache_path
+        self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        self.cache = self._load_cache()
+        self.rescanned = 0
+
+    def _rules(self):
+        return {'version': CACHE_VERSION, 'prune': list(self.prune), 'ignore': list(self.ignore)}
+
+    def _load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get('rules') != self._rules() or data.get('root') != self.root:
+            return {}
+        return data.get('dirs', {})
+
+    def _save_cache(self, listings):
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        data = {'root': self.root, 'rules': self._rules(), 'dirs': listings}
+        write_atomic(self.cache_path, [json.dumps(data, separators=(',', ':'))])
+
+    def _list(self, relative):
+        """Return (mtime_ns, files, subdirs) for one directory, from cache when unchanged"""
+        path = os.path.join(self.root, relative) if relative else self.root
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        cached = self.cache.get(relative)
+        if cached is not None and cached[0] == mtime:
+            return cached
+        files, subdirs = [], []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if not _matches(entry.name, self.prune):
+                        subdirs.append(entry.name)
+                elif not _matches(entry.name, self.ignore):
+                    files.append(entry.name)
+        files.sort()
+        subdirs.sort()
+        self.rescanned += 1
+        return [mtime, files, subdirs]
+
+    def scan(self, suffixes=None):
+        """Return sorted root-relative paths of every file, optionally filtered by suffix"""
+        listings = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = {pool.submit(self._list, ''): ''}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    relative = pending.pop(future)
+                    listing = future.result()
+                    if listing is None:
+                        continue
+                    listings[relative] = listing
+                    for name in listing[2]:
+                        child = f"{relative}/{name}" if relative else name
+                        pending[pool.submit(self._list, child)] = child
+
+        if self.cache_path and (self.rescanned or listings.keys() != self.cache.keys()):
+            self._save_cache(listings)
+        self.cache = listings
+
+        paths = []
+        for relative, (_, files, _) in listings.items():
+            for name in files:
+                if suffixes is None or name.endswith(suffixes):
+                    paths.append(f"{relative}/{name}" if relative else name)
+        paths.sort()
+        return paths
+
+
+def scan(root, suffixes=None, prune=DEFAULT_PRUNE, ignore=DEFAULT_IGNORE, cache_path=None):
+    """Scan `root` once and return sorted root-relative file paths"""
+    with phase('scan'):
+        return Scanner(root, prune, ignore, cache_path).scan(suffixes)
+
+
+def cache_file(project_dir, name):
+    """Return the path of a named cache file under the project's .toolcache directory"""
+    return os.path.join(project_dir, CACHE_DIR, name)
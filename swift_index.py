@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Swift symbol index
+Tokenizes every Swift source in a process pool, extracts the type and
+function names each file declares and the identifiers it references, and
+reports files and declarations that nothing else uses
+
+Usage: swift_index.py [--source-dir DIR] [--jobs N]
+Results are cached per file by content hash, so repeat runs only tokenize
+files that changed. Names are matched without type information, so a name
+used anywhere keeps every declaration of it alive: the report errs towards
+missing dead code rather than flagging live code.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from pbxproj import write_atomic
+from scanner import cache_file, scan
+
+SOURCE_DIR = "TrusendaCRM"
+CACHE_FILE = cache_file(".", "swift-index.json")
+
+# Bump when tokenizing or extraction changes so cached results are discarded
+INDEX_VERSION = 2
+
+# Comments, string openers and parentheses; everything else is plain code
+CODE_RE = re.compile(r'//|/\*|(#*)("""|")|[()]')
+BLOCK_COMMENT_RE = re.compile(r'/\*|\*/')
+IDENTIFIER_RE = re.compile(r'`?([A-Za-z_][A-Za-z0-9_]*)`?')
+DECLARATION_RE = re.compile(r'''
+    (?P<modifiers>(?:@\w+(?:\([^)]*\))?\s+|\b(?:override|public|private|fileprivate|internal|open|final|static
+        |class|mutating|nonmutating|nonisolated|convenience|required|indirect|lazy|dynamic)\s+)*)
+    \b(?P<kind>class|struct|enum|protocol|actor|typealias|func)\s+`?(?P<name>[A-Za-z_][A-Za-z0-9_]*)`?
+    (?P<inherits>\s*(?:<[^>{]*>)?\s*:[^{=]*)?
+''', re.VERBOSE)
+
+# Declarations the compiler or a framework reaches without naming them in source
+IMPLICIT_MODIFIERS = ('override', '@objc', '@IBAction', '@main')
+IMPLICIT_CONFORMANCES = ('App', 'PreviewProvider', 'UIApplicationDelegate')
+IMPLICIT_FUNCS = {
+    'application', 'scene', 'sceneDidBecomeActive', 'sceneWillResignActive', 'sceneDidDisconnect',
+    'makeUIView', 'updateUIView', 'makeUIViewController', 'updateUIViewController', 'makeCoordinator',
+    'encode', 'hash', 'makeBody', '_body', 'effectValue', 'path', 'sizeThatFits', 'placeSubviews',
+    'userNotificationCenter',
+}
+TYPE_KINDS = ('class', 'struct', 'enum', 'protocol', 'actor')
+KEYWORDS = {'func', 'var', 'let', 'init', 'subscript', 'case'}
+
+
+def _block_comment_end(source, pos):
+    """Return the offset just past the */ closing a (possibly nested) block comment"""
+    depth = 1
+    while depth:
+        match = BLOCK_COMMENT_RE.search(source, pos)
+        if match is None:
+            return len(source)
+        depth += 1 if match.group() == '/*' else -1
+        pos = match.end()
+    return pos
+
+
+def _string_end(source, pos, hashes, delimiter, out):
+    """Skip a string literal's text, keeping the code of any interpolations; returns its end"""
+    closing = re.escape(delimiter + hashes)
+    escape = re.escape('\\' + hashes)
+    pattern = re.compile(f'{closing}|{escape}(\\()?')
+    while True:
+        match = pattern.search(source, pos)
+        if match is None:
+            return len(source)
+        out.append('\n' * source.count('\n', pos, match.start()))
+        if match.group().startswith(delimiter):
+            return match.end()
+        if match.group(1):
+            out.append(' (')
+            pos = _code(source, match.end(), out, interpolation=True)
+        else:
+            pos = match.end() + 1
+
+
+def _code(source, pos, out, interpolation=False):
+    """Append source code to `out` with comments and string text blanked; returns where it stopped"""
+    depth = 0
+    while True:
+        match = CODE_RE.search(source, pos)
+        if match is None:
+            out.append(source[pos:])
+            return len(source)
+        out.append(source[pos:match.start()])
+        token = match.group()
+        pos = match.end()
+        if token == '(':
+            depth += 1
+            out.append(token)
+        elif token == ')':
+            out.append(token)
+            if depth == 0 and interpolation:
+                return pos
+            depth -= 1
+        elif token == '//':
+            end = source.find('\n', pos)
+            pos = len(source) if end < 0 else end
+        elif token == '/*':
+            end = _block_comment_end(source, pos)
+            out.append('\n' * source.count('\n', pos, end))
+            pos = end
+        else:
+            out.append('""')
+            pos = _string_end(source, pos, match.group(1), match.group(2), out)
+
+
+def strip(source):
+    """Return Swift source with comments and string literal text removed, line numbers intact"""
+    out = []
+    _code(source, 0, out)
+    return ''.join(out)
+
+
+def index_source(source):
+    """
+    Return {'declared', 'referenced', 'main'} for one file's source
+
+    `declared` lists [name, kind, line, implicit]; `referenced` counts every
+    identifier except the names being declared.
+    """
+    code = strip(source)
+    declared = []
+    declaring = set()
+    for match in DECLARATION_RE.finditer(code):
+        name = match.group('name')
+        if name in KEYWORDS:
+            continue
+        kind = match.group('kind')
+        modifiers = match.group('modifiers')
+        inherits = re.findall(r'\w+', match.group('inherits') or '')
+        implicit = (any(modifier in modifiers for modifier in IMPLICIT_MODIFIERS)
+                    or any(conformance in inherits for conformance in IMPLICIT_CONFORMANCES)
+                    or (kind == 'func' and name in IMPLICIT_FUNCS))
+        declared.append([name, kind, code.count('\n', 0, match.start('name')) + 1, implicit])
+        declaring.add(match.start('name'))
+
+    referenced = {}
+    for match in IDENTIFIER_RE.finditer(code):
+        if match.start(1) not in declaring:
+            name = match.group(1)
+            referenced[name] = referenced.get(name, 0) + 1
+    return {'declared': declared, 'referenced': referenced, 'main': '@main' in code}
+
+
+def index_file(path):
+    """Worker: index one Swift file; returns (content hash, index)"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return hashlib.sha256(data).hexdigest(), index_source(data.decode('utf-8', 'replace'))
+
+
+def load_cache():
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data.get('files', {}) if data.get('version') == INDEX_VERSION else {}
+
+
+def save_cache(files):
+    os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+    write_atomic(CACHE_FILE, [json.dumps({'version': INDEX_VERSION, 'files': files}, sort_keys=True)])
+
+
+def build_index(source_dir=SOURCE_DIR, workers=None):
+    """
+    Return ({path: index}, number of files tokenized this run)
+
+    Files whose content hash is cached are not tokenized again; the rest
+    are spread over a process pool.
+    """
+    cached = load_cache()
+    paths = [os.path.join(source_dir, path) for path in scan(source_dir, '.swift')]
+    digests = {}
+    for path in paths:
+        with open(path, 'rb') as f:
+            digests[path] = hashlib.sha256(f.read()).hexdigest()
+
+    jobs = [path for path in paths if digests[path] not in cached]
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for path, (digest, result) in zip(jobs, pool.map(index_file, jobs, chunksize=8)):
+                digests[path] = digest
+                cached[digest] = result
+
+    files = {path: cached[digests[path]] for path in paths}
+    if jobs or len(cached) != len(set(digests.values())):
+        save_cache({digest: cached[digest] for digest in digests.values()})
+    return files, len(jobs)
+
+
+def find_dead(files):
+    """
+    Return (dead files, dead declarations) from a {path: index} mapping
+
+    A declaration is dead when its name is referenced nowhere. A file is dead
+    when it declares a type, isn't the app entry point, and no other file
+    references anything it declares. Files of extensions only are never
+    dead files, since the properties they add aren't indexed. Declarations reached implicitly
+    (overrides, @objc, previews, framework callbacks) never count as dead.
+    """
+    totals = {}
+    for index in files.values():
+        for name, count in index['referenced'].items():
+            totals[name] = totals.get(name, 0) + count
+
+    dead_files = []
+    dead_declarations = []
+    for path, index in files.items():
+        declared = index['declared']
+        for name, kind, line, implicit in declared:
+            if not implicit and not totals.get(name):
+                dead_declarations.append((path, line, kind, name))
+        if not any(kind in TYPE_KINDS for _, kind, *_ in declared) or any(implicit for *_, implicit in declared):
+            continue
+        names = {name for name, *_ in declared}
+        if not any(totals.get(name, 0) > index['referenced'].get(name, 0) for name in names):
+            dead_files.append(path)
+    return dead_files, dead_declarations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find Swift files and declarations nothing references")
+    parser.add_argument("--source-dir", default=SOURCE_DIR, help="directory holding the Swift sources")
+    parser.add_argument("--jobs", type=int, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    print("🔍 Swift Symbol Index")
+    print("=" * 50)
+    if not os.path.isdir(args.source_dir):
+        print(f"❌ Source directory not found: {args.source_dir}")
+        return 1
+
+    files, tokenized = build_index(args.source_dir, args.jobs)
+    declarations = sum(len(index['declared']) for index in files.values())
+    print(f"✅ {len(files)} files, {declarations} declarations ({tokenized} tokenized, {len(files) - tokenized} cached)")
+
+    dead_files, dead_declarations = find_dead(files)
+    print(f"\n🪦 Files nothing else references: {len(dead_files)}")
+    for path in dead_files:
+        print(f"   {path}")
+    print(f"\n💤 Unreferenced declarations: {len(dead_declarations)}")
+    for path, line, kind, name in dead_declarations:
+        print(f"   {path}:{line}: {kind} {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,56 @@
+"""
+Tests for the xctool.py entry point
+
+Run with: python3 -m pytest -q test_xctool.py
+"""
+
+import glob
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+import xctool
+
+REPO = os.path.dirname(os.path.abspath(__file__))
+# What the tools read and write: the project, its sources and the Pods setup
+TREE = ["TrusendaCRM", "TrusendaCRM.xcodeproj", "TrusendaCRM.xcworkspace", "Pods",
+        "Podfile", "Podfile.lock", "Secrets.plist.template"]
+
+
+def snapshot(root):
+    """Return {path: (size, mtime_ns)} for every file under `root`, leaving out bytecode caches"""
+    files = {}
+    for directory, subdirectories, names in os.walk(root):
+        subdirectories[:] = [name for name in subdirectories if name != "__pycache__"]
+        for name in names:
+            path = os.path.join(directory, name)
+            stat = os.stat(path)
+            files[os.path.relpath(path, root)] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+
+@pytest.fixture(scope="module")
+def tree(tmp_path_factory):
+    root = tmp_path_factory.mktemp("tree")
+    for path in glob.glob(os.path.join(REPO, "*.py")):
+        shutil.copy2(path, root)
+    for name in TREE:
+        source = os.path.join(REPO, name)
+        if os.path.isdir(source):
+            shutil.copytree(source, root / name, symlinks=True, ignore=shutil.ignore_patterns(".toolcache"))
+        elif os.path.exists(source):
+            shutil.copy2(source, root)
+    return root
+
+
+@pytest.mark.parametrize("command", sorted(xctool.COMMANDS))
+def test_help_leaves_tree_untouched(tree, command):
+    before = snapshot(tree)
+    result = subprocess.run([sys.executable, "xctool.py", "help", command], cwd=tree,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "usage:" in result.stdout
+    assert snapshot(tree) == before
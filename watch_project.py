@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Project watcher
+Keeps the parsed project in memory and adds or removes Swift files as they
+appear and disappear under the source directory
+
+Usage: watch_project.py [--poll] [--debounce SECONDS]
+Uses inotify on Linux and falls back to polling the directory mtimes elsewhere.
+Bursts of events are debounced into one batch, only that batch's edits are
+applied to the resident project, and the file is rewritten atomically.
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import fnmatch
+import os
+import select
+import signal
+import struct
+import time
+
+from journal import Journal
+from pbxproj import Project, add_files, remove_files, write_atomic
+from profiling import phase
+from scanner import DEFAULT_PRUNE, Scanner, scan
+
+PROJECT_FILE = "TrusendaCRM.xcodeproj/project.pbxproj"
+SOURCE_DIR = "TrusendaCRM"
+TARGET_NAME = "TrusendaCRM"
+SOURCE_SUFFIX = ".swift"
+
+# Wait this long after the last event before applying a batch, but never
+# hold a batch longer than MAX_DELAY while events keep coming
+DEBOUNCE = 0.1
+MAX_DELAY = 1.0
+POLL_INTERVAL = 0.5
+
+# inotify(7) constants
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+EVENT = struct.Struct("iIII")
+
+
+def is_pruned(name, prune=DEFAULT_PRUNE):
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in prune)
+
+
+class InotifyWatcher:
+    """
+    Recursive inotify watch over a directory tree
+
+    changes() returns root-relative paths of files and directories created,
+    deleted or moved. Directories that appear are watched as they are seen;
+    '' means the kernel queue overflowed and everything should be rechecked.
+    """
+
+    def __init__(self, root, prune=DEFAULT_PRUNE):
+        self.root = root
+        self.prune = prune
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}
+        self._watch_tree("")
+
+    @staticmethod
+    def available():
+        library = ctypes.util.find_library("c")
+        return library is not None and hasattr(ctypes.CDLL(library), "inotify_init1")
+
+    def _watch(self, relative):
+        path = os.path.join(self.root, relative) if relative else self.root
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd >= 0:
+            self.dirs[wd] = relative
+
+    def _watch_tree(self, relative):
+        """Watch a directory and everything under it; returns the files found inside"""
+        files = []
+        top = os.path.join(self.root, relative) if relative else self.root
+        for directory, subdirs, names in os.walk(top):
+            subdirs[:] = [name for name in subdirs if not is_pruned(name, self.prune)]
+            base = os.path.relpath(directory, self.root).replace(os.sep, "/")
+            base = "" if base == "." else base
+            self._watch(base)
+            files.extend(f"{base}/{name}" if base else name for name in names)
+        return files
+
+    def changes(self, timeout=None):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        touched = set()
+        while True:
+            try:
+                data = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                return touched
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT.unpack_from(data, offset)
+                name = data[offset + EVENT.size:offset + EVENT.size + length].rstrip(b"\0")
+                offset += EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    touched.add("")
+                    continue
+                if mask & IN_IGNORED:
+                    self.dirs.pop(wd, None)
+                    continue
+                directory = self.dirs.get(wd)
+                if directory is None or not name:
+                    continue
+                name = os.fsdecode(name)
+                if mask & IN_ISDIR and is_pruned(name, self.prune):
+                    continue
+                relative = f"{directory}/{name}" if directory else name
+                touched.add(relative)
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    touched.update(self._watch_tree(relative))
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Fallback watcher that rescans on an interval, rereading only directories whose mtime changed"""
+
+    def __init__(self, root, prune=DEFAULT_PRUNE, interval=POLL_INTERVAL):
+        self.scanner = Scanner(root, prune)
+        self.interval = interval
+        self.files = set(self.scanner.scan())
+
+    def changes(self, timeout=None):
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        files = set(self.scanner.scan())
+        touched = files ^ self.files
+        self.files = files
+        return touched
+
+    def close(self):
+        pass
+
+
+class LiveProject:
+    """The parsed project held in memory, updated in place for each batch of file changes"""
+
+    def __init__(self, project_file=PROJECT_FILE, source_dir=SOURCE_DIR, target_name=TARGET_NAME):
+        self.project_file = project_file
+        self.source_dir = source_dir
+        self.target_name = target_name
+        self.journal = Journal(project_file)
+        self.load()
+
+    def load(self):
+        self.project = Project.load(self.project_file)
+        self.mtime = os.stat(self.project_file).st_mtime_ns
+        self.known = {path: file_id for path, file_id in self.project.file_paths().items() if self.tracked(path)}
+
+    def tracked(self, path):
+        return path.startswith(self.source_dir + "/") and path.endswith(SOURCE_SUFFIX)
+
+    def candidates(self, touched):
+        """Expand touched source-relative paths into the project paths that may have changed"""
+        paths = set()
+        for relative in touched:
+            path = f"{self.source_dir}/{relative}" if relative else self.source_dir
+            if os.path.isdir(path):
+                paths.update(f"{path}/{name}" for name in scan(path, SOURCE_SUFFIX))
+            else:
+                paths.add(path)
+            if not os.path.isfile(path):
+                # A directory that appeared, vanished or moved: recheck everything under it
+                paths.update(known for known in self.known if known.startswith(path + "/"))
+        return paths
+
+    def apply(self, touched):
+        """Bring the project in line with the disk for the touched paths; returns (added, removed)"""
+        if os.stat(self.project_file).st_mtime_ns != self.mtime:
+            # Edited outside the watcher, e.g. by Xcode; start again from the file
+            self.load()
+        added, removed = [], []
+        for path in sorted(self.candidates(touched)):
+            exists = os.path.isfile(path)
+            if exists and path not in self.known and self.tracked(path):
+                added.append(path)
+            elif not exists and path in self.known:
+                removed.append(path)
+        if not added and not removed:
+            return added, removed
+
+        with phase('mutate'):
+            edits = remove_files(self.project, [self.known[path] for path in removed],
+                                 keep={os.path.dirname(path) for path in added})
+            edits += add_files(self.project, added, self.target_name)
+        with phase('journal'):
+            self.journal.record(self.project.text, edits, f"watch: +{len(added)} -{len(removed)}")
+        with phase('mutate'):
+            new_ids = self.project.apply(edits)
+        # As in Journal.write, the fsynced journal entry covers the project file
+        write_atomic(self.project_file, [self.project.text], durable=False)
+        self.mtime = os.stat(self.project_file).st_mtime_ns
+
+        for path in removed:
+            del self.known[path]
+        for object_id in new_ids:
+            if self.project.objects[object_id].get("isa") == "PBXFileReference":
+                self.known[self.project.path_of(object_id)] = object_id
+        return added, removed
+
+
+def batches(watcher, debounce=DEBOUNCE, max_delay=MAX_DELAY):
+    """Yield sets of touched paths, merging events that arrive within `debounce` of each other"""
+    while True:
+        touched = watcher.changes()
+        if not touched:
+            continue
+        started = time.monotonic()
+        while time.monotonic() - started < max_delay:
+            more = watcher.changes(debounce)
+            if not more:
+                break
+            touched |= more
+        yield touched
+
+
+def report(added, removed, elapsed):
+    for path in added:
+        print(f"✅ + {path}")
+    for path in removed:
+        print(f"🗑️  - {path}")
+    print(f"💾 Project updated in {elapsed * 1000:.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keep the Xcode project in sync with Swift files on disk")
+    parser.add_argument("--poll", action="store_true", help="poll directory mtimes instead of using inotify")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL, help="polling interval in seconds")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE, help="quiet period before applying a batch")
+    args = parser.parse_args(argv)
+
+    print("👀 Project Watcher")
+    print("=" * 50)
+    if not os.path.exists(PROJECT_FILE):
+        print(f"❌ Project file not found: {PROJECT_FILE}")
+        return 1
+
+    live = LiveProject()
+    started = time.perf_counter()
+    added, removed = live.apply({""})
+    if added or removed:
+        report(added, removed, time.perf_counter() - started)
+
+    if not args.poll and InotifyWatcher.available():
+        watcher = InotifyWatcher(SOURCE_DIR)
+        print(f"✅ Watching {SOURCE_DIR} with inotify ({len(watcher.dirs)} directories)")
+    else:
+        watcher = PollingWatcher(SOURCE_DIR, interval=args.interval)
+        print(f"✅ Watching {SOURCE_DIR} by polling every {args.interval}s")
+
+    # Stop cleanly on kill as well as Ctrl+C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        for touched in batches(watcher, args.debounce):
+            started = time.perf_counter()
+            added, removed = live.apply(touched)
+            if added or removed:
+                report(added, removed, time.perf_counter() - started)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    finally:
+        watcher.close()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Workspace support
+Reads the member projects of an .xcworkspace, parses them in parallel, and
+merges their targets and products into one index, so references that cross
+projects (the app linking Pods_TrusendaCRM.framework built by the Pods
+project) resolve in one lookup. Edits to several members are applied as one
+transaction
+
+Usage: workspace.py [--workspace PATH] [NAME ...]
+With no names, lists the member projects and the products they take from each other.
+NAME is a product (Pods_TrusendaCRM.framework) or target name to resolve.
+"""
+
+import argparse
+import os
+import time
+import xml.etree.ElementTree as ElementTree
+from concurrent.futures import ProcessPoolExecutor
+
+from journal import Journal, diff
+from pbxproj import ParseError, Project, splice
+from profiling import phase
+
+WORKSPACE = "TrusendaCRM.xcworkspace"
+
+TARGET_ISAS = ('PBXNativeTarget', 'PBXAggregateTarget', 'PBXLegacyTarget')
+
+
+def member_projects(workspace):
+    """Return the .xcodeproj paths a workspace lists, relative to the workspace's directory"""
+    tree = ElementTree.parse(os.path.join(workspace, 'contents.xcworkspacedata'))
+    projects = []
+
+    def walk(element, directory):
+        for child in element:
+            kind, _, location = child.get('location', '').partition(':')
+            if kind == 'absolute':
+                path = location
+            elif kind in ('group', 'container'):
+                path = os.path.normpath(os.path.join(directory, location))
+            else:
+                path = directory
+            if child.tag == 'Group':
+                walk(child, path)
+            elif child.tag == 'FileRef' and path.endswith('.xcodeproj'):
+                projects.append(path)
+
+    walk(tree.getroot(), '')
+    return projects
+
+
+def _parse_file(path):
+    """Read and parse one project.pbxproj; runs in a worker process"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return Project._parsed(f.read())
+
+
+class Workspace:
+    """
+    Every member project of a workspace, keyed by its .xcodeproj path
+
+    Paths are relative to the directory holding the workspace. `products`
+    maps a product file name such as Pods_TrusendaCRM.framework, and
+    `targets` a target name, to the [(project path, target ID)] defining it.
+    """
+
+    def __init__(self, path=WORKSPACE, workers=None):
+        self.path = path
+        self.base = os.path.dirname(os.path.abspath(path))
+        self.members = member_projects(path)
+        self.projects = self._load([member for member in self.members
+                                    if os.path.exists(self.project_file(member))], workers)
+        self.products = {}
+        self.targets = {}
+        for member, project in self.projects.items():
+            for target_id in (project.root_object or {}).get('targets', []):
+                target = project.objects.get(target_id, {})
+                if target.get('isa') not in TARGET_ISAS:
+                    continue
+                self.targets.setdefault(target.get('name'), []).append((member, target_id))
+                product = project.get(target.get('productReference'))
+                if product and 'path' in product:
+                    self.products.setdefault(os.path.basename(product['path']), []).append((member, target_id))
+
+    def project_file(self, member):
+        return os.path.join(self.base, member, 'project.pbxproj')
+
+    def _load(self, members, workers):
+        """
+        Parse the members, in a process pool when there is more than one project and CPU
+
+        Only the parse runs in the workers; the indexes are built here from
+        the parsed graph, which pickles far faster than an indexed Project.
+        """
+        paths = [self.project_file(member) for member in members]
+        with phase('parse'):
+            if workers == 1 or len(paths) < 2 or (workers is None and (os.cpu_count() or 1) < 2):
+                parsed = [_parse_file(path) for path in paths]
+            else:
+                with ProcessPoolExecutor(max_workers=workers or min(len(paths), os.cpu_count())) as pool:
+                    parsed = list(pool.map(_parse_file, paths))
+            return {member: Project(*result, path) for member, result, path in zip(members, parsed, paths)}
+
+    def resolve(self, name):
+        """Return [(project path, target ID)] for a product file name or target name"""
+        return self.products.get(name) or self.targets.get(name) or []
+
+    def external_products(self):
+        """
+        Yield (project path, file ID, name, [(project path, target ID)]) for
+        every built product a member references that another member builds
+        """
+        for member, project in self.projects.items():
+            for file_id, obj in project.of_isa('PBXFileReference').items():
+                if obj.get('sourceTree') != 'BUILT_PRODUCTS_DIR' or 'path' not in obj:
+                    continue
+                name = os.path.basename(obj['path'])
+                producers = [producer for producer in self.products.get(name, []) if producer[0] != member]
+                if producers:
+                    yield member, file_id, name, producers
+
+    def apply(self, edits, message=''):
+        """
+        Apply splice() edits to several members as one transaction
+
+        `edits` maps a project path to its edits. Every new text is built
+        before anything is written, so bad edits change nothing; if a write
+        then fails, the members already written are restored, through the
+        journal, before the error is raised.
+        """
+        staged = []
+        for member, member_edits in edits.items():
+            project = self.projects[member]
+            staged.append((member, member_edits, project.text, ''.join(splice(project.text, member_edits))))
+
+        written = []
+        try:
+            for member, member_edits, old_text, new_text in staged:
+                Journal(self.project_file(member)).write(old_text, member_edits, message)
+                written.append((member, old_text, new_text))
+        except BaseException:
+            for member, old_text, new_text in reversed(written):
+                Journal(self.project_file(member)).write(new_text, diff(new_text, old_text), f"undo: {message}")
+            raise
+        for member, member_edits, _, _ in staged:
+            self.projects[member].apply(member_edits)
+
+
+def target_label(workspace, member, target_id):
+    name = workspace.projects[member].objects[target_id].get('name', target_id)
+    return f"{name} ({member})"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect the projects of an Xcode workspace together")
+    parser.add_argument("names", nargs="*", help="product file names or target names to resolve")
+    parser.add_argument("--workspace", default=WORKSPACE, help="path to the .xcworkspace")
+    parser.add_argument("--workers", type=int, help="processes to parse with; default depends on CPU count")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(os.path.join(args.workspace, 'contents.xcworkspacedata')):
+        print(f"❌ Workspace not found: {args.workspace}")
+        return 1
+    started = time.perf_counter()
+    try:
+        workspace = Workspace(args.workspace, args.workers)
+    except (OSError, ParseError, ElementTree.ParseError) as e:
+        print(f"❌ Cannot load {args.workspace}: {e}")
+        return 1
+    elapsed = (time.perf_counter() - started) * 1000
+
+    if args.names:
+        missing = 0
+        for name in args.names:
+            producers = workspace.resolve(name)
+            if not producers:
+                print(f"❌ {name}: no target builds it")
+                missing += 1
+            for member, target_id in producers:
+                print(f"🎯 {name} → {target_label(workspace, member, target_id)} [{target_id}]")
+        return 1 if missing else 0
+
+    print(f"📦 {args.workspace}: {len(workspace.projects)} projects loaded in {elapsed:.1f} ms")
+    for member in workspace.members:
+        project = workspace.projects.get(member)
+        if project is None:
+            print(f"   ⚠️  {member} (missing)")
+            continue
+        targets = len((project.root_object or {}).get('targets', []))
+        print(f"   {member}: {targets} targets, {len(project.objects)} objects")
+    links = list(workspace.external_products())
+    if links:
+        print("\n🔗 Products built by another project:")
+    for member, _, name, producers in links:
+        for producer in producers:
+            print(f"   {member} uses {name} ← {target_label(workspace, *producer)}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
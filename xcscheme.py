@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Headless scheme generator
+Writes a shared .xcscheme for every target of every project in the workspace
+straight from the parsed projects, replacing Xcode's "Autocreate Schemes Now"
+driven through the GUI. Each scheme has build, test, launch, profile, analyze
+and archive actions; test bundles are attached to the scheme of the target
+they depend on as well as getting their own
+
+Usage: xcscheme.py [--workspace PATH] [--project NAME ...] [--check] [TARGET ...]
+With no targets, writes a scheme for every target. Unchanged schemes are not rewritten.
+Projects under Pods/ are skipped unless named with --project: `pod install`
+regenerates them and would clobber their schemes.
+"""
+
+import argparse
+import os
+import xml.etree.ElementTree as ElementTree
+from xml.sax.saxutils import escape
+
+from pbxproj import ParseError, Project, write_atomic
+from profiling import phase
+from workspace import TARGET_ISAS, Workspace
+
+WORKSPACE = "TrusendaCRM.xcworkspace"
+PROJECT_FILE = "TrusendaCRM.xcodeproj/project.pbxproj"
+PODS_DIR = "Pods"
+
+LAST_UPGRADE_VERSION = "1540"
+SCHEME_VERSION = "1.7"
+
+RUNNABLE_TYPES = {
+    'com.apple.product-type.application',
+    'com.apple.product-type.application.watchapp2-container',
+    'com.apple.product-type.tool',
+}
+TEST_TYPES = {
+    'com.apple.product-type.bundle.unit-test',
+    'com.apple.product-type.bundle.ui-testing',
+}
+
+BUILDABLE_REFERENCE = '''{indent}<BuildableReference
+{indent}   BuildableIdentifier = "primary"
+{indent}   BlueprintIdentifier = "{id}"
+{indent}   BuildableName = "{buildable_name}"
+{indent}   BlueprintName = "{name}"
+{indent}   ReferencedContainer = "container:{container}">
+{indent}</BuildableReference>
+'''
+
+BUILD_ACTION_ENTRY = '''         <BuildActionEntry
+            buildForTesting = "{testing}"
+            buildForRunning = "{running}"
+            buildForProfiling = "{running}"
+            buildForArchiving = "{running}"
+            buildForAnalyzing = "{running}">
+{reference}         </BuildActionEntry>
+'''
+
+TESTABLE_REFERENCE = '''         <TestableReference
+            skipped = "NO">
+{reference}         </TestableReference>
+'''
+
+SCHEME = '''<?xml version="1.0" encoding="UTF-8"?>
+<Scheme
+   LastUpgradeVersion = "{last_upgrade}"
+   version = "{version}">
+   <BuildAction
+      parallelizeBuildables = "YES"
+      buildImplicitDependencies = "YES">
+      <BuildActionEntries>
+{build_entries}      </BuildActionEntries>
+   </BuildAction>
+   <TestAction
+      buildConfiguration = "{debug}"
+      selectedDebuggerIdentifier = "Xcode.DebuggerFoundation.Debugger.LLDB"
+      selectedLauncherIdentifier = "Xcode.DebuggerFoundation.Launcher.LLDB"
+      shouldUseLaunchSchemeArgsEnv = "YES">
+      <Testables>
+{testables}      </Testables>
+   </TestAction>
+   <LaunchAction
+      buildConfiguration = "{debug}"
+      selectedDebuggerIdentifier = "Xcode.DebuggerFoundation.Debugger.LLDB"
+      selectedLauncherIdentifier = "Xcode.DebuggerFoundation.Launcher.LLDB"
+      launchStyle = "0"
+      useCustomWorkingDirectory = "NO"
+      ignoresPersistentStateOnLaunch = "NO"
+      debugDocumentVersioning = "YES"
+      debugServiceExtension = "internal"
+      allowLocationSimulation = "YES">
+{launch}   </LaunchAction>
+   <ProfileAction
+      buildConfiguration = "{release}"
+      shouldUseLaunchSchemeArgsEnv = "YES"
+      savedToolIdentifier = ""
+      useCustomWorkingDirectory = "NO"
+      debugDocumentVersioning = "YES">
+{launch}   </ProfileAction>
+   <AnalyzeAction
+      buildConfiguration = "{debug}">
+   </AnalyzeAction>
+   <ArchiveAction
+      buildConfiguration = "{release}"
+      revealArchiveInOrganizer = "YES">
+   </ArchiveAction>
+</Scheme>
+'''
+
+
+def attribute(value):
+    return escape(value, {'"': '&quot;'})
+
+
+class Buildable:
+    """One target as a scheme refers to it"""
+
+    def __init__(self, project, target_id, container):
+        target = project.objects[target_id]
+        self.id = target_id
+        self.name = target.get('name', target_id)
+        self.product_type = target.get('productType', '')
+        self.container = container
+        product = project.get(target.get('productReference'))
+        self.buildable_name = os.path.basename(product.get('path', self.name)) if product else self.name
+        configuration_list = project.get(target.get('buildConfigurationList')) or {}
+        self.configurations = [project.objects[config_id].get('name')
+                               for config_id in configuration_list.get('buildConfigurations', [])
+                               if config_id in project.objects]
+        self.dependencies = [project.objects[dependency_id].get('target')
+                             for dependency_id in target.get('dependencies', [])
+                             if dependency_id in project.objects]
+
+    @property
+    def runnable(self):
+        return self.product_type in RUNNABLE_TYPES
+
+    @property
+    def test(self):
+        return self.product_type in TEST_TYPES
+
+    def reference(self, indent):
+        return BUILDABLE_REFERENCE.format(indent=' ' * indent, id=attribute(self.id),
+                                          buildable_name=attribute(self.buildable_name),
+                                          name=attribute(self.name), container=attribute(self.container))
+
+    def configuration(self, preferred):
+        """Return `preferred` if the target has it, else the closest thing it does have"""
+        if preferred in self.configurations or not self.configurations:
+            return preferred
+        return self.configurations[0] if preferred == 'Debug' else self.configurations[-1]
+
+
+def project_buildables(project, container):
+    """Return a Buildable per target, in the project's target order"""
+    root = project.root_object or {}
+    target_ids = [target_id for target_id in root.get('targets', [])
+                  if project.objects.get(target_id, {}).get('isa') in TARGET_ISAS]
+    return [Buildable(project, target_id, container) for target_id in target_ids]
+
+
+def scheme_text(buildable, tests):
+    """Return the .xcscheme XML for `buildable`, with `tests` as its testables"""
+    if buildable.test:
+        build_entries = BUILD_ACTION_ENTRY.format(testing='YES', running='NO', reference=buildable.reference(12))
+        tests = [buildable]
+    else:
+        build_entries = BUILD_ACTION_ENTRY.format(testing='YES', running='YES', reference=buildable.reference(12))
+    testables = ''.join(TESTABLE_REFERENCE.format(reference=test.reference(12)) for test in tests)
+    if buildable.runnable:
+        launch = ('      <BuildableProductRunnable\n         runnableDebuggingMode = "0">\n'
+                  + buildable.reference(9) + '      </BuildableProductRunnable>\n')
+    else:
+        launch = '      <MacroExpansion>\n' + buildable.reference(9) + '      </MacroExpansion>\n'
+    return SCHEME.format(last_upgrade=LAST_UPGRADE_VERSION, version=SCHEME_VERSION, build_entries=build_entries,
+                         testables=testables, launch=launch, debug=buildable.configuration('Debug'),
+                         release=buildable.configuration('Release'))
+
+
+def generate(project, project_path, only=None, check=False):
+    """
+    Write a scheme per target of the project at `project_path` (the .xcodeproj); returns [(scheme path, changed)]
+
+    With `check`, nothing is written and `changed` says whether the file on
+    disk differs from what would be written.
+    """
+    buildables = project_buildables(project, os.path.basename(project_path))
+    scheme_dir = os.path.join(project_path, 'xcshareddata', 'xcschemes')
+    results = []
+    for buildable in buildables:
+        if only and buildable.name not in only:
+            continue
+        tests = [test for test in buildables if test.test and buildable.id in test.dependencies]
+        with phase('serialize'):
+            text = scheme_text(buildable, tests)
+        path = os.path.join(scheme_dir, f"{buildable.name}.xcscheme")
+        if check:
+            try:
+                with open(path, 'r', encoding='utf-8', newline='') as f:
+                    results.append((path, f.read() != text))
+            except OSError:
+                results.append((path, True))
+            continue
+        os.makedirs(scheme_dir, exist_ok=True)
+        results.append((path, write_atomic(path, [text])))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write shared Xcode schemes for the workspace's targets")
+    parser.add_argument("targets", nargs="*", help="target names; default is every target")
+    parser.add_argument("--workspace", default=WORKSPACE, help="path to the .xcworkspace")
+    parser.add_argument("--project", action="append", metavar="NAME",
+                        help="only the workspace's projects with this name, e.g. TrusendaCRM (repeatable)")
+    parser.add_argument("--check", action="store_true", help="exit 1 if any scheme is missing or out of date")
+    args = parser.parse_args(argv)
+
+    # Member projects are parsed in parallel; without a workspace, just the app project
+    try:
+        if os.path.isdir(args.workspace):
+            workspace = Workspace(args.workspace)
+            projects = [(os.path.join(workspace.base, member), project) for member, project in workspace.projects.items()]
+        elif os.path.exists(PROJECT_FILE):
+            projects = [(os.path.dirname(os.path.abspath(PROJECT_FILE)), Project.load(PROJECT_FILE))]
+        else:
+            print(f"❌ Workspace not found: {args.workspace}")
+            return 1
+    except (OSError, ParseError, ElementTree.ParseError) as e:
+        print(f"❌ Cannot read {args.workspace}: {e}")
+        return 1
+    if args.project:
+        projects = [(path, project) for path, project in projects
+                    if os.path.splitext(os.path.basename(path))[0] in args.project]
+    else:
+        pods = os.path.join(os.path.dirname(os.path.abspath(args.workspace)), PODS_DIR)
+        projects = [(path, project) for path, project in projects
+                    if os.path.commonpath([os.path.abspath(path), pods]) != pods]
+
+    stale = 0
+    for project_path, project in projects:
+        try:
+            results = generate(project, project_path, set(args.targets), args.check)
+        except OSError as e:
+            print(f"❌ Cannot write schemes for {project_path}: {e}")
+            return 1
+        for path, changed in results:
+            name = os.path.relpath(path)
+            if args.check:
+                print(f"⚠️  Out of date: {name}" if changed else f"✅ Up to date: {name}")
+            else:
+                print(f"✅ Wrote {name}" if changed else f"⏭️  Unchanged: {name}")
+            stale += changed
+    if args.check and stale:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Project tooling entry point
+Runs any of the project tools as a subcommand from anywhere inside the
+repository: the project root is found by walking up from the working
+directory to the nearest folder holding an .xcodeproj
+
+Usage: xctool.py [--profile[=PATH]] [--hotspots N] COMMAND [ARGS ...]
+       xctool.py help [COMMAND]
+Only the chosen command's module is imported, so startup stays close to the
+interpreter's own and the tools are cheap to call from hooks and build phases.
+
+--profile records wall time, CPU time and peak memory for each phase the
+command goes through (scan, parse, mutate, serialize, write, ...) and writes
+them as JSON, by default to .toolcache/profiles/COMMAND-TIMESTAMP.json.
+--hotspots N adds the N functions with the most own time from cProfile.
+Compare two profiles with profiling.py BEFORE.json AFTER.json.
+"""
+
+import importlib
+import os
+import sys
+
+# command: (module, summary). Modules are imported only when their command runs.
+COMMANDS = {
+    "add": ("fix_xcode_project", "Add source files to the project"),
+    "remove": ("delete_files", "Remove files from the project and from disk"),
+    "generate": ("create_xcode_project", "Generate the project from the Swift sources"),
+    "watch": ("watch_project", "Keep the project in sync with Swift files as they change"),
+    "check": ("check_project", "Check the project and source tree for inconsistencies"),
+    "journal": ("journal", "List, verify or roll back recorded project edits"),
+    "query": ("pbxquery", "Query project sections without parsing the whole file"),
+    "format": ("pbxformat", "Rewrite the project in Xcode's canonical layout"),
+    "schemes": ("xcscheme", "Write shared schemes for every target in the workspace"),
+    "workspace": ("workspace", "List workspace projects and resolve products across them"),
+    "settings": ("build_settings", "Show effective build settings"),
+    "dead-code": ("swift_index", "Find Swift files and declarations nothing references"),
+    "assets": ("asset_variants", "Generate scaled variants for asset catalog image sets"),
+    "optimize-png": ("png_optimize", "Losslessly recompress PNGs in asset catalogs"),
+    "dedupe-plist": ("delete_duplicate", "Merge the duplicate Info.plist into the main one and delete it"),
+    "plists": ("plists", "Merge, validate, render and compile plists"),
+    "pods": ("pods_state", "Report whether pod install or a project sync is needed"),
+    "bench": ("benchmark", "Benchmark the tooling on synthetic projects"),
+}
+
+
+def find_project_root(start=None):
+    """Return the nearest directory at or above `start` that holds an .xcodeproj, or None"""
+    directory = os.path.abspath(start or os.getcwd())
+    while True:
+        try:
+            if any(name.endswith(".xcodeproj") for name in os.listdir(directory)):
+                return directory
+        except OSError:
+            pass
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def usage():
+    print("Usage: xctool.py [--profile[=PATH]] [--hotspots N] COMMAND [ARGS ...]\n\nCommands:")
+    for command, (_, summary) in COMMANDS.items():
+        print(f"  {command:<14}{summary}")
+    print("\nRun 'xctool.py help COMMAND' for a command's options.")
+
+
+def parse_global_options(argv):
+    """Split leading global options off `argv`; returns (profile_path, hotspots, rest)"""
+    profile, hotspots = None, 0
+    while argv and argv[0].startswith("--") and argv[0] not in ("--help",):
+        option, argv = argv[0], argv[1:]
+        if option == "--profile":
+            profile = profile or ""
+        elif option.startswith("--profile="):
+            profile = option.split("=", 1)[1]
+        elif option == "--hotspots" and argv and argv[0].isdigit():
+            hotspots, argv = int(argv[0]), argv[1:]
+            profile = profile or ""
+        else:
+            raise ValueError(option)
+    return profile, hotspots, argv
+
+
+def run(module, args):
+    try:
+        return module.main(args)
+    except SystemExit as e:
+        return e.code
+
+
+def run_profiled(module, command, args, profile_path, hotspots):
+    """Run a command under the profiler and write its report as JSON"""
+    import json
+    import time
+
+    import profiling
+    from pbxproj import write_atomic
+
+    profiler = profiling.Profiler(hotspots)
+    profiling.activate(profiler)
+    try:
+        status = run(module, args)
+    finally:
+        profiling.deactivate()
+    if not profile_path:
+        profile_path = os.path.join(".toolcache", "profiles", f"{command}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(profile_path)), exist_ok=True)
+    write_atomic(profile_path, [json.dumps(profiler.report(command, args), indent=1, sort_keys=True)])
+    print(f"📊 Profile written to {profile_path}")
+    return status
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    try:
+        profile_path, hotspots, argv = parse_global_options(argv)
+    except ValueError as e:
+        print(f"❌ Unknown option: {e}")
+        usage()
+        return 2
+    if not argv or argv[0] in ("-h", "--help"):
+        usage()
+        return 0
+    command, args = argv[0], argv[1:]
+    if command == "help":
+        if not args:
+            usage()
+            return 0
+        command, args = args[0], ["--help"]
+    if command not in COMMANDS:
+        print(f"❌ Unknown command: {command}")
+        usage()
+        return 2
+
+    root = find_project_root()
+    if root is None:
+        print("❌ No Xcode project found in this directory or any parent")
+        return 1
+    # The tools take paths relative to the project directory; a relative profile path stays relative to the caller's
+    if profile_path:
+        profile_path = os.path.abspath(profile_path)
+    os.chdir(root)
+
+    module = importlib.import_module(COMMANDS[command][0])
+    sys.argv[0] = f"xctool.py {command}"
+    if profile_path is None:
+        return run(module, args)
+    return run_profiled(module, command, args, profile_path, hotspots)
+
+
+if __name__ == "__main__":
+    exit(main())